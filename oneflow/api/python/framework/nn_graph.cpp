@@ -31,6 +31,7 @@ ONEFLOW_API_PYBIND11_MODULE("nn.graph.", m) {
   py::class_<NNGraph, std::shared_ptr<NNGraph>>(m, "CNNGraph")
       .def(py::init<const std::string&>())
       .def_property_readonly("name", &NNGraph::job_name)
+      .def_property_readonly("job_loaded_from_cache", &NNGraph::job_loaded_from_cache)
       .def("register_input_op_names",
            [](NNGraph& graph, const std::vector<std::string>& input_op_names) {
              return graph.RegisterInputOpNames(input_op_names).GetOrThrow();
@@ -45,8 +46,12 @@ ONEFLOW_API_PYBIND11_MODULE("nn.graph.", m) {
              return graph.RegisterVariableOpNamesAndTensors(variable_op_names, variable_tensors)
                  .GetOrThrow();
            })
-      .def("complie_and_init_runtime",
-           [](NNGraph& graph) { return graph.CompileAndInitRuntime().GetOrThrow(); });
+      .def(
+          "complie_and_init_runtime",
+          [](NNGraph& graph, const std::string& job_cache_path) {
+            return graph.CompileAndInitRuntime(job_cache_path).GetOrThrow();
+          },
+          py::arg("job_cache_path") = "");
 
   m.def("RunLazyNNGraph",
         [](const one::TensorTuple& inputs, const one::TensorTuple& outputs,
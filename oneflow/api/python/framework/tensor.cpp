@@ -14,8 +14,10 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
 #include <pybind11/stl.h>
 #include <pybind11/functional.h>
+#include <thread>
 #include "oneflow/api/python/of_api_registry.h"
 #include "oneflow/api/python/ofblob/ofblob.e.h"
 #include "oneflow/core/common/container_util.h"
@@ -23,6 +25,8 @@ limitations under the License.
 #include "oneflow/core/framework/instructions_builder.h"
 #include "oneflow/core/framework/tensor.h"
 #include "oneflow/core/framework/tensor_method.h"
+#include "oneflow/core/framework/tensor_storage.h"
+#include "oneflow/core/framework/shut_down_util.h"
 #include "oneflow/core/framework/device.h"
 #include "oneflow/core/framework/stride.h"
 #include "oneflow/core/framework/py_distribute.h"
@@ -152,6 +156,122 @@ const std::string& ApiGetCopyMirroredTensorFromNumpyFuncName(const Tensor& tenso
   return *GetCopyMirroredTensorFromNumpyFuncName(tensor.dtype()).GetPtrOrThrow();
 }
 
+template<typename T>
+Maybe<py::array> MirroredTensorToNumpyView(const py::object& py_tensor) {
+  const auto& tensor =
+      std::dynamic_pointer_cast<MirroredTensor>(py::cast<std::shared_ptr<Tensor>>(py_tensor));
+  CHECK_NOTNULL_OR_RETURN(tensor) << "local tensors supported only";
+  CHECK_OR_RETURN(tensor->is_eager()) << "eager tensors supported only";
+  CHECK_OR_RETURN(JUST(tensor->device())->type() == "cpu") << "cpu tensors supported only";
+  CHECK_OR_RETURN(JUST(IsContiguous(tensor))) << "contiguous tensors supported only";
+  std::atomic<bool> synced(false);
+
+  // waits until the instructions writing the tensor are done
+  JUST(PhysicalRun([&](InstructionsBuilder* builder) -> Maybe<void> {
+    JUST(builder->AccessBlobByCallback(
+        tensor, [&synced](uint64_t of_blob_ptr) { synced = true; }, "const"));
+    return Maybe<void>::Ok();
+  }));
+
+  Global<ForeignLockHelper>::Get()->WithScopedRelease([&synced]() {
+    while (!synced) {}
+  });
+
+  const Blob& blob = JUST(tensor->eager_blob_object())->blob();
+  const auto& dim_vec = tensor->shape()->dim_vec();
+  std::vector<ssize_t> shape(dim_vec.begin(), dim_vec.end());
+  std::vector<ssize_t> strides(shape.size());
+  ssize_t stride = sizeof(T);
+  for (int64_t i = static_cast<int64_t>(shape.size()) - 1; i >= 0; --i) {
+    strides[i] = stride;
+    stride *= shape[i];
+  }
+  // The array holds a reference to the tensor, which keeps its memory alive. It is only synced
+  // with the instructions launched so far, later ones may write the memory while it is read.
+  return py::array(py::dtype::of<T>(), shape, strides,
+                   blob.dptr<T>() + JUST(tensor->storage_offset()), py_tensor);
+}
+
+template<typename T>
+py::array ApiMirroredTensorToNumpyView(const py::object& py_tensor) {
+  return *MirroredTensorToNumpyView<T>(py_tensor).GetPtrOrThrow();
+}
+
+Maybe<std::string> GetMirroredTensorToNumpyViewFuncName(DataType dtype) {
+  using namespace oneflow;
+  static const HashMap<int64_t, std::shared_ptr<std::string>> data_type2func_name{
+#define DATA_TYPE_FUNC_NAME_PAIR(type_cpp, type_proto) \
+  {type_proto, std::make_shared<std::string>("_numpy_view_" #type_cpp)},
+      OF_PP_FOR_EACH_TUPLE(DATA_TYPE_FUNC_NAME_PAIR, POD_DATA_TYPE_SEQ)
+#undef DATA_TYPE_FUNC_NAME_PAIR
+  };
+  return JUST(MapAt(data_type2func_name, static_cast<int64_t>(dtype)));
+}
+
+const std::string& ApiGetMirroredTensorToNumpyViewFuncName(const Tensor& tensor) {
+  return *GetMirroredTensorToNumpyViewFuncName(tensor.dtype()).GetPtrOrThrow();
+}
+
+int DecRefPyObject(void* obj) {
+  Py_DECREF(static_cast<PyObject*>(obj));
+  return 0;
+}
+
+// The memory of a tensor is released on the vm thread, which must not wait for the GIL, so the
+// reference to the numpy array is dropped by the interpreter's main thread instead.
+void DecRefPyObjectLater(PyObject* obj) {
+  if (IsShuttingDown()) { return; }
+  for (int i = 0; i < 1000; ++i) {
+    if (Py_AddPendingCall(&DecRefPyObject, obj) == 0) { return; }
+    // the queue of pending calls is full
+    std::this_thread::yield();
+  }
+  LOG(WARNING) << "failed to release a numpy array shared with a tensor";
+}
+
+Maybe<DataType> GetNumpyArrayDataType(const py::array& array) {
+#define NUMPY_DTYPE_CASE(type_cpp, type_proto) \
+  if (array.dtype().is(py::dtype::of<type_cpp>())) { return type_proto; }
+  OF_PP_FOR_EACH_TUPLE(NUMPY_DTYPE_CASE, ARITHMETIC_DATA_TYPE_SEQ UNSIGNED_INT_DATA_TYPE_SEQ)
+#undef NUMPY_DTYPE_CASE
+  UNIMPLEMENTED_THEN_RETURN() << "numpy arrays of dtype "
+                              << py::str(array.dtype()).cast<std::string>()
+                              << " can not be shared with a tensor";
+}
+
+Maybe<Tensor> MakeMirroredTensorFromNumpy(py::array array) {
+  const DataType dtype = JUST(GetNumpyArrayDataType(array));
+  CHECK_OR_RETURN(array.flags() & py::array::c_style) << "C-contiguous arrays supported only";
+  CHECK_OR_RETURN(array.writeable()) << "writeable arrays supported only";
+  CHECK_GT_OR_RETURN(array.size(), 0) << "empty arrays can not be shared";
+  DimVector dim_vec(array.shape(), array.shape() + array.ndim());
+  const auto& shape = std::make_shared<Shape>(dim_vec);
+  const auto& device = JUST(Device::New("cpu", 0));
+  const auto& tensor_buffer = std::make_shared<vm::TensorBuffer>();
+  PyObject* owner = array.ptr();
+  Py_INCREF(owner);
+  tensor_buffer->set_blob_dptr(std::unique_ptr<char, std::function<void(char*)>>(
+      static_cast<char*>(array.mutable_data()), [owner](char*) { DecRefPyObjectLater(owner); }));
+  const auto& parallel_desc = device->parallel_desc_ptr();
+  const auto& eager_blob_object = std::make_shared<vm::EagerBlobObject>(
+      device->mem_case(), shape, dtype, tensor_buffer, parallel_desc);
+  JUST(eager_blob_object->InitBlobWithTensorBufferBody());
+  const auto& tensor_storage = std::make_shared<TensorStorage>(tensor_buffer);
+  tensor_storage->set_releaser_hook(
+      [eager_blob_object, parallel_desc](const std::shared_ptr<vm::TensorBuffer>&) {
+        CHECK_JUST(PhysicalRun([&](InstructionsBuilder* builder) -> Maybe<void> {
+          JUST(builder->ReleaseTensor(eager_blob_object, parallel_desc));
+          return Maybe<void>::Ok();
+        }));
+      });
+  return std::static_pointer_cast<Tensor>(JUST(MirroredTensor::MakeEagerTensor(
+      eager_blob_object, device, tensor_storage, /*requires_grad=*/false, /*is_leaf=*/true)));
+}
+
+std::shared_ptr<Tensor> ApiMakeMirroredTensorFromNumpy(py::array array) {
+  return MakeMirroredTensorFromNumpy(array).GetPtrOrThrow();
+}
+
 Symbol<Device> TensorGetDevice(const Tensor& tensor) { return tensor.device().GetOrThrow(); }
 
 Symbol<ParallelDesc> TensorGetParallelDesc(const Tensor& tensor) {
@@ -270,16 +390,20 @@ ONEFLOW_API_PYBIND11_MODULE("", m) {
       .def_property_readonly("_tensor_buffer_shapes_and_dtypes", &GetTensorBufferShapesAndDTypes)
       .def_property_readonly("device", &TensorGetDevice)
       .def_property_readonly("data", &Tensor::data)
-#define DEFINE_TENSOR_METHOD(T, type_proto)                    \
-  .def("_copy_to_numpy_" #T, &ApiCopyMirroredTensorToNumpy<T>) \
-      .def("_copy_from_numpy_" #T, &ApiCopyMirroredTensorFromNumpy<T>)
+#define DEFINE_TENSOR_METHOD(T, type_proto)                            \
+  .def("_copy_to_numpy_" #T, &ApiCopyMirroredTensorToNumpy<T>)         \
+      .def("_copy_from_numpy_" #T, &ApiCopyMirroredTensorFromNumpy<T>) \
+      .def("_numpy_view_" #T, &ApiMirroredTensorToNumpyView<T>)
           OF_PP_FOR_EACH_TUPLE(DEFINE_TENSOR_METHOD, POD_DATA_TYPE_SEQ)
 #undef DEFINE_TENSOR_METHOD
       .def("_get_copy_mirrored_tensor_to_numpy_func_name", &ApiGetCopyMirroredTensorToNumpyFuncName)
       .def("_get_copy_mirrored_tensor_from_numpy_func_name",
            &ApiGetCopyMirroredTensorFromNumpyFuncName)
+      .def("_get_mirrored_tensor_to_numpy_view_func_name", &ApiGetMirroredTensorToNumpyViewFuncName)
       // consistent tensor only
       .def_property_readonly("placement", &TensorGetParallelDesc);
+
+  m.def("_make_mirrored_tensor_from_numpy", &ApiMakeMirroredTensorFromNumpy);
 }
 
 }  // namespace one
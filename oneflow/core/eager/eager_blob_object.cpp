@@ -88,5 +88,16 @@ Maybe<void> EagerBlobObject::TryAllocateBlobBodyMemory(DeviceCtx* device_ctx) {
   return Maybe<void>::Ok();
 }
 
+Maybe<void> EagerBlobObject::InitBlobWithTensorBufferBody() {
+  JUST(TryInitBlob());
+  char* dptr = tensor_buffer_->blob_dptr();
+  CHECK_NOTNULL_OR_RETURN(dptr);
+  CHECK_GT_OR_RETURN(blob_->AlignedByteSizeOfBlobBody(), 0);
+  blob_->reset_dptr(dptr);
+  // TryAllocateBlobBodyMemory takes a blob with a body of this size as allocated
+  blob_body_bytes_ = blob_->AlignedByteSizeOfBlobBody();
+  return Maybe<void>::Ok();
+}
+
 }  // namespace vm
 }  // namespace oneflow
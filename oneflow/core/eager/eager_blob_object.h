@@ -62,6 +62,9 @@ class EagerBlobObject final : public BlobObject {
   Maybe<void> InitBlob();
 
   Maybe<void> TryAllocateBlobBodyMemory(DeviceCtx* device_ctx) override;
+  // Uses the memory already held by tensor_buffer() as the blob body, for blobs sharing the
+  // memory of a foreign buffer such as a numpy array.
+  Maybe<void> InitBlobWithTensorBufferBody();
   Maybe<void> DeallocateBlobDataPtr() override {
     non_pod_initer_.reset();
     tensor_buffer_->reset();
@@ -14,6 +14,9 @@ See the License for the specific language governing permissions and
 limitations under the License.
 */
 #include "oneflow/core/framework/nn_graph.h"
+#include <unistd.h>
+#include <cstdio>
+#include <fstream>
 #include "oneflow/core/common/buffer_manager.h"
 #include "oneflow/core/control/ctrl_client.h"
 #include "oneflow/core/control/global_process_ctx.h"
@@ -29,6 +32,31 @@ limitations under the License.
 
 namespace oneflow {
 
+namespace {
+
+bool TryLoadCompletedJob(const std::string& job_cache_path, Job* job) {
+  std::ifstream in(job_cache_path, std::ifstream::in | std::ifstream::binary);
+  if (!in.is_open()) { return false; }
+  return job->ParseFromIstream(&in);
+}
+
+void SaveCompletedJob(const std::string& job_cache_path, const Job& job) {
+  // Written to a temporary file and renamed, so that other processes sharing the cache never
+  // read a partially written file.
+  const std::string tmp_path = job_cache_path + "." + std::to_string(getpid()) + ".tmp";
+  {
+    std::ofstream out(tmp_path, std::ofstream::out | std::ofstream::binary | std::ofstream::trunc);
+    if (!out.is_open() || !job.SerializeToOstream(&out)) {
+      LOG(WARNING) << "failed to write compile cache file " << tmp_path;
+      std::remove(tmp_path.c_str());
+      return;
+    }
+  }
+  if (std::rename(tmp_path.c_str(), job_cache_path.c_str()) != 0) { std::remove(tmp_path.c_str()); }
+}
+
+}  // namespace
+
 NNGraph::~NNGraph() {
   CloseRuntimeBuffers();
   runtime_.reset();
@@ -71,7 +99,9 @@ Maybe<void> NNGraph::RegisterVariableOpNamesAndTensors(
   return Maybe<void>::Ok();
 }
 
-Maybe<void> NNGraph::CompileAndInitRuntime() {
+Maybe<void> NNGraph::CompileAndInitRuntime() { return CompileAndInitRuntime(""); }
+
+Maybe<void> NNGraph::CompileAndInitRuntime(const std::string& job_cache_path) {
   CHECK_OR_RETURN(!runtime_inited_);
   JobBuildAndInferCtx* job_ctx = JUST(GetJobBuildAndInferCtx(name_));
   job_ = job_ctx->job();
@@ -82,15 +112,24 @@ Maybe<void> NNGraph::CompileAndInitRuntime() {
 
   auto scope = std::make_unique<GlobalJobDescScope>(job_.job_conf(), job_ctx->job_id());
   if (GlobalProcessCtx::IsThisProcessMaster()) {
+    // NOTE: Only the completed job is cached. The plan holds task, regst and mem block ids
+    // allocated by IDMgr in this process, so it is always generated here.
+    job_loaded_from_cache_ = !job_cache_path.empty() && TryLoadCompletedJob(job_cache_path, &job_);
+    if (!job_loaded_from_cache_) { job_ = job_ctx->job(); }
     double start = GetCurTime();
     // TODO(chengcheng): new memory reused by chunk
-    Compiler().Compile(&job_, &plan_, /* need_job_complete */ true);
+    Compiler().Compile(&job_, &plan_, /* need_job_complete */ !job_loaded_from_cache_);
 
     LOG(INFO) << "\njob_id: " << job_ctx->job_id() << " , job_name: " << name_
-              << " , compile time: " << (GetCurTime() - start) / 1000000000.0 << " seconds.\n";
+              << " , compile time: " << (GetCurTime() - start) / 1000000000.0 << " seconds"
+              << (job_loaded_from_cache_ ? ", completed job loaded from " + job_cache_path : "")
+              << ".\n";
     if (Global<ResourceDesc, ForSession>::Get()->enable_debug_mode()) {
       TeePersistentLogStream::Create("job_" + name_ + "_plan")->Write(plan_);
     }
+    if (!job_cache_path.empty() && !job_loaded_from_cache_) {
+      SaveCompletedJob(job_cache_path, job_);
+    }
     // TODO(chengcheng): test collective boxing for multi-job.
     PlanUtil::GenCollectiveBoxingPlan(&job_, &plan_);
     PlanUtil::SetForceInplaceMemBlock(&plan_);
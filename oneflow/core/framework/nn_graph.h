@@ -29,13 +29,15 @@ class Runtime;
 
 class NNGraph final : public NNGraphIf {
  public:
-  explicit NNGraph(const std::string& name) : name_(name), runtime_inited_(false) {}
+  explicit NNGraph(const std::string& name)
+      : name_(name), runtime_inited_(false), job_loaded_from_cache_(false) {}
   ~NNGraph();
 
   const std::string& job_name() const { return name_; }
   const std::vector<std::string>& inputs_op_names() const;
   const std::vector<std::string>& outputs_op_names() const;
   int64_t variable_op_size() const;
+  bool job_loaded_from_cache() const { return job_loaded_from_cache_; }
 
   Maybe<void> RegisterInputOpNames(const std::vector<std::string>& input_op_names);
   Maybe<void> RegisterOutputOpNames(const std::vector<std::string>& output_op_names);
@@ -43,6 +45,10 @@ class NNGraph final : public NNGraphIf {
       const std::vector<std::string>& variable_op_names,
       const std::vector<std::shared_ptr<one::Tensor>>& variable_tensors);
   Maybe<void> CompileAndInitRuntime();
+  // Loads the completed job from `job_cache_path` if it was cached by an earlier compilation of
+  // the same job, otherwise completes the job and caches it there. The plan is generated from the
+  // completed job in both cases. An empty path disables the cache.
+  Maybe<void> CompileAndInitRuntime(const std::string& job_cache_path);
 
  private:
   void NewRuntimeBuffers();
@@ -57,6 +63,7 @@ class NNGraph final : public NNGraphIf {
   // TODO(chengcheng): temp impl using runtime now, need reimplement for dynamic multi nn.Graph.
   std::unique_ptr<Runtime> runtime_;
   bool runtime_inited_;
+  bool job_loaded_from_cache_;
 };
 
 Maybe<void> RunLazyNNGraph(const one::TensorTuple& inputs, const one::TensorTuple& outputs,
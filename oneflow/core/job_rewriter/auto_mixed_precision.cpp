@@ -157,10 +157,15 @@ class AutoMixedPrecision final : public JobPass {
  public:
   OF_DISALLOW_COPY_AND_MOVE(AutoMixedPrecision);
   AutoMixedPrecision()
-      : white_list_(AutoMixedPrecisionLists::WhiteList()),
-        black_list_(AutoMixedPrecisionLists::BlackList()),
-        gray_list_(AutoMixedPrecisionLists::GrayList()),
-        clear_list_(AutoMixedPrecisionLists::ClearList()) {}
+      : AutoMixedPrecision(
+          AutoMixedPrecisionLists::WhiteList(), AutoMixedPrecisionLists::BlackList(),
+          AutoMixedPrecisionLists::GrayList(), AutoMixedPrecisionLists::ClearList()) {}
+  AutoMixedPrecision(const AMPList& white_list, const AMPList& black_list, const AMPList& gray_list,
+                     const AMPList& clear_list)
+      : white_list_(white_list),
+        black_list_(black_list),
+        gray_list_(gray_list),
+        clear_list_(clear_list) {}
   ~AutoMixedPrecision() = default;
 
   bool IsEnabled(const JobPassCtx& ctx) const {
@@ -173,10 +178,32 @@ class AutoMixedPrecision final : public JobPass {
     if (!IsEnabled(*ctx)) { return Maybe<void>::Ok(); }
     const OpGraph op_graph(*job);
     JobBuilder job_builder(job);
-    return Apply(op_graph, &job_builder);
+    const JobConfigProto& job_conf = ctx->job_desc().job_conf();
+    if (job_conf.amp_white_list().empty() && job_conf.amp_black_list().empty()
+        && job_conf.amp_gray_list().empty() && job_conf.amp_clear_list().empty()) {
+      return Apply(op_graph, &job_builder);
+    }
+    AMPList white_list = white_list_;
+    AMPList black_list = black_list_;
+    AMPList gray_list = gray_list_;
+    AMPList clear_list = clear_list_;
+    MoveIntoAMPList(job_conf.amp_white_list(), &white_list, {&black_list, &gray_list, &clear_list});
+    MoveIntoAMPList(job_conf.amp_black_list(), &black_list, {&white_list, &gray_list, &clear_list});
+    MoveIntoAMPList(job_conf.amp_gray_list(), &gray_list, {&white_list, &black_list, &clear_list});
+    MoveIntoAMPList(job_conf.amp_clear_list(), &clear_list, {&white_list, &black_list, &gray_list});
+    return AutoMixedPrecision(white_list, black_list, gray_list, clear_list)
+        .Apply(op_graph, &job_builder);
   }
 
  private:
+  static void MoveIntoAMPList(const PbRpf<std::string>& op_type_names, AMPList* amp_list,
+                              const std::vector<AMPList*>& other_amp_lists) {
+    for (const std::string& op_type_name : op_type_names) {
+      for (AMPList* other_amp_list : other_amp_lists) { other_amp_list->erase(op_type_name); }
+      amp_list->insert(op_type_name);
+    }
+  }
+
   void FillBlackSet(const OpGraph& op_graph, HashSet<OpNode*>* black_set) const;
   void FillWhiteSet(const OpGraph& op_graph, std::function<bool(OpNode*)> IsAllowedToRunWithHalf,
                     const HashSet<OpNode*>& black_set, HashSet<OpNode*>* white_set) const;
@@ -15,6 +15,7 @@ limitations under the License.
 */
 #include "oneflow/core/job_rewriter/job_pass.h"
 #include "oneflow/core/framework/framework.h"
+#include "oneflow/core/graph/op_graph.h"
 
 namespace oneflow {
 
@@ -46,6 +47,22 @@ Maybe<void> GradientAccumulationRewritePass::Apply(Job* job, JobPassCtx* ctx) co
     }
   };
   const int64_t repeat_num = GlobalJobDesc().job_conf().num_gradient_accumulation_steps();
+  // nn.Graph feeds the whole batch of a call to its inputs, so dim 0 of the traced inputs is the
+  // batch dim. It stays 0 if the job has no input.
+  int64_t batch_size = 0;
+  JUST(op_graph.ForEachOpNode([&](const OpNode& node) -> Maybe<void> {
+    if (!node.op().op_conf().has_input_conf()) { return Maybe<void>::Ok(); }
+    const Shape& shape = op_graph.GetLogicalBlobDesc(node.op().BnInOp2Lbi("out")).shape();
+    CHECK_GT_OR_RETURN(shape.NumAxes(), 0)
+        << "gradient accumulation splits the inputs along dim 0, but input " << node.op().op_name()
+        << " is a scalar";
+    if (batch_size == 0) { batch_size = shape.At(0); }
+    CHECK_EQ_OR_RETURN(shape.At(0), batch_size)
+        << "gradient accumulation splits the inputs along dim 0, so all inputs must have the same "
+           "dim 0, but input "
+        << node.op().op_name() << " has shape " << shape.ToString();
+    return Maybe<void>::Ok();
+  }));
   JUST(op_graph.TopoForEachNodeWithErrorCaptured([&](const OpNode* node) -> Maybe<void> {
     const OperatorConf& op_conf = node->op().op_conf();
     if (node->in_edges().empty()) {       // sources
@@ -102,6 +119,32 @@ Maybe<void> GradientAccumulationRewritePass::Apply(Job* job, JobPassCtx* ctx) co
         (*new_op_conf->mutable_user_conf()->mutable_input())[user_op::kUserSourceOpTickInputArgName]
             .add_s(repeat_op.output("out", 0));
         return Maybe<void>::Ok();
+      } else if (op_conf.has_input_conf()) {  // unpack input
+        // The input of nn.Graph is fed the whole batch once per step, the micro-batches are
+        // split from it here.
+        const LogicalBlobId input_lbi = node->op().BnInOp2Lbi("out");
+        const std::string input_lbn = GenLogicalBlobName(input_lbi);
+        user_op::UserOpConfWrapperBuilder unpack_builder("System-GradientAccumulation-InputUnpack-"
+                                                         + op_conf.name());
+        const auto unpack_op = unpack_builder.OpTypeName("unpack")
+                                   .Input("in", input_lbn)
+                                   .Output("out")
+                                   .Attr<int32_t>("unpack_num", repeat_num)
+                                   .ScopeSymbolId(op_conf.scope_symbol_id())
+                                   .Build();
+        job_builder.AddOps(node->parallel_desc().parallel_conf(), {unpack_op.op_conf()});
+        node->ForEachNodeOnOutEdge([&](const OpNode* dst) {
+          const auto& dst_op = dst->op();
+          OperatorConf* new_dst_op_conf = GetOperatorConf4Modify(dst_op.op_conf());
+          for (const auto& ibn : dst_op.input_bns()) {
+            if (dst_op.BnInOp2Lbi(ibn) == input_lbi) {
+              const auto& old_val = ReplaceInputLbnInOpCustomizedConf(new_dst_op_conf, ibn,
+                                                                      unpack_op.output("out", 0));
+              CHECK_EQ(input_lbn, old_val);
+            }
+          }
+        });
+        return Maybe<void>::Ok();
       } else {
         return Error::Unimplemented();
       }
@@ -122,11 +165,89 @@ Maybe<void> GradientAccumulationRewritePass::Apply(Job* job, JobPassCtx* ctx) co
                                                               return_pack_op.output("out", 0));
       CHECK_EQ(return_in_lbn, old_val);
       return Maybe<void>::Ok();
+    } else if (op_conf.has_output_conf()) {  // pack or take the last micro-batch of output
+      const LogicalBlobId output_in_lbi = node->op().BnInOp2Lbi("in");
+      const std::string output_in_lbn = GenLogicalBlobName(output_in_lbi);
+      const Shape& shape = op_graph.GetLogicalBlobDesc(output_in_lbi).shape();
+      const ParallelConf& parallel_conf = node->parallel_desc().parallel_conf();
+      std::string new_output_in_lbn;
+      if (batch_size > 0 && shape.NumAxes() > 0 && shape.At(0) == batch_size) {
+        // The output was traced with the whole batch, the micro-batches are concatenated back.
+        user_op::UserOpConfWrapperBuilder pack_builder("System-GradientAccumulation-OutputPack-"
+                                                       + op_conf.name());
+        const auto pack_op = pack_builder.OpTypeName("pack")
+                                 .Input("in", output_in_lbn)
+                                 .Output("out")
+                                 .Attr<int32_t>("pack_num", repeat_num)
+                                 .ScopeSymbolId(op_conf.scope_symbol_id())
+                                 .Build();
+        job_builder.AddOps(parallel_conf, {pack_op.op_conf()});
+        new_output_in_lbn = pack_op.output("out", 0);
+      } else {
+        // Other outputs, e.g. a scalar loss, keep the shape they were traced with and return the
+        // value of the last micro-batch: stack the micro-batches on a new dim 0 and slice the last.
+        const std::string prefix = "System-GradientAccumulation-OutputLast-" + op_conf.name();
+        const auto expand_op = user_op::UserOpConfWrapperBuilder(prefix + "-ExpandDims")
+                                   .OpTypeName("expand_dims")
+                                   .Input("in", output_in_lbn)
+                                   .Output("out")
+                                   .Attr<int32_t>("axis", 0)
+                                   .ScopeSymbolId(op_conf.scope_symbol_id())
+                                   .Build();
+        const auto pack_op = user_op::UserOpConfWrapperBuilder(prefix + "-Pack")
+                                 .OpTypeName("pack")
+                                 .Input("in", expand_op.output("out", 0))
+                                 .Output("out")
+                                 .Attr<int32_t>("pack_num", repeat_num)
+                                 .ScopeSymbolId(op_conf.scope_symbol_id())
+                                 .Build();
+        std::vector<int64_t> start(shape.NumAxes() + 1, 0);
+        std::vector<int64_t> stop(shape.NumAxes() + 1, std::numeric_limits<int64_t>::max());
+        std::vector<int64_t> step(shape.NumAxes() + 1, 1);
+        start.at(0) = repeat_num - 1;
+        stop.at(0) = repeat_num;
+        const auto slice_op = user_op::UserOpConfWrapperBuilder(prefix + "-Slice")
+                                  .OpTypeName("slice")
+                                  .Input("x", pack_op.output("out", 0))
+                                  .Output("y")
+                                  .Attr<std::vector<int64_t>>("start", start)
+                                  .Attr<std::vector<int64_t>>("stop", stop)
+                                  .Attr<std::vector<int64_t>>("step", step)
+                                  .ScopeSymbolId(op_conf.scope_symbol_id())
+                                  .Build();
+        const auto squeeze_op = user_op::UserOpConfWrapperBuilder(prefix + "-Squeeze")
+                                    .OpTypeName("squeeze")
+                                    .Input("in", slice_op.output("y", 0))
+                                    .Output("out")
+                                    .Attr<std::vector<int32_t>>("axes", {0})
+                                    .ScopeSymbolId(op_conf.scope_symbol_id())
+                                    .Build();
+        job_builder.AddOps(parallel_conf, {expand_op.op_conf(), pack_op.op_conf(),
+                                           slice_op.op_conf(), squeeze_op.op_conf()});
+        new_output_in_lbn = squeeze_op.output("out", 0);
+      }
+      OperatorConf* new_output_op_conf = GetOperatorConf4Modify(op_conf);
+      const auto& old_val =
+          ReplaceInputLbnInOpCustomizedConf(new_output_op_conf, "in", new_output_in_lbn);
+      CHECK_EQ(output_in_lbn, old_val);
+      return Maybe<void>::Ok();
     } else {
       return Maybe<void>::Ok();
     }
   }));
   for (const auto& pair : name2op_conf) { job_builder.MutOpsOnlyOnce({pair.second}); }
+  if (batch_size > 0) {
+    // Ops between the inputs and the outputs now see micro-batches. The ones whose attrs were
+    // traced from the whole batch, e.g. a reshape to dim 0 of an input, fail to infer here.
+    const auto& maybe_op_graph = TRY(OpGraph::New(*job));
+    if (!maybe_op_graph.IsOk()) {
+      return Error(maybe_op_graph.error())
+             << "\ngradient accumulation splits the batch of size " << batch_size << " into "
+             << repeat_num << " micro-batches of size " << batch_size / repeat_num
+             << ", but the graph does not infer with micro-batches. Ops whose attrs depend on "
+                "the batch size, such as a reshape to dim 0 of an input, are not supported";
+    }
+  }
   return Maybe<void>::Ok();
 }
 
@@ -236,6 +236,11 @@ Maybe<void> PipelineBufferPass::Apply(const OpGraph& op_graph, JobBuilder* job_b
   if (max_stage_id == 0) { return Maybe<void>::Ok(); }
   const int64_t total_stage_num = max_stage_id + 1;
   LOG(INFO) << "total stage num = " << total_stage_num;
+  const JobConfigProto& job_conf = GlobalJobDesc().job_conf();
+  /* NOTE(chengcheng): max buffer size */
+  const int64_t max_buffer_size =
+      job_conf.has_pipeline_buffer_size() ? job_conf.pipeline_buffer_size() : total_stage_num * 2;
+  CHECK_GE_OR_RETURN(max_buffer_size, 1);
 
   HashMap<std::string, OperatorConf> buffer_op_name2op_conf;
   HashMap<std::string, ParallelConf> buffer_op_name2parallel_conf;
@@ -260,8 +265,7 @@ Maybe<void> PipelineBufferPass::Apply(const OpGraph& op_graph, JobBuilder* job_b
                        << this_node->op().op_conf().DebugString()
                        << "](stage_id:" << std::to_string(dst_stage_id) << ")\n";
         }
-        const int64_t buffer_size = total_stage_num * 2; /* NOTE(chengcheng): max buffer size */
-        TryInsertOrUseBufferOpToDstNode(in_edge, buffer_size, &buffer_op_name2op_conf,
+        TryInsertOrUseBufferOpToDstNode(in_edge, max_buffer_size, &buffer_op_name2op_conf,
                                         &buffer_op_name2parallel_conf, &mut_op_name2conf);
       }
     }
@@ -286,7 +290,7 @@ Maybe<void> PipelineBufferPass::Apply(const OpGraph& op_graph, JobBuilder* job_b
       if (src_node->parallel_desc().device_type() == DeviceType::kCPU
           && dst_node->parallel_desc().device_type() == DeviceType::kGPU) {
         if (src_stage_id == 0 && (dst_stage_id == max_stage_id || dst_stage_id == 0)) {
-          TryInsertOrUseBufferOpToDstNode(edge, total_stage_num * 2, &buffer_op_name2op_conf,
+          TryInsertOrUseBufferOpToDstNode(edge, max_buffer_size, &buffer_op_name2op_conf,
                                           &buffer_op_name2parallel_conf, &mut_op_name2conf);
           return;
         }
@@ -829,6 +829,183 @@ REGISTER_LARS_UPDATE_KERNEL(DeviceType::kGPU, float, float);
 REGISTER_LARS_UPDATE_KERNEL(DeviceType::kGPU, double, double);
 #endif  // WITH_CUDA
 
+template<DeviceType device_type, typename T, typename G>
+class MultiTensorSGDUpdateKernel final : public user_op::OpKernel {
+ public:
+  MultiTensorSGDUpdateKernel() = default;
+  ~MultiTensorSGDUpdateKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const auto scale = ctx->Attr<double>("scale");
+    const auto l1 = ctx->Attr<float>("l1");
+    const auto l2 = ctx->Attr<float>("l2");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    const float learning_rate_val = ctx->Attr<float>("learning_rate_val");
+    FOR_RANGE(int32_t, i, 0, ctx->input_size("model")) {
+      const user_op::Tensor* model_diff = ctx->Tensor4ArgNameAndIndex("model_diff", i);
+      user_op::Tensor* model = ctx->Tensor4ArgNameAndIndex("model", i);
+      SGDUpdateKernelUtil<device_type, T, G>::Update(ctx->device_ctx(), model->shape().elem_cnt(),
+                                                     static_cast<T>(scale), l1, l2, weight_decay,
+                                                     learning_rate_val, nullptr, nullptr, nullptr,
+                                                     model_diff->dptr<G>(), model->mut_dptr<T>());
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_TENSOR_SGD_UPDATE_KERNEL(device, dtype, gtype)                    \
+  REGISTER_USER_KERNEL("multi_tensor_sgd_update")                                        \
+      .SetCreateFn<MultiTensorSGDUpdateKernel<device, dtype, gtype>>()                   \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == device)                               \
+                       & (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
+                       & (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
+
+REGISTER_MULTI_TENSOR_SGD_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_TENSOR_SGD_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+#ifdef WITH_CUDA
+REGISTER_MULTI_TENSOR_SGD_UPDATE_KERNEL(DeviceType::kGPU, float, float16);
+REGISTER_MULTI_TENSOR_SGD_UPDATE_KERNEL(DeviceType::kGPU, float, float);
+REGISTER_MULTI_TENSOR_SGD_UPDATE_KERNEL(DeviceType::kGPU, double, double);
+#endif  // WITH_CUDA
+
+template<DeviceType device_type, typename T, typename G>
+class MultiTensorMomentumUpdateKernel final : public user_op::OpKernel {
+ public:
+  MultiTensorMomentumUpdateKernel() = default;
+  ~MultiTensorMomentumUpdateKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const auto scale = ctx->Attr<double>("scale");
+    const auto l1 = ctx->Attr<float>("l1");
+    const auto l2 = ctx->Attr<float>("l2");
+    const auto beta = ctx->Attr<float>("beta");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    const float learning_rate_val = ctx->Attr<float>("learning_rate_val");
+    FOR_RANGE(int32_t, i, 0, ctx->input_size("model")) {
+      const user_op::Tensor* model_diff = ctx->Tensor4ArgNameAndIndex("model_diff", i);
+      user_op::Tensor* model = ctx->Tensor4ArgNameAndIndex("model", i);
+      user_op::Tensor* momentum = ctx->Tensor4ArgNameAndIndex("momentum", i);
+      MomentumUpdateKernelUtil<device_type, T, G>::Update(
+          ctx->device_ctx(), model->shape().elem_cnt(), static_cast<T>(scale), l1, l2, beta,
+          weight_decay, learning_rate_val, nullptr, nullptr, nullptr, model_diff->dptr<G>(),
+          model->mut_dptr<T>(), momentum->mut_dptr<T>());
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_TENSOR_MOMENTUM_UPDATE_KERNEL(device, dtype, gtype)               \
+  REGISTER_USER_KERNEL("multi_tensor_momentum_update")                                   \
+      .SetCreateFn<MultiTensorMomentumUpdateKernel<device, dtype, gtype>>()              \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == device)                               \
+                       & (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
+                       & (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
+
+REGISTER_MULTI_TENSOR_MOMENTUM_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_TENSOR_MOMENTUM_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+#ifdef WITH_CUDA
+REGISTER_MULTI_TENSOR_MOMENTUM_UPDATE_KERNEL(DeviceType::kGPU, float, float16);
+REGISTER_MULTI_TENSOR_MOMENTUM_UPDATE_KERNEL(DeviceType::kGPU, float, float);
+REGISTER_MULTI_TENSOR_MOMENTUM_UPDATE_KERNEL(DeviceType::kGPU, double, double);
+#endif  // WITH_CUDA
+
+template<DeviceType device_type, typename T, typename G>
+class MultiTensorAdamUpdateKernel final : public user_op::OpKernel {
+ public:
+  MultiTensorAdamUpdateKernel() = default;
+  ~MultiTensorAdamUpdateKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const auto scale = ctx->Attr<double>("scale");
+    const auto l1 = ctx->Attr<float>("l1");
+    const auto l2 = ctx->Attr<float>("l2");
+    const auto beta1 = ctx->Attr<float>("beta1");
+    const auto beta2 = ctx->Attr<float>("beta2");
+    const auto epsilon = ctx->Attr<float>("epsilon");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    const float learning_rate_val = ctx->Attr<float>("learning_rate_val");
+    FOR_RANGE(int32_t, i, 0, ctx->input_size("model")) {
+      const user_op::Tensor* model_diff = ctx->Tensor4ArgNameAndIndex("model_diff", i);
+      user_op::Tensor* model = ctx->Tensor4ArgNameAndIndex("model", i);
+      user_op::Tensor* m = ctx->Tensor4ArgNameAndIndex("m", i);
+      user_op::Tensor* v = ctx->Tensor4ArgNameAndIndex("v", i);
+      AdamUpdateKernelUtil<device_type, T, G>::Update(
+          ctx->device_ctx(), model->shape().elem_cnt(), static_cast<T>(scale), l1, l2, beta1, beta2,
+          epsilon, weight_decay, learning_rate_val, nullptr, nullptr, nullptr,
+          model_diff->dptr<G>(), model->mut_dptr<T>(), m->mut_dptr<T>(), v->mut_dptr<T>());
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_TENSOR_ADAM_UPDATE_KERNEL(device, dtype, gtype)                   \
+  REGISTER_USER_KERNEL("multi_tensor_adam_update")                                       \
+      .SetCreateFn<MultiTensorAdamUpdateKernel<device, dtype, gtype>>()                  \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == device)                               \
+                       & (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
+                       & (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
+
+REGISTER_MULTI_TENSOR_ADAM_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_TENSOR_ADAM_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+#ifdef WITH_CUDA
+REGISTER_MULTI_TENSOR_ADAM_UPDATE_KERNEL(DeviceType::kGPU, float, float16);
+REGISTER_MULTI_TENSOR_ADAM_UPDATE_KERNEL(DeviceType::kGPU, float, float);
+REGISTER_MULTI_TENSOR_ADAM_UPDATE_KERNEL(DeviceType::kGPU, double, double);
+#endif  // WITH_CUDA
+
+template<DeviceType device_type, typename T, typename G>
+class MultiTensorRmsPropUpdateKernel final : public user_op::OpKernel {
+ public:
+  MultiTensorRmsPropUpdateKernel() = default;
+  ~MultiTensorRmsPropUpdateKernel() override = default;
+
+ private:
+  void Compute(user_op::KernelComputeContext* ctx) const override {
+    const auto scale = ctx->Attr<double>("scale");
+    const auto l1 = ctx->Attr<float>("l1");
+    const auto l2 = ctx->Attr<float>("l2");
+    const auto decay_rate = ctx->Attr<float>("decay_rate");
+    const auto epsilon = ctx->Attr<float>("epsilon");
+    const auto centered = ctx->Attr<bool>("centered");
+    const auto weight_decay = ctx->Attr<float>("weight_decay");
+    const float learning_rate_val = ctx->Attr<float>("learning_rate_val");
+    FOR_RANGE(int32_t, i, 0, ctx->input_size("model")) {
+      const user_op::Tensor* model_diff = ctx->Tensor4ArgNameAndIndex("model_diff", i);
+      user_op::Tensor* model = ctx->Tensor4ArgNameAndIndex("model", i);
+      user_op::Tensor* mean_square = ctx->Tensor4ArgNameAndIndex("mean_square", i);
+      T* mean_gradient_ptr = nullptr;
+      if (centered) {
+        user_op::Tensor* mean_gradient = ctx->Tensor4ArgNameAndIndex("mean_gradient", i);
+        mean_gradient_ptr = mean_gradient->mut_dptr<T>();
+      }
+      RmsPropUpdateKernelUtil<device_type, T, G>::Update(
+          ctx->device_ctx(), model->shape().elem_cnt(), static_cast<T>(scale), l1, l2, centered,
+          epsilon, weight_decay, decay_rate, learning_rate_val, nullptr, nullptr, nullptr,
+          model_diff->dptr<G>(), model->mut_dptr<T>(), mean_square->mut_dptr<T>(),
+          mean_gradient_ptr);
+    }
+  }
+  bool AlwaysComputeWhenAllOutputsEmpty() const override { return true; }
+};
+
+#define REGISTER_MULTI_TENSOR_RMSPROP_UPDATE_KERNEL(device, dtype, gtype)                \
+  REGISTER_USER_KERNEL("multi_tensor_rmsprop_update")                                    \
+      .SetCreateFn<MultiTensorRmsPropUpdateKernel<device, dtype, gtype>>()               \
+      .SetIsMatchedHob((user_op::HobDeviceTag() == device)                               \
+                       & (user_op::HobDataType("model", 0) == GetDataType<dtype>::value) \
+                       & (user_op::HobDataType("model_diff", 0) == GetDataType<gtype>::value));
+
+REGISTER_MULTI_TENSOR_RMSPROP_UPDATE_KERNEL(DeviceType::kCPU, float, float);
+REGISTER_MULTI_TENSOR_RMSPROP_UPDATE_KERNEL(DeviceType::kCPU, double, double);
+#ifdef WITH_CUDA
+REGISTER_MULTI_TENSOR_RMSPROP_UPDATE_KERNEL(DeviceType::kGPU, float, float16);
+REGISTER_MULTI_TENSOR_RMSPROP_UPDATE_KERNEL(DeviceType::kGPU, float, float);
+REGISTER_MULTI_TENSOR_RMSPROP_UPDATE_KERNEL(DeviceType::kGPU, double, double);
+#endif  // WITH_CUDA
+
 }  // namespace
 
 }  // namespace oneflow
@@ -705,6 +705,159 @@ REGISTER_NO_GRAD_USER_OP("lars_update")
     .SetInputArgModifyFn(LarsUpdateInputArgModifyFn)
     .SetDataTypeInferFn(InferLarsUpdateDataType);
 
+// The multi_tensor_* ops apply the same update as their single tensor counterparts to a whole
+// list of models at once, so that the eager optimizers dispatch one op per parameter group
+// instead of one op per parameter. Every state input has one tensor for each model.
+
+Maybe<void> InferMultiTensorUpdateTensorDesc(user_op::InferContext* ctx,
+                                             const std::vector<std::string>& state_names) {
+  const int32_t num_tensors = ctx->input_size("model");
+  CHECK_EQ_OR_RETURN(ctx->input_size("model_diff"), num_tensors);
+  for (const auto& name : state_names) { CHECK_EQ_OR_RETURN(ctx->input_size(name), num_tensors); }
+  FOR_RANGE(int32_t, i, 0, num_tensors) {
+    const user_op::TensorDesc& model = ctx->InputTensorDesc("model", i);
+    const user_op::TensorDesc& model_diff = ctx->InputTensorDesc("model_diff", i);
+    CHECK_EQ_OR_RETURN(model_diff.shape(), model.shape());
+    for (const auto& name : state_names) {
+      const user_op::TensorDesc& state = ctx->InputTensorDesc(name, i);
+      JUST(CheckShapeLike(&state, &model));
+    }
+  }
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> InferMultiTensorUpdateDataType(user_op::InferContext* ctx,
+                                           const std::vector<std::string>& state_names) {
+  const user_op::TensorDesc& first_model = ctx->InputTensorDesc("model", 0);
+  const user_op::TensorDesc& first_model_diff = ctx->InputTensorDesc("model_diff", 0);
+  FOR_RANGE(int32_t, i, 0, ctx->input_size("model")) {
+    const user_op::TensorDesc& model = ctx->InputTensorDesc("model", i);
+    const user_op::TensorDesc& model_diff = ctx->InputTensorDesc("model_diff", i);
+    JUST(CheckDataTypeLike(&model, &first_model));
+    JUST(CheckDataTypeLike(&model_diff, &first_model_diff));
+    for (const auto& name : state_names) {
+      const user_op::TensorDesc& state = ctx->InputTensorDesc(name, i);
+      JUST(CheckDataTypeLike(&state, &model));
+    }
+  }
+  return Maybe<void>::Ok();
+}
+
+Maybe<void> MultiTensorUpdateInputArgModifyFn(
+    const user_op::GetInputArgModifier& GetInputArgModifierFn,
+    const user_op::UserOpConfWrapper& conf, const std::vector<std::string>& state_names) {
+  FOR_RANGE(int32_t, i, 0, conf.input_size("model")) {
+    JUST(SetInputArgModifierMutable(GetInputArgModifierFn, "model", i));
+    for (const auto& name : state_names) {
+      JUST(SetInputArgModifierMutable(GetInputArgModifierFn, name, i));
+    }
+  }
+  return Maybe<void>::Ok();
+}
+
+std::vector<std::string> RmsPropStateNames(bool centered) {
+  if (centered) {
+    return {"mean_square", "mean_gradient"};
+  } else {
+    return {"mean_square"};
+  }
+}
+
+REGISTER_NO_GRAD_USER_OP("multi_tensor_sgd_update")
+    .InputWithMinimum("model", 1)
+    .InputWithMinimum("model_diff", 1)
+    .Attr<float>("learning_rate_val", 0.0)
+    .Attr<double>("scale", 1.0)
+    .Attr<float>("l1", 0.0)
+    .Attr<float>("l2", 0.0)
+    .Attr<float>("weight_decay", 0.0)
+    .SetTensorDescInferFn([](user_op::InferContext* ctx) -> Maybe<void> {
+      return InferMultiTensorUpdateTensorDesc(ctx, {});
+    })
+    .SetGetSbpFn(user_op::GetSbpFnUtil::DefaultBroadcastToBroadcast)
+    .SetInputArgModifyFn([](const user_op::GetInputArgModifier& GetInputArgModifierFn,
+                            const user_op::UserOpConfWrapper& conf) -> Maybe<void> {
+      return MultiTensorUpdateInputArgModifyFn(GetInputArgModifierFn, conf, {});
+    })
+    .SetDataTypeInferFn([](user_op::InferContext* ctx) -> Maybe<void> {
+      return InferMultiTensorUpdateDataType(ctx, {});
+    });
+
+REGISTER_NO_GRAD_USER_OP("multi_tensor_momentum_update")
+    .InputWithMinimum("model", 1)
+    .InputWithMinimum("model_diff", 1)
+    .InputWithMinimum("momentum", 1)
+    .Attr<float>("learning_rate_val", 0.0)
+    .Attr<double>("scale", 1.0)
+    .Attr<float>("l1", 0.0)
+    .Attr<float>("l2", 0.0)
+    .Attr<float>("beta", 0.9)
+    .Attr<float>("weight_decay", 0.0)
+    .SetTensorDescInferFn([](user_op::InferContext* ctx) -> Maybe<void> {
+      return InferMultiTensorUpdateTensorDesc(ctx, {"momentum"});
+    })
+    .SetGetSbpFn(user_op::GetSbpFnUtil::DefaultBroadcastToBroadcast)
+    .SetInputArgModifyFn([](const user_op::GetInputArgModifier& GetInputArgModifierFn,
+                            const user_op::UserOpConfWrapper& conf) -> Maybe<void> {
+      return MultiTensorUpdateInputArgModifyFn(GetInputArgModifierFn, conf, {"momentum"});
+    })
+    .SetDataTypeInferFn([](user_op::InferContext* ctx) -> Maybe<void> {
+      return InferMultiTensorUpdateDataType(ctx, {"momentum"});
+    });
+
+REGISTER_NO_GRAD_USER_OP("multi_tensor_adam_update")
+    .InputWithMinimum("model", 1)
+    .InputWithMinimum("model_diff", 1)
+    .InputWithMinimum("m", 1)
+    .InputWithMinimum("v", 1)
+    .Attr<float>("learning_rate_val", 0.0)
+    .Attr<double>("scale", 1.0)
+    .Attr<float>("l1", 0.0)
+    .Attr<float>("l2", 0.0)
+    .Attr<float>("beta1", 0.9)
+    .Attr<float>("beta2", 0.999)
+    .Attr<float>("epsilon", 1e-8)
+    .Attr<float>("weight_decay", 0.0)
+    .SetTensorDescInferFn([](user_op::InferContext* ctx) -> Maybe<void> {
+      return InferMultiTensorUpdateTensorDesc(ctx, {"m", "v"});
+    })
+    .SetGetSbpFn(user_op::GetSbpFnUtil::DefaultBroadcastToBroadcast)
+    .SetInputArgModifyFn([](const user_op::GetInputArgModifier& GetInputArgModifierFn,
+                            const user_op::UserOpConfWrapper& conf) -> Maybe<void> {
+      return MultiTensorUpdateInputArgModifyFn(GetInputArgModifierFn, conf, {"m", "v"});
+    })
+    .SetDataTypeInferFn([](user_op::InferContext* ctx) -> Maybe<void> {
+      return InferMultiTensorUpdateDataType(ctx, {"m", "v"});
+    });
+
+REGISTER_NO_GRAD_USER_OP("multi_tensor_rmsprop_update")
+    .InputWithMinimum("model", 1)
+    .InputWithMinimum("model_diff", 1)
+    .InputWithMinimum("mean_square", 1)
+    .OptionalInputWithMinimum("mean_gradient", 1)
+    .Attr<float>("learning_rate_val", 0.0)
+    .Attr<double>("scale", 1.0)
+    .Attr<float>("l1", 0.0)
+    .Attr<float>("l2", 0.0)
+    .Attr<bool>("centered", false)
+    .Attr<float>("epsilon", 1e-8)
+    .Attr<float>("decay_rate", 0.99)
+    .Attr<float>("weight_decay", 0.0)
+    .SetTensorDescInferFn([](user_op::InferContext* ctx) -> Maybe<void> {
+      const bool centered = ctx->Attr<bool>("centered");
+      CHECK_EQ_OR_RETURN(ctx->has_input("mean_gradient", 0), centered);
+      return InferMultiTensorUpdateTensorDesc(ctx, RmsPropStateNames(centered));
+    })
+    .SetGetSbpFn(user_op::GetSbpFnUtil::DefaultBroadcastToBroadcast)
+    .SetInputArgModifyFn([](const user_op::GetInputArgModifier& GetInputArgModifierFn,
+                            const user_op::UserOpConfWrapper& conf) -> Maybe<void> {
+      return MultiTensorUpdateInputArgModifyFn(GetInputArgModifierFn, conf,
+                                               RmsPropStateNames(conf.attr<bool>("centered")));
+    })
+    .SetDataTypeInferFn([](user_op::InferContext* ctx) -> Maybe<void> {
+      return InferMultiTensorUpdateDataType(ctx, RmsPropStateNames(ctx->Attr<bool>("centered")));
+    });
+
 }  // namespace
 
 }  // namespace oneflow
@@ -207,6 +207,7 @@ from oneflow.framework.session_util import (
 )
 from oneflow.framework.tensor import Tensor
 from oneflow.framework.tensor import construct_tensor as tensor
+from oneflow.framework.tensor import from_numpy
 from oneflow.nn.modules.abs import abs_op as abs
 from oneflow.nn.modules.acos import acos_op as acos
 from oneflow.nn.modules.acosh import acosh_op as acosh
@@ -0,0 +1,153 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import json
+import math
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+import oneflow as flow
+
+parser = argparse.ArgumentParser(
+    description="compare the memory and throughput of a transformer-style stack "
+    "with and without activation checkpointing"
+)
+parser.add_argument("-l", "--num_layers", type=int, default=12, required=False)
+parser.add_argument("--hidden_size", type=int, default=256, required=False)
+parser.add_argument("--seq_len", type=int, default=128, required=False)
+parser.add_argument("-b", "--batch_size", type=int, default=8, required=False)
+parser.add_argument("-i", "--iter_num", type=int, default=20, required=False)
+parser.add_argument("-w", "--warmup_iter_num", type=int, default=3, required=False)
+# each mode runs in its own process, so that the peak memory is its own
+parser.add_argument(
+    "--mode", type=str, default=None, choices=["none", "alternate", "all"]
+)
+args = parser.parse_args()
+
+MODES = ["none", "alternate", "all"]
+
+
+class TransformerLayer(flow.nn.Module):
+    def __init__(self, hidden_size):
+        super().__init__()
+        self.query = flow.nn.Linear(hidden_size, hidden_size)
+        self.key = flow.nn.Linear(hidden_size, hidden_size)
+        self.value = flow.nn.Linear(hidden_size, hidden_size)
+        self.proj = flow.nn.Linear(hidden_size, hidden_size)
+        self.norm1 = flow.nn.LayerNorm(hidden_size)
+        self.fc1 = flow.nn.Linear(hidden_size, 4 * hidden_size)
+        self.act = flow.nn.GELU()
+        self.fc2 = flow.nn.Linear(4 * hidden_size, hidden_size)
+        self.norm2 = flow.nn.LayerNorm(hidden_size)
+        self.softmax = flow.nn.Softmax(dim=-1)
+        self.scale = 1.0 / math.sqrt(hidden_size)
+
+    def forward(self, x):
+        q = self.query(x)
+        k = self.key(x)
+        v = self.value(x)
+        scores = flow.bmm(q, flow.transpose(k, 1, 2)) * self.scale
+        attn = flow.bmm(self.softmax(scores), v)
+        x = self.norm1(x + self.proj(attn))
+        return self.norm2(x + self.fc2(self.act(self.fc1(x))))
+
+
+class TransformerStack(flow.nn.Module):
+    def __init__(self, num_layers, hidden_size):
+        super().__init__()
+        self.layers = flow.nn.Sequential(
+            *[TransformerLayer(hidden_size) for _ in range(num_layers)]
+        )
+
+    def forward(self, x):
+        return self.layers(x)
+
+
+# NOTE: nn.Graph training cannot run in this tree yet, JobCompleter fails on
+# the training job (see the skipped training tests in test/graph). This
+# benchmark has not produced numbers so far, it stops at the first graph call
+# of the first mode.
+class TrainGraph(flow.nn.Graph):
+    def __init__(self, model, optimizer, mode):
+        super().__init__()
+        self.model = model
+        self.add_optimizer("sgd", optimizer)
+        layers = self.model.layers
+        for i in range(len(model.layers)):
+            if mode == "all" or (mode == "alternate" and i % 2 == 0):
+                getattr(layers, str(i)).config.activation_checkpointing = True
+
+    def build(self, x):
+        loss = self.model(x).sum()
+        loss.backward()
+        return loss
+
+
+def run(mode):
+    model = TransformerStack(args.num_layers, args.hidden_size)
+    optimizer = flow.optim.SGD(model.parameters(), lr=0.001)
+    graph = TrainGraph(model, optimizer, mode)
+    x = flow.Tensor(
+        np.random.uniform(
+            -1, 1, (args.batch_size, args.seq_len, args.hidden_size)
+        ).astype(np.float32)
+    )
+    for _ in range(args.warmup_iter_num):
+        graph(x).numpy()
+    start = time.perf_counter()
+    for _ in range(args.iter_num):
+        # numpy() waits for the step to finish
+        graph(x).numpy()
+    step_time = (time.perf_counter() - start) / args.iter_num
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"step_time": step_time, "peak_rss_mb": peak_rss_mb}))
+
+
+def main():
+    print(
+        "{} layers, hidden size {}, sequence length {}, batch size {} on cpu".format(
+            args.num_layers, args.hidden_size, args.seq_len, args.batch_size
+        )
+    )
+    print(
+        "{:<12}{:>14}{:>16}{:>16}".format(
+            "checkpoint", "step ms", "samples/s", "peak RSS MB"
+        )
+    )
+    for mode in MODES:
+        output = subprocess.check_output(
+            [sys.executable, __file__, "--mode", mode] + sys.argv[1:]
+        )
+        result = json.loads(output.decode("utf-8").strip().splitlines()[-1])
+        print(
+            "{:<12}{:>14.2f}{:>16.1f}{:>16.1f}".format(
+                mode,
+                result["step_time"] * 1000,
+                args.batch_size / result["step_time"],
+                result["peak_rss_mb"],
+            )
+        )
+
+
+if __name__ == "__main__":
+    if args.mode is None:
+        main()
+    else:
+        run(args.mode)
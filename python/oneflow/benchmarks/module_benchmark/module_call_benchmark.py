@@ -0,0 +1,99 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import time
+
+import oneflow as flow
+
+parser = argparse.ArgumentParser(
+    description="measure the per-call overhead of nn.Module"
+)
+parser.add_argument("-n", "--iter_num", type=int, default=200000, required=False)
+parser.add_argument("-r", "--repeat", type=int, default=5, required=False)
+parser.add_argument("-l", "--num_layers", type=int, default=16, required=False)
+args = parser.parse_args()
+
+
+class Identity(flow.nn.Module):
+    def forward(self, x):
+        return x
+
+
+class ParamAccess(flow.nn.Module):
+    # the forward only touches a parameter, a buffer and a submodule, so the
+    # timing is dominated by attribute resolution
+    def __init__(self):
+        super().__init__()
+        self.weight = flow.nn.Parameter(flow.Tensor(1))
+        self.register_buffer("running_mean", flow.Tensor(1))
+        self.sub = Identity()
+
+    def forward(self, x):
+        self.weight
+        self.running_mean
+        return self.sub
+
+
+class Stack(flow.nn.Module):
+    def __init__(self, num_layers):
+        super().__init__()
+        for i in range(num_layers):
+            self.add_module("layer{}".format(i), Identity())
+        self.num_layers = num_layers
+
+    def forward(self, x):
+        for i in range(self.num_layers):
+            x = getattr(self, "layer{}".format(i))(x)
+        return x
+
+
+def _noop_pre_hook(module, args):
+    return None
+
+
+def timeit(fn):
+    # the best of several runs, in nanoseconds per iteration
+    best = None
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for _ in range(args.iter_num):
+            fn(None)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / args.iter_num * 1e9
+
+
+def main():
+    identity = Identity()
+    hooked = Identity()
+    hooked.register_forward_pre_hook(_noop_pre_hook)
+    param_access = ParamAccess()
+    stack = Stack(args.num_layers)
+    cases = [
+        ("forward() directly", identity.forward),
+        ("__call__, no hooks", identity),
+        ("__call__, 1 pre-hook", hooked),
+        ("parameter/buffer/module access", param_access),
+        ("{} nested modules".format(args.num_layers), stack),
+    ]
+    print("{} iterations, best of {}".format(args.iter_num, args.repeat))
+    print("{:<34}{:>12}".format("case", "ns/call"))
+    for (name, fn) in cases:
+        print("{:<34}{:>12.1f}".format(name, timeit(fn)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import time
+
+import numpy as np
+
+import oneflow as flow
+from oneflow.nn.parameter import Parameter
+
+parser = argparse.ArgumentParser(
+    description="compare per-tensor and foreach optimizer steps"
+)
+parser.add_argument("-n", "--num_params", type=int, default=2000, required=False)
+parser.add_argument("-s", "--param_size", type=int, default=64, required=False)
+parser.add_argument("-i", "--iter_num", type=int, default=50, required=False)
+parser.add_argument("-w", "--warmup_iter_num", type=int, default=5, required=False)
+parser.add_argument("-d", "--device", type=str, default="cpu", required=False)
+args = parser.parse_args()
+
+OPTIMIZERS = {
+    "sgd": (flow.optim.SGD, {"lr": 0.1}),
+    "momentum": (flow.optim.SGD, {"lr": 0.1, "momentum": 0.9}),
+    "adam": (flow.optim.Adam, {"lr": 0.001}),
+    "rmsprop": (flow.optim.RMSprop, {"lr": 0.001}),
+}
+
+
+def make_params():
+    device = flow.device(args.device)
+    params = []
+    for _ in range(args.num_params):
+        value = np.random.uniform(size=(args.param_size,)).astype(np.float32)
+        param = Parameter(flow.Tensor(value, device=device))
+        # the gradients only need to exist, so one backward pass is enough
+        flow.sum(param).backward()
+        params.append(param)
+    return params
+
+
+def sync(params):
+    # numpy() waits for the pending updates of the parameter
+    params[-1].numpy()
+
+
+def benchmark(optimizer_cls, options, params, foreach):
+    optimizer = optimizer_cls([{"params": params, "foreach": foreach, **options}])
+    for _ in range(args.warmup_iter_num):
+        optimizer.step()
+    sync(params)
+    start = time.perf_counter()
+    for _ in range(args.iter_num):
+        optimizer.step()
+    sync(params)
+    return (time.perf_counter() - start) / args.iter_num
+
+
+def main():
+    params = make_params()
+    print(
+        "{} parameters of {} elements on {}, {} iterations".format(
+            args.num_params, args.param_size, args.device, args.iter_num
+        )
+    )
+    print(
+        "{:<10}{:>16}{:>16}{:>10}".format(
+            "optimizer", "per-tensor ms", "foreach ms", "speedup"
+        )
+    )
+    for (name, (optimizer_cls, options)) in OPTIMIZERS.items():
+        per_tensor = benchmark(optimizer_cls, options, params, False)
+        foreach = benchmark(optimizer_cls, options, params, True)
+        print(
+            "{:<10}{:>16.3f}{:>16.3f}{:>9.2f}x".format(
+                name, per_tensor * 1000, foreach * 1000, per_tensor / foreach
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import argparse
+import asyncio
+import time
+
+import numpy as np
+
+import oneflow as flow
+
+parser = argparse.ArgumentParser(
+    description="compare the latency and throughput of InferenceSession with "
+    "and without request batching"
+)
+parser.add_argument("--saved_model_dir", type=str, required=True)
+parser.add_argument("--model_version", type=int, default=None, required=False)
+parser.add_argument("-c", "--num_clients", type=int, default=32, required=False)
+parser.add_argument("-r", "--num_requests", type=int, default=50, required=False)
+parser.add_argument("-b", "--max_batch_size", type=int, default=None, required=False)
+parser.add_argument("-q", "--max_queue_delay_ms", type=float, default=1.0)
+parser.add_argument("-d", "--device_tag", type=str, default="gpu", required=False)
+args = parser.parse_args()
+
+
+def make_session():
+    option = flow.serving.SessionOption()
+    option.device_tag = args.device_tag
+    sess = flow.serving.InferenceSession(option)
+    if args.model_version is None:
+        sess.load_saved_model(args.saved_model_dir)
+    else:
+        sess.load_saved_model(args.saved_model_dir, model_version=args.model_version)
+    sess.launch()
+    return sess
+
+
+def make_request(sess, job_name, rows):
+    # a request of `rows` samples, or of a whole batch when not batching
+    request = {}
+    for input_name in sess.list_inputs():
+        info = sess.input_info(input_name, job_name)
+        shape = (rows,) + tuple(info["shape"][1:])
+        dtype = flow.convert_oneflow_dtype_to_numpy_dtype(info["dtype"])
+        request[input_name] = np.random.uniform(size=shape).astype(dtype)
+    return request
+
+
+async def client(sess, job_name, request, latencies):
+    for _ in range(args.num_requests):
+        start = time.perf_counter()
+        await sess.async_run(job_name, **request)
+        latencies.append(time.perf_counter() - start)
+
+
+async def drive(sess, job_name, request):
+    latencies = []
+    start = time.perf_counter()
+    clients = [
+        client(sess, job_name, request, latencies) for _ in range(args.num_clients)
+    ]
+    await asyncio.gather(*clients)
+    return (time.perf_counter() - start, latencies)
+
+
+def report(name, elapsed, latencies):
+    latencies = np.array(latencies) * 1000
+    print(
+        "{:<12}{:>12.1f}{:>10.2f}{:>10.2f}{:>10.2f}".format(
+            name,
+            len(latencies) / elapsed,
+            np.percentile(latencies, 50),
+            np.percentile(latencies, 99),
+            latencies.max(),
+        )
+    )
+
+
+def main():
+    sess = make_session()
+    job_name = sess.list_jobs()[0]
+    input_name = sess.list_inputs()[0]
+    batch_size = sess.input_info(input_name, job_name)["shape"][0]
+    print(
+        "{} clients x {} requests of 1 sample, job {} of batch size {}".format(
+            args.num_clients, args.num_requests, job_name, batch_size
+        )
+    )
+    print(
+        "{:<12}{:>12}{:>10}{:>10}{:>10}".format(
+            "mode", "requests/s", "p50 ms", "p99 ms", "max ms"
+        )
+    )
+    # Without batching every request is launched on its own, padded to the
+    # batch size of the job by the client.
+    padded_request = make_request(sess, job_name, batch_size)
+    sess.run(job_name, **padded_request)
+    (elapsed, latencies) = sess.event_loop_.run_until_complete(
+        drive(sess, job_name, padded_request)
+    )
+    report("unbatched", elapsed, latencies)
+    sess.set_job_batching(
+        job_name,
+        max_batch_size=args.max_batch_size,
+        max_queue_delay_ms=args.max_queue_delay_ms,
+    )
+    request = make_request(sess, job_name, 1)
+    sess.run(job_name, **request)
+    (elapsed, latencies) = sess.event_loop_.run_until_complete(
+        drive(sess, job_name, request)
+    )
+    report("batched", elapsed, latencies)
+    sess.close()
+
+
+if __name__ == "__main__":
+    main()
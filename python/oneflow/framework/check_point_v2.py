@@ -13,7 +13,12 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+import concurrent.futures
+import contextlib
 import os
+import struct
+import threading
+from collections import OrderedDict
 from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
@@ -43,6 +48,8 @@ from oneflow.experimental import interface_op_read_and_write
 
 META_INFO_FILENAME = "meta"
 DATA_FILENAME = "out"
+SINGLE_FILE_MAGIC = b"OFCKPT\x00\x01"
+SINGLE_FILE_ALIGNMENT = 64
 FAKE_JOB_NAME = "system_checkpoint"
 OP_PREFIX = "system_checkpoint"
 blob_register = oneflow._oneflow_internal.GetDefaultBlobRegister()
@@ -65,40 +72,59 @@ class FileBackendVariableBlob:
         data_path = os.path.join(var_dir, DATA_FILENAME)
         assert os.path.isfile(data_path)
         self.var_dir_ = var_dir
-        meta_info_path = os.path.join(self.var_dir_, META_INFO_FILENAME)
-        if os.path.exists(meta_info_path):
-            meta_info = variable_meta_info_pb.VariableMetaInfo()
-            with open(meta_info_path) as f:
-                text_format.Parse(f.read(), meta_info)
+        self.offset_ = 0
+        if (shape is None) != (dtype is None):
+            raise RuntimeError("both or neither of shape and dtype should be None")
+        self.shape_ = shape
+        self.dtype_ = dtype
+        if shape is not None:
+            assert not os.path.exists(os.path.join(var_dir, META_INFO_FILENAME))
             self.has_meta_info_ = True
+            self._CheckDataSize()
         else:
+            # The meta info file is parsed on first use, so that loading a
+            # checkpoint does not parse it for the variables never read.
+            self.has_meta_info_ = None
+
+    def _ParseMetaInfo(self) -> None:
+        if self.has_meta_info_ is not None:
+            return
+        meta_info_path = os.path.join(self.var_dir_, META_INFO_FILENAME)
+        if not os.path.exists(meta_info_path):
             self.has_meta_info_ = False
-        if self.has_meta_info_:
-            assert dtype is None and shape is None
-            self.shape_ = tuple(meta_info.shape.dim)
-            self.dtype_ = dtype_util.convert_proto_dtype_to_oneflow_dtype(
-                meta_info.data_type
-            )
-        elif shape is not None and dtype is not None:
-            self.shape_ = shape
-            self.dtype_ = dtype
-            self.has_meta_info_ = True
-        elif shape is not None or dtype is not None:
-            raise RuntimeError("both or neither of shape and dtype should be None")
-        else:
-            pass
-        if self.has_meta_info_:
-            itemsize = np.dtype(
-                dtype_util.convert_oneflow_dtype_to_numpy_dtype(self.dtype_)
-            ).itemsize
-            assert os.path.getsize(data_path) == np.prod(self.shape).item() * itemsize
+            return
+        meta_info = variable_meta_info_pb.VariableMetaInfo()
+        with open(meta_info_path) as f:
+            text_format.Parse(f.read(), meta_info)
+        self.shape_ = tuple(meta_info.shape.dim)
+        self.dtype_ = dtype_util.convert_proto_dtype_to_oneflow_dtype(
+            meta_info.data_type
+        )
+        self._CheckDataSize()
+        self.has_meta_info_ = True
+
+    def _CheckDataSize(self) -> None:
+        itemsize = np.dtype(
+            dtype_util.convert_oneflow_dtype_to_numpy_dtype(self.dtype_)
+        ).itemsize
+        assert os.path.getsize(self.file_path) == _ElemCnt(self.shape_) * itemsize
+
+    @property
+    def has_meta_info(self) -> bool:
+        self._ParseMetaInfo()
+        return self.has_meta_info_
 
     @property
     def file_path(self) -> str:
         return os.path.join(self.var_dir_, DATA_FILENAME)
 
+    @property
+    def offset(self) -> int:
+        return self.offset_
+
     @property
     def shape(self) -> Tuple[int]:
+        self._ParseMetaInfo()
         return self.shape_
 
     @property
@@ -107,15 +133,83 @@ class FileBackendVariableBlob:
 
     @property
     def dtype(self) -> oneflow.dtype:
+        self._ParseMetaInfo()
         return self.dtype_
 
+    def read_into(self, out: np.ndarray, start: int = 0) -> np.ndarray:
+        """
+        Read the data directly into the C-contiguous array `out`, without
+        allocating an intermediate buffer. `out` may also hold the rows
+        `start:start + len(out)` of the variable along its first axis.
+        """
+        if not self.has_meta_info:
+            raise RuntimeError("This variable does not have meta info")
+        assert out.flags.c_contiguous
+        _CheckRows(self.shape, out.shape, start)
+        assert out.dtype == dtype_util.convert_oneflow_dtype_to_numpy_dtype(self.dtype)
+        data = _AsBytes(out)
+        with open(self.file_path, "rb", buffering=0) as f:
+            f.seek(self.offset + start * _RowBytes(self.shape, out.dtype))
+            pos = 0
+            while pos < len(data):
+                n = f.readinto(data[pos:])
+                if not n:
+                    raise EOFError("{} is truncated".format(self.file_path))
+                pos += n
+        return out
+
     def numpy(self) -> np.ndarray:
-        if not self.has_meta_info_:
+        if not self.has_meta_info:
             raise RuntimeError("This variable does not have meta info")
-        return np.fromfile(
-            self.file_path,
-            dtype=dtype_util.convert_oneflow_dtype_to_numpy_dtype(self.dtype),
-        ).reshape(self.shape)
+        return self.read_into(
+            np.empty(
+                self.shape,
+                dtype=dtype_util.convert_oneflow_dtype_to_numpy_dtype(self.dtype),
+            )
+        )
+
+
+class MmapVariableBlob(FileBackendVariableBlob):
+    """
+    A variable stored at `offset` of a single-file checkpoint. Its numpy() is a
+    read-only view of the memory-mapped file, so the data is only read from disk
+    when it is accessed.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        buffer: Optional[np.memmap],
+        offset: int,
+        dtype: oneflow.dtype,
+        shape: Sequence[int],
+    ):
+        self.file_path_ = file_path
+        self.buffer_ = buffer
+        self.offset_ = offset
+        self.dtype_ = dtype
+        self.shape_ = tuple(shape)
+        self.has_meta_info_ = True
+
+    @property
+    def file_path(self) -> str:
+        return self.file_path_
+
+    def numpy(self) -> np.ndarray:
+        np_dtype = np.dtype(dtype_util.convert_oneflow_dtype_to_numpy_dtype(self.dtype))
+        nbytes = _ElemCnt(self.shape) * np_dtype.itemsize
+        if nbytes == 0:
+            return np.empty(self.shape, dtype=np_dtype)
+        data = self.buffer_[self.offset_ : self.offset_ + nbytes]
+        return data.view(np_dtype).reshape(self.shape)
+
+    def read_into(self, out: np.ndarray, start: int = 0) -> np.ndarray:
+        _CheckRows(self.shape, out.shape, start)
+        value = self.numpy()
+        if out.shape != value.shape:
+            value = value[start : start + out.shape[0]]
+        np.copyto(out, value)
+        return out
 
 
 ValueContainer = Union[
@@ -127,6 +221,25 @@ def _ElemCnt(shape):
     return np.prod(shape).astype(int).item()
 
 
+def _RowBytes(shape: Sequence[int], dtype: np.dtype) -> int:
+    return _ElemCnt(shape[1:]) * np.dtype(dtype).itemsize
+
+
+def _CheckRows(shape: Sequence[int], out_shape: Sequence[int], start: int) -> None:
+    shape = tuple(shape)
+    out_shape = tuple(out_shape)
+    if start == 0 and out_shape == shape:
+        return
+    assert len(shape) > 0 and out_shape[1:] == shape[1:], "{} vs {}".format(
+        out_shape, shape
+    )
+    assert (
+        0 <= start and start + out_shape[0] <= shape[0]
+    ), "rows {}:{} are out of range for shape {}".format(
+        start, start + out_shape[0], shape
+    )
+
+
 @session_ctx.try_init_default_session
 def GetAllVariables() -> Dict[str, oneflow._oneflow_internal.EagerConsistentBlob]:
     """
@@ -150,9 +263,85 @@ def _LoadSingleVariable(path: str) -> Optional[FileBackendVariableBlob]:
     return None
 
 
+def _IsSingleFileCheckpoint(path: str) -> bool:
+    if not os.path.isfile(path):
+        return False
+    with open(path, "rb") as f:
+        return f.read(len(SINGLE_FILE_MAGIC)) == SINGLE_FILE_MAGIC
+
+
+def _AlignOffset(offset: int) -> int:
+    return (
+        (offset + SINGLE_FILE_ALIGNMENT - 1)
+        // SINGLE_FILE_ALIGNMENT
+        * SINGLE_FILE_ALIGNMENT
+    )
+
+
+# A single-file checkpoint starts with a binary index of its variables, all
+# integers are little-endian:
+#
+#   magic        8 bytes, SINGLE_FILE_MAGIC
+#   index_size   uint64, size of the index entries below
+#   num_vars     uint64
+#   num_vars entries of:
+#     name_size  uint32, followed by the utf-8 encoded name
+#     data_type  int32, the DataType enum of the proto
+#     num_axes   uint32, followed by num_axes int64 dims
+#     offset     uint64, absolute offset of the data in the file
+#
+# The data of every variable is stored contiguously at an offset aligned to
+# SINGLE_FILE_ALIGNMENT bytes, so that it can be viewed in place once the file
+# is memory-mapped.
+_INDEX_PREFIX = struct.Struct("<8sQQ")
+
+
+def _PackIndexEntry(name: str, data_type: int, shape: Sequence[int], offset: int):
+    name_bytes = name.encode("utf-8")
+    return b"".join(
+        [
+            struct.pack("<I", len(name_bytes)),
+            name_bytes,
+            struct.pack("<iI", data_type, len(shape)),
+            struct.pack("<{}q".format(len(shape)), *shape),
+            struct.pack("<Q", offset),
+        ]
+    )
+
+
+def _GetSingleFileCheckpoint(path: str) -> Dict[str, MmapVariableBlob]:
+    with open(path, "rb") as f:
+        (magic, index_size, num_vars) = _INDEX_PREFIX.unpack(f.read(_INDEX_PREFIX.size))
+        assert magic == SINGLE_FILE_MAGIC, "{} is not a checkpoint file".format(path)
+        index = f.read(index_size)
+    # np.memmap can not map an empty file, which only happens if there is no
+    # data at all
+    buffer = None
+    if os.path.getsize(path) > 0:
+        buffer = np.memmap(path, dtype=np.uint8, mode="r")
+    var_dict = {}
+    pos = 0
+    for _ in range(num_vars):
+        (name_size,) = struct.unpack_from("<I", index, pos)
+        pos += 4
+        name = index[pos : pos + name_size].decode("utf-8")
+        pos += name_size
+        (data_type, num_axes) = struct.unpack_from("<iI", index, pos)
+        pos += 8
+        shape = struct.unpack_from("<{}q".format(num_axes), index, pos)
+        pos += 8 * num_axes
+        (offset,) = struct.unpack_from("<Q", index, pos)
+        pos += 8
+        dtype = dtype_util.convert_proto_dtype_to_oneflow_dtype(data_type)
+        var_dict[name] = MmapVariableBlob(path, buffer, offset, dtype, shape)
+    return var_dict
+
+
 def _GetCheckpoint(
     path: str,
 ) -> Union[Dict[str, FileBackendVariableBlob], FileBackendVariableBlob]:
+    if _IsSingleFileCheckpoint(path):
+        return _GetSingleFileCheckpoint(path)
     assert os.path.isdir(path), "Directory {} doesn't exist!".format(path)
     single_var = _LoadSingleVariable(path)
     if single_var is not None:
@@ -182,6 +371,133 @@ def Load(
     return _GetCheckpoint(path)
 
 
+class _PrefetchedStateDict(dict):
+    """
+    A copy of a state dict whose file backed values are read by a thread pool
+    ahead of time. Getting such a value returns the array read for it, later
+    reads are submitted as the earlier ones are consumed, so that at most
+    `window` arrays are held in memory at once.
+    """
+
+    def __init__(self, state_dict, keys, pool, window):
+        super().__init__(state_dict)
+        self._metadata = getattr(state_dict, "_metadata", None)
+        self.pending_keys_ = OrderedDict((key, None) for key in keys)
+        self.futures_ = {}
+        self.pool_ = pool
+        for _ in range(window):
+            self._SubmitNext()
+
+    def _SubmitNext(self) -> None:
+        if len(self.pending_keys_) == 0:
+            return
+        (key, _) = self.pending_keys_.popitem(last=False)
+        self.futures_[key] = self.pool_.submit(
+            _ReadPrefetchedValue, super().__getitem__(key)
+        )
+
+    def __getitem__(self, key):
+        future = self.futures_.pop(key, None)
+        if future is None:
+            # read out of order, leave it to the caller
+            self.pending_keys_.pop(key, None)
+            return super().__getitem__(key)
+        self._SubmitNext()
+        return future.result()
+
+    def Cancel(self) -> None:
+        self.pending_keys_.clear()
+        for future in self.futures_.values():
+            future.cancel()
+
+
+def _ReadPrefetchedValue(value: FileBackendVariableBlob):
+    # a variable without meta info can not be read on its own
+    if not value.has_meta_info:
+        return value
+    return value.numpy()
+
+
+@contextlib.contextmanager
+def PrefetchVariables(state_dict, keys: Iterable[str], num_threads=None):
+    """
+    Read the directory backed variables of `state_dict` named by `keys`
+    concurrently, in the order of `keys`. The meta info and the data of each
+    variable are both read by the pool, the other values of `state_dict` are
+    left as they are.
+    """
+    keys = [
+        key
+        for key in keys
+        if isinstance(state_dict.get(key), FileBackendVariableBlob)
+        # already a view of the mapped file
+        and not isinstance(state_dict[key], MmapVariableBlob)
+    ]
+    if len(keys) == 0:
+        yield state_dict
+        return
+    if num_threads is None:
+        num_threads = min(32, (os.cpu_count() or 1) + 4)
+    with concurrent.futures.ThreadPoolExecutor(
+        num_threads, thread_name_prefix="oneflow_checkpoint_reader"
+    ) as pool:
+        prefetched = _PrefetchedStateDict(state_dict, keys, pool, 2 * num_threads)
+        try:
+            yield prefetched
+        finally:
+            prefetched.Cancel()
+
+
+def AssignValueToTensor(
+    tensor: "oneflow.Tensor", value: ValueContainer, chunk_bytes: int = 64 << 20
+) -> None:
+    """
+    Copy `value` into the storage of the local `tensor` in place. Tensors are
+    assigned on the device of `tensor`, file backed values are read through a
+    staging buffer of at most `chunk_bytes` and assigned slice by slice along
+    the first axis, so the value is never held in host memory as a whole.
+    """
+    if isinstance(value, oneflow.Tensor):
+        assert tensor.dtype == value.dtype, "{} vs {}".format(tensor.dtype, value.dtype)
+        with oneflow.no_grad():
+            tensor[...] = value.to(tensor.device)
+        return
+    if isinstance(value, np.ndarray):
+        tensor.copy_(value)
+        return
+    assert isinstance(value, FileBackendVariableBlob), "Unknown value type: {}".format(
+        type(value).__name__
+    )
+    if not value.has_meta_info:
+        value = FileBackendVariableBlob(value.var_dir_, tensor.dtype, tensor.shape)
+    shape = tuple(value.shape)
+    assert shape == tuple(tensor.shape), "{} vs {}".format(shape, tensor.shape)
+    assert tensor.dtype == value.dtype, "{} vs {}".format(tensor.dtype, value.dtype)
+    np_dtype = np.dtype(dtype_util.convert_oneflow_dtype_to_numpy_dtype(value.dtype))
+    row_bytes = _RowBytes(shape, np_dtype)
+    if len(shape) == 0 or shape[0] * row_bytes <= chunk_bytes:
+        tensor.copy_(value.numpy())
+        return
+    rows_per_chunk = max(1, chunk_bytes // max(row_bytes, 1))
+    if isinstance(value, MmapVariableBlob):
+        # slices of the mapped file, only the pages being assigned are read
+        source = value.numpy()
+        staging = None
+    else:
+        source = None
+        staging = np.empty((rows_per_chunk,) + shape[1:], dtype=np_dtype)
+    with oneflow.no_grad():
+        for start in range(0, shape[0], rows_per_chunk):
+            stop = min(start + rows_per_chunk, shape[0])
+            if source is not None:
+                chunk = source[start:stop]
+            else:
+                chunk = value.read_into(staging[: stop - start], start)
+            tensor[start:stop] = oneflow.tensor(
+                chunk, dtype=tensor.dtype, device=tensor.device
+            )
+
+
 def _GetOpNameFromLbn(lbn):
     return lbn.split("/")[0]
 
@@ -230,6 +546,7 @@ def _ReadSlice(
             dtype_util.convert_oneflow_dtype_to_numpy_dtype(container.dtype)
         )
         with open(container.file_path, "rb") as f:
+            f.seek(container.offset)
 
             def ReadFromFile(_, start_nd_idx, stop_nd_idx):
                 length = _ElemCnt(np.array(stop_nd_idx) - np.array(start_nd_idx))
@@ -252,15 +569,7 @@ def _ReadSlice(
         raise RuntimeError("Unknown type: {}".format(type(container).__name__))
 
 
-def _SaveVarDict(
-    path: str,
-    var_dict: Optional[
-        Dict[str, Union[FileBackendVariableBlob, EagerBlobTrait]]
-    ] = None,
-) -> None:
-    if var_dict is None:
-        var_dict = GetAllVariables()
-
+def _AssertIsNotFileOrNonEmptyDir(path: str) -> None:
     def IsFileOrNonEmptyDir(path):
         if os.path.isfile(path):
             return True
@@ -273,25 +582,247 @@ def _SaveVarDict(
     ), "{} is a file or non-empty directory! Note that flow.save is different from torch.save. It saves each weight as a separated file so that a directory instead of a file should be given.".format(
         path
     )
+
+
+def _AsBytes(array: np.ndarray) -> memoryview:
+    """
+    View the data of `array` as bytes, so that it can be written without the
+    extra copy of `array.tobytes()`
+    """
+    return memoryview(np.ascontiguousarray(array).reshape(-1).view(np.uint8))
+
+
+def _MetaInfoString(var: Union[ValueContainer, "_HostSnapshot"]) -> str:
+    meta_info = variable_meta_info_pb.VariableMetaInfo()
+    meta_info.shape.dim[:] = var.shape
+    meta_info.data_type = oneflow._oneflow_internal.deprecated.GetProtoDtype4OfDtype(
+        var.dtype
+    )
+    return text_format.MessageToString(meta_info)
+
+
+def _SaveVarDict(
+    path: str,
+    var_dict: Optional[
+        Dict[str, Union[FileBackendVariableBlob, EagerBlobTrait]]
+    ] = None,
+) -> None:
+    if var_dict is None:
+        var_dict = GetAllVariables()
+    _AssertIsNotFileOrNonEmptyDir(path)
     os.makedirs(path, exist_ok=True)
     for (name, var) in var_dict.items():
-        meta_info = variable_meta_info_pb.VariableMetaInfo()
-        meta_info.shape.dim[:] = var.shape
-        meta_info.data_type = oneflow._oneflow_internal.deprecated.GetProtoDtype4OfDtype(
-            var.dtype
-        )
         var_dir = os.path.join(path, name)
         param_path = os.path.join(var_dir, DATA_FILENAME)
         os.makedirs(os.path.dirname(param_path))
         with open(param_path, "wb") as f:
             for (_, _, slice) in _ReadSlice(var):
-                f.write(slice.tobytes())
+                f.write(_AsBytes(slice))
         with open(os.path.join(var_dir, META_INFO_FILENAME), "w") as f:
-            f.write(text_format.MessageToString(meta_info))
+            f.write(_MetaInfoString(var))
     with open(os.path.join(path, "snapshot_done"), "w"):
         pass
 
 
+def _SingleFileLayout(
+    var_dict: Dict[str, Union[FileBackendVariableBlob, EagerBlobTrait]],
+) -> Tuple[bytes, List[Tuple[Any, int]]]:
+    """
+    Return the header of a single-file checkpoint of `var_dict` and the
+    (var, offset) of every variable
+    """
+    entries = []
+    for (name, var) in var_dict.items():
+        data_type = oneflow._oneflow_internal.deprecated.GetProtoDtype4OfDtype(
+            var.dtype
+        )
+        itemsize = np.dtype(
+            dtype_util.convert_oneflow_dtype_to_numpy_dtype(var.dtype)
+        ).itemsize
+        entries.append((name, var, data_type, _ElemCnt(var.shape) * itemsize))
+    # the size of the index does not depend on the offsets
+    index_size = sum(
+        len(_PackIndexEntry(name, data_type, var.shape, 0))
+        for (name, var, data_type, _) in entries
+    )
+    offset = _INDEX_PREFIX.size + index_size
+    index = [_INDEX_PREFIX.pack(SINGLE_FILE_MAGIC, index_size, len(entries))]
+    placements = []
+    for (name, var, data_type, nbytes) in entries:
+        offset = _AlignOffset(offset)
+        index.append(_PackIndexEntry(name, data_type, var.shape, offset))
+        placements.append((var, offset))
+        offset += nbytes
+    return (b"".join(index), placements)
+
+
+def _SaveVarDictToFile(
+    path: str, var_dict: Dict[str, Union[FileBackendVariableBlob, EagerBlobTrait]],
+) -> None:
+    assert not os.path.exists(path), "{} already exists!".format(path)
+    (header, placements) = _SingleFileLayout(var_dict)
+    # The file only appears under its name once it is complete, like the
+    # "snapshot_done" file of a checkpoint directory.
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        for (var, offset) in placements:
+            f.write(b"\0" * (offset - f.tell()))
+            for (_, _, slice) in _ReadSlice(var):
+                f.write(_AsBytes(slice))
+    os.replace(tmp_path, path)
+
+
+class AsyncSaveHandle(object):
+    """
+    Returned by `flow.save(..., blocking=False)`. The values were already
+    snapshotted when it is returned, the checkpoint is complete and durable
+    on disk once `wait()` returns.
+    """
+
+    def __init__(self, future: concurrent.futures.Future):
+        self._future = future
+
+    def done(self) -> bool:
+        return self._future.done()
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """
+        Block until the checkpoint is written and synced, and re-raise the
+        exception of the background save if it failed.
+        """
+        self._future.result(timeout)
+
+
+class _HostSnapshot(object):
+    """
+    A copy of the value of a variable in host memory
+    """
+
+    def __init__(self, array: np.ndarray, dtype: oneflow.dtype):
+        self.array = array
+        self.dtype = dtype
+
+    @property
+    def shape(self) -> Tuple[int]:
+        return self.array.shape
+
+
+def _Snapshot(var: ValueContainer) -> Union[_HostSnapshot, FileBackendVariableBlob]:
+    if isinstance(var, FileBackendVariableBlob):
+        # checkpoint files are never modified, so they are read by the writers
+        return var
+    if isinstance(var, np.ndarray):
+        dtype = dtype_util.convert_numpy_dtype_to_oneflow_dtype(var.dtype)
+        return _HostSnapshot(var.copy(), dtype)
+    array = var.numpy()
+    if not array.flags.owndata:
+        # numpy() may be a view of the tensor, which training goes on updating
+        array = array.copy()
+    return _HostSnapshot(array, var.dtype)
+
+
+def _Fsync(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _PWriteAll(fd: int, data: memoryview, offset: int) -> None:
+    while len(data) > 0:
+        written = os.pwrite(fd, data, offset)
+        data = data[written:]
+        offset += written
+
+
+def _WriteSnapshotDir(path, snapshots, pool):
+    def WriteVar(name, value):
+        var_dir = os.path.join(path, name)
+        os.makedirs(var_dir)
+        with open(os.path.join(var_dir, DATA_FILENAME), "wb") as f:
+            if isinstance(value, _HostSnapshot):
+                f.write(_AsBytes(value.array))
+            else:
+                for (_, _, slice) in _ReadSlice(value):
+                    f.write(_AsBytes(slice))
+        with open(os.path.join(var_dir, META_INFO_FILENAME), "w") as f:
+            f.write(_MetaInfoString(value))
+        return var_dir
+
+    futures = [pool.submit(WriteVar, name, value) for (name, value) in snapshots]
+    var_dirs = [future.result() for future in futures]
+    # Sync all the files only once everything is written, so that the disk can
+    # batch the writes instead of flushing every file on its own.
+    synced = []
+    for var_dir in var_dirs:
+        for filename in (DATA_FILENAME, META_INFO_FILENAME):
+            synced.append(pool.submit(_Fsync, os.path.join(var_dir, filename)))
+        synced.append(pool.submit(_Fsync, var_dir))
+    for future in synced:
+        future.result()
+    with open(os.path.join(path, "snapshot_done"), "w") as f:
+        os.fsync(f.fileno())
+    _Fsync(path)
+
+
+def _WriteSnapshotFile(path, snapshots, pool):
+    (header, placements) = _SingleFileLayout(dict(snapshots))
+    tmp_path = path + ".tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        _PWriteAll(fd, memoryview(header), 0)
+
+        def WriteVar(value, offset):
+            if isinstance(value, _HostSnapshot):
+                _PWriteAll(fd, _AsBytes(value.array), offset)
+                return
+            np_dtype = np.dtype(
+                dtype_util.convert_oneflow_dtype_to_numpy_dtype(value.dtype)
+            )
+            for (start, _, slice) in _ReadSlice(value):
+                start_idx = np.ravel_multi_index(start, value.shape)
+                _PWriteAll(fd, _AsBytes(slice), offset + start_idx * np_dtype.itemsize)
+
+        futures = [pool.submit(WriteVar, var, offset) for (var, offset) in placements]
+        for future in futures:
+            future.result()
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.replace(tmp_path, path)
+    _Fsync(os.path.dirname(os.path.abspath(path)))
+
+
+def _SaveVarDictAsync(path, var_dict, single_file, num_threads):
+    if single_file:
+        assert not os.path.exists(path), "{} already exists!".format(path)
+    else:
+        _AssertIsNotFileOrNonEmptyDir(path)
+    # Only the snapshot blocks the caller, the values may be updated as soon
+    # as it is taken.
+    snapshots = [(name, _Snapshot(var)) for (name, var) in var_dict.items()]
+    future = concurrent.futures.Future()
+
+    def Run():
+        try:
+            with concurrent.futures.ThreadPoolExecutor(num_threads) as pool:
+                if single_file:
+                    _WriteSnapshotFile(path, snapshots, pool)
+                else:
+                    os.makedirs(path, exist_ok=True)
+                    _WriteSnapshotDir(path, snapshots, pool)
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+
+    # not a daemon thread, so that a pending save still completes at exit
+    threading.Thread(target=Run, name="oneflow_checkpoint_writer").start()
+    return AsyncSaveHandle(future)
+
+
 @session_ctx.try_init_default_session
 def SaveVarDict(
     path: str,
@@ -306,7 +837,20 @@ def SaveVarDict(
     return _SaveVarDict(path, var_dict)
 
 
-def save(obj, save_dir):
+def save(obj, save_dir, single_file=False, blocking=True, num_threads=None):
+    """
+    Save the variables of `obj` to `save_dir`. With `single_file=True`, all of
+    them are written into the single file `save_dir`.
+
+    With `blocking=False`, the values are snapshotted to host memory and the
+    files are written by a pool of `num_threads` threads in the background,
+    an `AsyncSaveHandle` is returned whose `wait()` blocks until the
+    checkpoint is durable on disk.
+    """
+    if not blocking:
+        return _SaveVarDictAsync(save_dir, obj, single_file, num_threads)
+    if single_file:
+        return _SaveVarDictToFile(save_dir, obj)
     return _SaveVarDict(save_dir, obj)
 
 
@@ -456,7 +1000,7 @@ def FeedValueToVariable(
         value, (EagerBlobTrait, FileBackendVariableBlob, np.ndarray, oneflow.Tensor)
     ), "Unknown value type: {}".format(type(value).__name__)
     if isinstance(value, FileBackendVariableBlob):
-        if not value.has_meta_info_:
+        if not value.has_meta_info:
             value = FileBackendVariableBlob(
                 value.var_dir_, var_blob.dtype, var_blob.shape
             )
@@ -242,8 +242,13 @@ def _AddAndInferMirroredOp(mirrored_lbn, op_conf, sub_consistent_blob_list):
         )
 
 
-def _MakePushNdarrayCallback(ndarray):
-    copied = np.copy(ndarray, order="C")
+def _MakePushNdarrayCallback(ndarray, copy=True):
+    # Without `copy` the caller guarantees that `ndarray` is not written
+    # before the push job has run.
+    if copy:
+        copied = np.copy(ndarray, order="C")
+    else:
+        copied = np.ascontiguousarray(ndarray)
 
     def Copy(ofblob):
         capacity = reduce(lambda x, y: x * y, ofblob.static_shape, 1)
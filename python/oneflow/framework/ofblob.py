@@ -66,8 +66,8 @@ class OfBlob(object):
     def is_dynamic(self):
         return oneflow._oneflow_internal.OfBlob_IsDynamic(self.of_blob_ptr_)
 
-    def CopyToNdarray(self):
-        return self._CopyToNdarray()
+    def CopyToNdarray(self, out=None):
+        return self._CopyToNdarray(out)
 
     def CopyFromNdarray(self, src_ndarray):
         if self.is_dynamic:
@@ -88,7 +88,7 @@ class OfBlob(object):
         copy_method = getattr(oneflow._oneflow_internal, method_name)
         copy_method(self.of_blob_ptr_, src_ndarray)
 
-    def _CopyToNdarray(self):
+    def _CopyToNdarray(self, out=None):
         method_name = oneflow._oneflow_internal.Dtype_GetOfBlobCopyToBufferFuncName(
             oneflow._oneflow_internal.deprecated.GetProtoDtype4OfDtype(self.dtype)
         )
@@ -96,8 +96,21 @@ class OfBlob(object):
         shape_tensor = np.zeros(self.num_axes, dtype=np.int64)
         oneflow._oneflow_internal.OfBlob_CopyShapeTo(self.of_blob_ptr_, shape_tensor)
         shape = tuple(shape_tensor.tolist())
-        tensor = np.zeros(
-            shape, dtype=flow.convert_oneflow_dtype_to_numpy_dtype(self.dtype)
-        )
+        np_dtype = flow.convert_oneflow_dtype_to_numpy_dtype(self.dtype)
+        if out is None:
+            # every element is overwritten by the copy
+            tensor = np.empty(shape, dtype=np_dtype)
+        else:
+            assert out.dtype == np_dtype, "%s v.s. %s" % (out.dtype, np_dtype)
+            assert out.flags.c_contiguous
+            if out.shape != shape:
+                # a dynamic blob fills the leading rows of a larger buffer
+                assert (
+                    len(shape) > 0
+                    and out.shape[1:] == shape[1:]
+                    and out.shape[0] >= shape[0]
+                ), "%s v.s. %s" % (out.shape, shape)
+                out = out[: shape[0]]
+            tensor = out
         copy_method(self.of_blob_ptr_, tensor)
         return tensor
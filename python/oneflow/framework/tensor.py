@@ -66,6 +66,72 @@ def _local_tensor_numpy(eager_local_tensor):
     return ndarray
 
 
+def _local_tensor_numpy_view(eager_local_tensor):
+    """Returns an ndarray sharing the memory of `eager_local_tensor`, or None if
+    the tensor is not a contiguous CPU tensor. The array keeps the tensor alive.
+
+    The ops writing the tensor are waited for only when the array is created.
+    Ops launched on the tensor afterwards run asynchronously and may still be
+    writing it while the array is read, so the array is only valid until the
+    next op on the tensor. Taking a new view waits for them again."""
+    if (
+        eager_local_tensor.dtype == flow.tensor_buffer
+        or eager_local_tensor.device.type != "cpu"
+        or not eager_local_tensor.is_contiguous()
+    ):
+        return None
+    method_name = eager_local_tensor._get_mirrored_tensor_to_numpy_view_func_name()
+    return getattr(eager_local_tensor, method_name)()
+
+
+def _local_tensor_numpy_view_or_copy(eager_local_tensor):
+    ndarray = _local_tensor_numpy_view(eager_local_tensor)
+    if ndarray is None:
+        ndarray = _local_tensor_numpy(eager_local_tensor)
+    return ndarray
+
+
+@register_local_tensor_method("__array__")
+def _local_tensor_array(eager_local_tensor, dtype=None):
+    ndarray = _local_tensor_numpy_view_or_copy(eager_local_tensor)
+    if not isinstance(ndarray, np.ndarray):
+        # a tensor buffer is converted to a list of arrays
+        return np.asarray(ndarray, dtype=dtype)
+    if dtype is not None and ndarray.dtype != dtype:
+        ndarray = ndarray.astype(dtype)
+    return ndarray
+
+
+def from_numpy(ndarray):
+    r"""Creates a CPU tensor sharing the memory of `ndarray`, which must be a
+    writeable C-contiguous array of a numeric dtype.
+
+    The tensor and the array share their memory, and the array is kept alive
+    until the tensor is released. The tensor does not require grad.
+
+    Ops on the tensor run asynchronously. After launching ops on the tensor,
+    call ``np.asarray(tensor)`` to wait for them before reading or writing
+    `ndarray` again.
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import numpy as np
+        >>> import oneflow as flow
+
+        >>> np_arr = np.arange(6, dtype=np.float32).reshape(2, 3)
+        >>> tensor = flow.from_numpy(np_arr)
+        >>> np_arr[0, 0] = 10
+        >>> tensor.numpy()[0, 0]
+        10.0
+
+    """
+    if not isinstance(ndarray, np.ndarray):
+        raise TypeError("expected np.ndarray, got {}".format(type(ndarray).__name__))
+    return Tensor(oneflow._oneflow_internal._make_mirrored_tensor_from_numpy(ndarray))
+
+
 @register_local_tensor_method("copy_")
 def _copy_from_numpy_to_eager_local_tensor(eager_local_tensor, np_arr):
     method_name = eager_local_tensor._get_copy_mirrored_tensor_from_numpy_func_name()
@@ -386,7 +452,7 @@ class Tensor:
 
     @register_local_tensor_method()
     def tolist(self):
-        return self.numpy().tolist()
+        return np.asarray(self).tolist()
 
     @_auto_determine
     @register_local_tensor_method()
@@ -497,8 +563,12 @@ class Tensor:
     def __le__(self, other):
         return self.le(other)
 
-    def __array__(self):
-        TODO()
+    @_auto_determine
+    def __array__(self, dtype=None):
+        internal_tensor = self._local_or_consistent_tensor
+        if not internal_tensor.is_lazy and (not internal_tensor.is_consistent):
+            return _local_tensor_array(internal_tensor, dtype)
+        raise NotImplementedError()
 
     def __sizeof__(self):
         TODO()
@@ -49,6 +49,6 @@ def _gen_tensor_str(tensor):
     elif tensor.requires_grad:
         suffixes.append("requires_grad=True")
     tensor_str = np.array2string(
-        tensor.numpy(), precision=4, separator=", ", prefix=prefix
+        np.asarray(tensor), precision=4, separator=", ", prefix=prefix
     )
     return _add_suffixes(prefix + tensor_str, suffixes, indent)
@@ -13,10 +13,14 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
-from collections import OrderedDict
+import hashlib
+import os
+import time
+from collections import OrderedDict, namedtuple
 from functools import partial
-from typing import Dict
+from typing import Dict, Sequence
 
+import oneflow as flow
 import oneflow._oneflow_internal
 import oneflow.framework.c_api_util as c_api_util
 import oneflow.framework.graph_build_util as graph_build_util
@@ -31,6 +35,22 @@ from oneflow.nn.module import Module
 from oneflow.nn.optimizer.optimizer import Optimizer
 from oneflow.nn.utils import add_indent
 
+CompileCacheInfo = namedtuple(
+    "CompileCacheInfo",
+    ["hits", "misses", "evictions", "size", "compile_time", "disk_hits"],
+)
+
+
+class _CompiledPlan(object):
+    """The job compiled for one input signature and its runtime."""
+
+    def __init__(self, name, c_nn_graph):
+        self.name = name
+        self.c_nn_graph = c_nn_graph
+        self.outputs = None
+        self.eager_outputs = None
+        self.job_proto = None
+
 
 class Graph(object):
     _child_init_cnt = dict()
@@ -44,7 +64,15 @@ class Graph(object):
         self._optimizers = OrderedDict()
         self._is_compiled = False
         self._var2var_op_name = dict()
-        self._job_proto = None
+        # compiled plans keyed on the shapes and dtypes of the inputs, in
+        # least recently used order
+        self._plans = OrderedDict()
+        self._num_compiled_plans = 0
+        self._cache_hits = 0
+        self._cache_misses = 0
+        self._cache_evictions = 0
+        self._compile_time = 0.0
+        self._disk_hits = 0
 
     @property
     def name(self):
@@ -56,11 +84,27 @@ class Graph(object):
 
     @property
     def _graph_proto(self):
-        return self._job_proto
+        if len(self._plans) == 0:
+            return None
+        # the job of the most recently used plan
+        return next(reversed(self._plans.values())).job_proto
 
     def build(self, *args):
         raise NotImplementedError()
 
+    def compile_cache_info(self):
+        """Returns the hits, misses and evictions of the cache of compiled
+        plans, its current size, the total seconds spent compiling and how
+        many compilations loaded the completed job from the on-disk cache."""
+        return CompileCacheInfo(
+            self._cache_hits,
+            self._cache_misses,
+            self._cache_evictions,
+            len(self._plans),
+            self._compile_time,
+            self._disk_hits,
+        )
+
     def add_optimizer(
         self,
         name: str,
@@ -110,12 +154,72 @@ class Graph(object):
         for (name, opt_config) in self._optimizers.items():
             self.config.add_optimizer_config(opt_config, self._var2var_op_name)
 
+    def _reset_lazy_state(self):
+        # The lazy tensors and scopes built while tracing belong to the job
+        # they were built in, so they are rebuilt for every new plan.
+        def reset(block):
+            if block.type == BlockType.MODULE:
+                block._scope = None
+                block._prev_scope = None
+            else:
+                block._lazy_origin = None
+
+        for (_, b) in self._blocks.items():
+            for m in b.modules():
+                reset(m)
+                for (_, child) in m._parameters.items():
+                    reset(child)
+                for (_, child) in m._buffers.items():
+                    reset(child)
+
+    def _check_block_configs(self):
+        # The options are only read by the passes of training jobs, and stages
+        # are only pipelined over micro-batches.
+        for (_, b) in self._blocks.items():
+            for m in b.modules():
+                name = m.name_prefix + m.name
+                if m.config.activation_checkpointing and not self.training:
+                    raise ValueError(
+                        "activation_checkpointing of block {} cannot take effect, "
+                        "nn.Graph {} has no optimizer".format(name, self._name)
+                    )
+                if (
+                    m.config.stage_id is not None
+                    and m.config.stage_id > 0
+                    and self.config.gradient_accumulation_steps <= 1
+                ):
+                    raise ValueError(
+                        "stage_id of block {} cannot take effect, set the "
+                        "gradient accumulation steps of nn.Graph {} to "
+                        "pipeline the stages".format(name, self._name)
+                    )
+
     def _compile(self, *args):
-        assert not self._is_compiled, (
-            "nn.Graph " + self._name + " has already been compiled."
-        )
-        self._preprocess_state()
-        self._complete_graph_config()
+        start = time.perf_counter()
+        num_micro_batches = self.config.gradient_accumulation_steps
+        if num_micro_batches > 1:
+            for arg in args:
+                assert len(arg.shape) > 0 and arg.shape[0] % num_micro_batches == 0, (
+                    "dim 0 of the inputs must be divisible by the "
+                    "gradient accumulation steps " + str(num_micro_batches)
+                )
+                assert arg.shape[0] == args[0].shape[0], (
+                    "the inputs are split into micro-batches along dim 0, "
+                    "so they must have the same dim 0"
+                )
+        if not self._is_compiled:
+            self._check_block_configs()
+            self._preprocess_state()
+            self._complete_graph_config()
+            plan = _CompiledPlan(self._name, self._c_nn_graph)
+        else:
+            name = self._name + "_plan_" + str(self._num_compiled_plans)
+            self.config.proto.set_job_name(name)
+            plan = _CompiledPlan(
+                name, oneflow._oneflow_internal.nn.graph.CNNGraph(name)
+            )
+            self._reset_lazy_state()
+        self._num_compiled_plans += 1
         session = session_ctx.GetDefaultSession()
         assert type(session) is MultiClientSession
         session.TryInit()
@@ -123,7 +227,7 @@ class Graph(object):
             lazy_args = []
             lazy_arg_op_names = []
             for (idx, arg) in enumerate(args):
-                op_name = "_" + self.name + "-input_" + str(idx)
+                op_name = "_" + plan.name + "-input_" + str(idx)
                 lazy_args.append(graph_build_util.build_graph_input_arg(op_name, arg))
                 lazy_arg_op_names.append(op_name)
             state_op_names = []
@@ -147,7 +251,7 @@ class Graph(object):
             eager_outputs = []
             eager_output_op_names = []
             for (idx, out) in enumerate(outputs):
-                op_name = "_" + self.name + "-output_" + str(idx)
+                op_name = "_" + plan.name + "-output_" + str(idx)
                 eager_outputs.append(graph_build_util.build_graph_output(op_name, out))
                 eager_output_op_names.append(op_name)
             if len(eager_outputs) == 0:
@@ -156,31 +260,117 @@ class Graph(object):
                 eager_outputs = eager_outputs[0]
             else:
                 eager_outputs = tuple(eager_outputs)
-            self._outputs = convert_to_tensor_tuple(eager_outputs)
-            self._eager_outputs = eager_outputs
-            self._c_nn_graph.register_input_op_names(lazy_arg_op_names)
-            self._c_nn_graph.register_output_op_names(eager_output_op_names)
-            self._c_nn_graph.register_variable_op_names_and_tensors(
+            plan.outputs = convert_to_tensor_tuple(eager_outputs)
+            plan.eager_outputs = eager_outputs
+            plan.c_nn_graph.register_input_op_names(lazy_arg_op_names)
+            plan.c_nn_graph.register_output_op_names(eager_output_op_names)
+            plan.c_nn_graph.register_variable_op_names_and_tensors(
                 state_op_names, self._variables
             )
-            self._job_proto = c_api_util.GetCurrentJob()
-        self._c_nn_graph.complie_and_init_runtime()
+            plan.job_proto = c_api_util.GetCurrentJob()
+        plan.c_nn_graph.complie_and_init_runtime(self._job_cache_path(plan.job_proto))
+        if plan.c_nn_graph.job_loaded_from_cache:
+            self._disk_hits += 1
         self._is_compiled = True
-        return eager_outputs
-
-    def _launch(self, *args):
+        self._compile_time += time.perf_counter() - start
+        signature = self._signature(args)
+        self._plans[signature] = plan
+        self._plans.move_to_end(signature)
+        if len(self._plans) > self.config.compile_cache_size:
+            (_, evicted) = self._plans.popitem(last=False)
+            if evicted.c_nn_graph is self._c_nn_graph:
+                # drop the last reference to the runtime of the first plan
+                self._c_nn_graph = None
+            self._cache_evictions += 1
+        return plan.eager_outputs
+
+    def _job_cache_path(self, job_proto):
+        cache_dir = self.config.compile_cache_dir
+        if cache_dir is None:
+            return ""
+        os.makedirs(cache_dir, exist_ok=True)
+        # The job proto holds the traced graph and its config, the completed
+        # job also depends on the resource and on the job passes.
+        key = hashlib.sha256()
+        key.update(flow.__version__.encode("utf-8"))
+        key.update(oneflow._oneflow_internal.CurrentResource().encode("utf-8"))
+        key.update(job_proto.SerializeToString(deterministic=True))
+        return os.path.join(cache_dir, key.hexdigest() + ".job")
+
+    def _launch(self, plan, *args):
         oneflow._oneflow_internal.nn.graph.RunLazyNNGraph(
             convert_to_tensor_tuple(args),
-            self._outputs,
+            plan.outputs,
             self._variables,
-            self._c_nn_graph,
+            plan.c_nn_graph,
         )
-        return self._eager_outputs
+        return plan.eager_outputs
+
+    @staticmethod
+    def _signature(args):
+        return tuple((tuple(arg.shape), arg.dtype) for arg in args)
+
+    def _get_plan(self, *args):
+        signature = self._signature(args)
+        plan = self._plans.get(signature)
+        if plan is not None:
+            self._cache_hits += 1
+            self._plans.move_to_end(signature)
+            return plan
+        if self._is_compiled and self.training:
+            # The optimizer state, e.g. the train step, the learning rate and
+            # the loss scale, is built into every job, so the plans of
+            # different signatures would update the variables independently.
+            raise RuntimeError(
+                "nn.Graph {} with optimizers only supports the input signature "
+                "it was compiled for, {}, got {}".format(
+                    self._name, next(iter(self._plans)), signature
+                )
+            )
+        self._cache_misses += 1
+        self._compile(*args)
+        return self._plans[signature]
+
+    def _pad_args(self, args):
+        # Pads dim 0 of every input up to the smallest bucket that holds it,
+        # returns the padded inputs and the original batch size.
+        buckets = self.config.batch_size_buckets
+        if buckets is None or len(args) == 0:
+            return (args, None)
+        batch_size = args[0].shape[0]
+        assert all(
+            arg.shape[0] == batch_size for arg in args
+        ), "all inputs must have the same batch size to be padded"
+        bucket = next((b for b in buckets if b >= batch_size), None)
+        if bucket is None or bucket == batch_size:
+            return (args, None)
+        padded_args = []
+        for arg in args:
+            padding = flow.zeros(
+                (bucket - batch_size,) + tuple(arg.shape[1:]),
+                dtype=arg.dtype,
+                device=arg.device,
+            )
+            padded_args.append(flow.cat([arg, padding], dim=0))
+        return (tuple(padded_args), batch_size)
 
     def __call__(self, *args):
-        if not self._is_compiled:
-            self._compile(*args)
-        return self._launch(*args)
+        (args, batch_size) = self._pad_args(args)
+        outputs = self._launch(self._get_plan(*args), *args)
+        if batch_size is None:
+            return outputs
+        padded_size = args[0].shape[0]
+
+        def unpad(out):
+            if len(out.shape) > 0 and out.shape[0] == padded_size:
+                return out[:batch_size]
+            return out
+
+        if isinstance(outputs, tuple):
+            return tuple(unpad(out) for out in outputs)
+        if outputs is None:
+            return outputs
+        return unpad(outputs)
 
     def _add_block(self, name: str, module: Module = None) -> None:
         """Adds a module to the current graph as a block.
@@ -246,6 +436,10 @@ class GraphConfig(FunctionConfig):
     def __init__(self):
         super().__init__()
         self._train(False)
+        self._compile_cache_size = 8
+        self._batch_size_buckets = None
+        self._compile_cache_dir = os.getenv("ONEFLOW_GRAPH_COMPILE_CACHE_DIR")
+        self._dynamic_loss_scale_policy = None
 
     @property
     def proto(self):
@@ -259,10 +453,152 @@ class GraphConfig(FunctionConfig):
             return False
         raise NotImplementedError
 
+    @property
+    def compile_cache_size(self):
+        return self._compile_cache_size
+
+    def set_compile_cache_size(self, size: int):
+        """Sets how many compiled plans the graph keeps, one for every input
+        signature. The least recently used plan is evicted first.
+
+        Graphs with optimizers are only compiled for the signature of their
+        first call, since every plan would have its own optimizer state.
+        """
+        assert type(size) is int and size > 0, "size must be a positive int"
+        self._compile_cache_size = size
+
+    @property
+    def compile_cache_dir(self):
+        return self._compile_cache_dir
+
+    def set_compile_cache_dir(self, path: str = None):
+        """Caches the completed job of the graph on disk under `path`,
+        defaults to the ONEFLOW_GRAPH_COMPILE_CACHE_DIR environment variable.
+
+        The cache is keyed on the traced job, which includes this config, the
+        resource and the OneFlow version. A later run which traces the same
+        job loads the completed job and skips the job passes. The plan is
+        still generated in every run, since it holds ids which are allocated
+        by the process compiling it. `None` disables the cache.
+        """
+        self._compile_cache_dir = path
+
+    @property
+    def batch_size_buckets(self):
+        return self._batch_size_buckets
+
+    def set_batch_size_buckets(self, buckets: Sequence[int] = None):
+        """Pads dim 0 of the inputs up to the smallest of `buckets` that holds
+        the batch, so that a few plans serve all batch sizes. Outputs whose
+        dim 0 is the padded size are sliced back to the batch size.
+
+        Only meant for graphs whose samples are computed independently, e.g.
+        inference, since the padded samples take part in any reduction over
+        the batch. Batches larger than every bucket are not padded.
+        """
+        if buckets is None:
+            self._batch_size_buckets = None
+            return
+        buckets = sorted(buckets)
+        assert len(buckets) > 0 and buckets[0] > 0, "buckets must be positive"
+        self._batch_size_buckets = buckets
+
+    @property
+    def gradient_accumulation_steps(self):
+        if self.proto.has_num_gradient_accumulation_steps():
+            return self.proto.num_gradient_accumulation_steps()
+        return 1
+
+    def set_gradient_accumulation_steps(self, value: int):
+        """Splits the inputs of every call into `value` micro-batches along
+        dim 0 and accumulates their gradients, so the optimizers update the
+        variables once per call. Outputs whose dim 0 is the batch are
+        concatenated from the micro-batches along dim 0. Other outputs, such
+        as a scalar loss, hold the value of the last micro-batch.
+
+        All inputs must have the same dim 0, divisible by `value`. Ops whose
+        attrs depend on the batch size, such as a reshape to dim 0 of an
+        input, cannot be split and fail to compile. If blocks are assigned to
+        pipeline stages with `BlockConfig.stage_id`, the micro-batches are
+        pipelined across the stages.
+        """
+        assert type(value) is int and value >= 1, "value must be a positive int"
+        self.proto.set_num_gradient_accumulation_steps(value)
+
+    def set_pipeline_buffer_size(self, value: int):
+        """Sets how many micro-batches of forward activations a pipeline stage
+        keeps for its backward pass, which bounds the activation memory of
+        pipelining. Defaults to twice the number of stages.
+        """
+        assert type(value) is int and value >= 1, "value must be a positive int"
+        self.proto.set_pipeline_buffer_size(value)
+
+    def enable_amp(
+        self,
+        mode: bool = True,
+        white_list: Sequence[str] = None,
+        black_list: Sequence[str] = None,
+        gray_list: Sequence[str] = None,
+        clear_list: Sequence[str] = None,
+    ):
+        """Runs the graph in mixed precision with the AutoMixedPrecision pass,
+        which casts the ops that are safe to run in half precision.
+
+        The lists are op type names moved into the white (always half), black
+        (always float), gray (half if the inputs are) and clear (follows the
+        neighbours) lists of the pass, on top of its default lists. Training
+        graphs should also enable :meth:`set_dynamic_loss_scale`.
+        """
+        assert type(mode) is bool, "mode must be a bool"
+        self.proto.set_enable_auto_mixed_precision(mode)
+        amp_lists = {
+            "white": white_list,
+            "black": black_list,
+            "gray": gray_list,
+            "clear": clear_list,
+        }
+        for (name, op_type_names) in amp_lists.items():
+            getattr(self.proto, "clear_amp_{}_list".format(name))()
+            for op_type_name in op_type_names or ():
+                getattr(self.proto, "add_amp_{}_list".format(name))(op_type_name)
+
+    def set_dynamic_loss_scale(
+        self,
+        initial_loss_scale: float = 2.0 ** 30,
+        increment_period: int = 2000,
+        multiplier: float = 2.0,
+    ):
+        """Scales the loss of a training graph by a dynamic loss scale. A step
+        whose gradients have inf or nan skips the update of the variables and
+        divides the scale by `multiplier`, after `increment_period` steps
+        without them the scale is multiplied by `multiplier`.
+        """
+        assert initial_loss_scale > 0, "initial_loss_scale must be positive"
+        assert increment_period > 0, "increment_period must be positive"
+        assert multiplier > 1, "multiplier must be greater than 1"
+        self._dynamic_loss_scale_policy = (
+            float(initial_loss_scale),
+            float(increment_period),
+            float(multiplier),
+        )
+        if self.proto.has_train_conf():
+            self._train(True)
+
     def _train(self, mode: bool = True):
         if mode:
-            self.proto.mutable_train_conf()
-            self.proto.mutable_train_conf().set_loss_scale_factor(1.0)
+            train_conf = self.proto.mutable_train_conf()
+            if self._dynamic_loss_scale_policy is None:
+                train_conf.set_loss_scale_factor(1.0)
+            else:
+                (
+                    initial_loss_scale,
+                    increment_period,
+                    multiplier,
+                ) = self._dynamic_loss_scale_policy
+                policy = train_conf.mutable_dynamic_loss_scale_policy()
+                policy.set_initial_loss_scale(initial_loss_scale)
+                policy.set_increment_period(increment_period)
+                policy.set_multiplier(multiplier)
         else:
             self.proto.mutable_predict_conf()
 
@@ -113,6 +113,7 @@ class Block(object):
     @property
     def scope(self):
         if self._scope is None:
+            self.config._freeze()
             self._scope = graph_build_util.make_new_block_scope(self.prev_scope, self)
         return self._scope
 
@@ -289,6 +290,20 @@ class BlockConfig(object):
     def __init__(self):
         self._stage_id = None
         self._activation_checkpointing = None
+        self._is_frozen = False
+
+    def _freeze(self):
+        # The options are baked into the scope of the block when it is built,
+        # later changes could not take effect.
+        self._is_frozen = True
+
+    def _check_not_frozen(self, name):
+        if self._is_frozen:
+            raise RuntimeError(
+                "BlockConfig.{} can not be changed after the graph is built".format(
+                    name
+                )
+            )
 
     @property
     def stage_id(self):
@@ -296,6 +311,11 @@ class BlockConfig(object):
 
     @stage_id.setter
     def stage_id(self, value: int = None):
+        self._check_not_frozen("stage_id")
+        if value is not None and (type(value) is not int or value < 0):
+            raise ValueError(
+                "stage_id must be a non-negative int, got {}".format(repr(value))
+            )
         self._stage_id = value
 
     @property
@@ -304,4 +324,9 @@ class BlockConfig(object):
 
     @activation_checkpointing.setter
     def activation_checkpointing(self, value: bool = False):
+        self._check_not_frozen("activation_checkpointing")
+        if value is not None and type(value) is not bool:
+            raise ValueError(
+                "activation_checkpointing must be a bool, got {}".format(repr(value))
+            )
         self._activation_checkpointing = value
@@ -20,7 +20,11 @@ from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, TypeVar
 import numpy as np
 
 import oneflow as flow
-from oneflow.framework.check_point_v2 import FeedValueToVariable
+from oneflow.framework.check_point_v2 import (
+    AssignValueToTensor,
+    FeedValueToVariable,
+    PrefetchVariables,
+)
 from oneflow.framework.function_util import global_function_or_identity
 from oneflow.framework.tensor import Tensor
 from oneflow.nn.parameter import Parameter
@@ -50,6 +54,8 @@ def _addindent(s_, numSpaces):
 
 T = TypeVar("T", bound="Module")
 
+_missing = object()
+
 
 class Module(object):
     def __init__(self):
@@ -80,7 +86,11 @@ class Module(object):
         raise NotImplementedError()
 
     def __call__(self, *args):
-        for hook in itertools.chain(self._forward_pre_hooks.values()):
+        forward_pre_hooks = self._forward_pre_hooks
+        if not forward_pre_hooks:
+            # Most modules have no hooks, skip the hook machinery entirely.
+            return self.forward(*args)
+        for hook in forward_pre_hooks.values():
             result = hook(self, args)
             if result is not None:
                 if not isinstance(result, tuple):
@@ -164,18 +174,25 @@ class Module(object):
             self._parameters[name] = param
 
     def __getattr__(self, name: str) -> Union[Tensor, "Module"]:
-        if "_parameters" in self.__dict__:
-            _parameters = self.__dict__["_parameters"]
-            if name in _parameters:
-                return _parameters[name]
-        if "_buffers" in self.__dict__:
-            _buffers = self.__dict__["_buffers"]
-            if name in _buffers:
-                return _buffers[name]
-        if "_modules" in self.__dict__:
-            modules = self.__dict__["_modules"]
-            if name in modules:
-                return modules[name]
+        # Only reached when the normal lookup fails, which is the case for
+        # every parameter, buffer and submodule access, so each store is
+        # probed with a single dict lookup.
+        module_dict = self.__dict__
+        _parameters = module_dict.get("_parameters")
+        if _parameters is not None:
+            value = _parameters.get(name, _missing)
+            if value is not _missing:
+                return value
+        _buffers = module_dict.get("_buffers")
+        if _buffers is not None:
+            value = _buffers.get(name, _missing)
+            if value is not _missing:
+                return value
+        modules = module_dict.get("_modules")
+        if modules is not None:
+            value = modules.get(name, _missing)
+            if value is not _missing:
+                return value
         raise AttributeError(
             "'{}' object has no attribute '{}'".format(type(self).__name__, name)
         )
@@ -369,7 +386,12 @@ class Module(object):
                     )
                     continue
                 try:
-                    param.copy_(input_param)
+                    if local_metadata.get("inplace", False):
+                        AssignValueToTensor(param, input_param)
+                        # drop the reference so the source can be freed right away
+                        del state_dict[key]
+                    else:
+                        param.copy_(input_param)
                 except Exception as ex:
                     error_msgs.append(
                         'While copying the parameter named "{}", whose dimensions in the model are {} and whose dimensions in the checkpoint are {}, an exception occurred : {}.'.format(
@@ -393,7 +415,24 @@ class Module(object):
         self,
         state_dict: Union[Dict[str, Tensor], Dict[str, Tensor]],
         strict: bool = True,
+        inplace: bool = False,
     ):
+        """Copies the parameters and buffers from :attr:`state_dict` into this
+        module and its descendants.
+
+        Args:
+            state_dict (dict): a dict containing parameters and persistent
+                buffers.
+            strict (bool): whether the keys of :attr:`state_dict` must exactly
+                match the keys returned by this module's :meth:`state_dict`.
+                Default: ``True``
+            inplace (bool): stream each value straight into the storage of the
+                existing parameter or buffer instead of going through a NumPy
+                copy. Values loaded from a checkpoint are read in bounded
+                chunks and released as soon as they are assigned, so the peak
+                host memory stays close to the size of the model. Default:
+                ``False``
+        """
         missing_keys = []
         unexpected_keys = []
         error_msgs = []
@@ -404,6 +443,8 @@ class Module(object):
 
         def load(module, prefix=""):
             local_metadata = {} if metadata is None else metadata.get(prefix[:-1], {})
+            if inplace:
+                local_metadata = dict(local_metadata, inplace=True)
             module._load_from_state_dict(
                 state_dict,
                 prefix,
@@ -417,7 +458,15 @@ class Module(object):
                 if child is not None:
                     load(child, prefix + name + ".")
 
-        load(self)
+        if inplace:
+            # The values are streamed one at a time, prefetching whole arrays
+            # would defeat the bounded memory use.
+            load(self)
+        else:
+            # The file backed values the model needs are read concurrently, in
+            # the order in which `load` copies them.
+            with PrefetchVariables(state_dict, self.state_dict().keys()) as state_dict:
+                load(self)
         load = None
         if strict:
             if len(unexpected_keys) > 0:
@@ -52,6 +52,10 @@ class Adam(Optimizer):
             numerical stability (default: 1e-8)
         weight_decay (float, optional): weight decay (L2 penalty) (default: 0)
         scale (float, optional): the scale factor of loss (default: 1.0)
+        foreach (bool, optional): whether to update all the parameters of a group
+            with a single multi-tensor op instead of one op per parameter, which
+            saves the per-op overhead for models with many small parameters
+            (default: False)
 
     .. _Adam\\: A Method for Stochastic Optimization:
         https://arxiv.org/abs/1412.6980
@@ -69,6 +73,7 @@ class Adam(Optimizer):
         weight_decay: float = 0,
         amsgrad: bool = False,
         scale: float = 1.0,
+        foreach: bool = False,
     ):
         super().__init__()
         assert lr >= 0.0, f"Invalid learning rate: {lr}"
@@ -88,6 +93,7 @@ class Adam(Optimizer):
         self._default_options["weight_decay"] = weight_decay
         self._default_options["amsgrad"] = amsgrad
         self._default_options["scale"] = scale
+        self._default_options["foreach"] = foreach
         if isinstance(parameters, collections.abc.Iterator):
             self.param_groups.append(ParamGroup(parameters, self._default_options))
         else:
@@ -130,6 +136,25 @@ class Adam(Optimizer):
                     "beta2": param_group["betas"][1],
                     "epsilon": param_group["eps"],
                 }
+                if param_group["foreach"]:
+                    params = [p for p in param_group.parameters if p.grad is not None]
+                    if len(params) == 0:
+                        continue
+                    op = self._multi_tensor_op(
+                        "multi_tensor_adam_update",
+                        ["model", "model_diff", "m", "v"],
+                        len(params),
+                        l1=0.0,
+                        weight_decay=0.0,
+                    )
+                    op(
+                        *params,
+                        *[p.grad for p in params],
+                        *[self._state[p]["exp_avg"] for p in params],
+                        *[self._state[p]["exp_avg_sq"] for p in params],
+                        **kwargs,
+                    )
+                    continue
                 for param in param_group.parameters:
                     if param.grad is None:
                         continue
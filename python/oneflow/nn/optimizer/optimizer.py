@@ -17,6 +17,7 @@ import collections
 import warnings
 from typing import Any, Callable, Dict, Iterator, Union
 
+import oneflow as flow
 from oneflow.framework.tensor import Tensor
 from oneflow.nn.parameter import Parameter
 
@@ -60,6 +61,7 @@ class Optimizer(object):
         self._state = dict()
         self._state["step"] = 0
         self._op = None
+        self._multi_tensor_ops = dict()
 
     def add_param_group(self, param_group) -> None:
         raise NotImplementedError()
@@ -73,6 +75,19 @@ class Optimizer(object):
     def step(self, closure: Union[Callable, None] = None) -> Union[Tensor, None]:
         raise NotImplementedError()
 
+    def _multi_tensor_op(self, op_type_name, input_names, num_tensors, **attrs):
+        # The number of tensors of a multi_tensor_* op is fixed when it is
+        # built, so one op is built and cached for every parameter count.
+        key = (op_type_name, num_tensors) + tuple(sorted(attrs.items()))
+        if key not in self._multi_tensor_ops:
+            builder = flow.builtin_op(op_type_name)
+            for name in input_names:
+                builder = builder.Input(name, num_tensors)
+            for (name, value) in attrs.items():
+                builder = builder.Attr(name, value)
+            self._multi_tensor_ops[key] = builder.Build()
+        return self._multi_tensor_ops[key]
+
     def zero_grad(self, set_to_none: bool = False):
         """Sets the gradients of all optimized torch.Tensor s to zero.
 
@@ -79,6 +79,10 @@ class RMSprop(Optimizer):
         centered (bool, optional) : if ``True``, compute the centered RMSProp,
             the gradient is normalized by an estimation of its variance
         weight_decay (float, optional): weight decay (L2 penalty) (default: 0)
+        foreach (bool, optional): whether to update all the parameters of a group
+            with a single multi-tensor op instead of one op per parameter, which
+            saves the per-op overhead for models with many small parameters
+            (default: False)
     """
 
     def __init__(
@@ -91,6 +95,7 @@ class RMSprop(Optimizer):
         momentum: float = 0.0,
         centered: bool = False,
         scale: float = 1.0,
+        foreach: bool = False,
     ):
         super().__init__()
         assert lr >= 0.0, f"Invalid learning rate: {lr}"
@@ -105,6 +110,7 @@ class RMSprop(Optimizer):
         self._default_options["weight_decay"] = weight_decay
         self._default_options["centered"] = centered
         self._default_options["scale"] = scale
+        self._default_options["foreach"] = foreach
         if isinstance(parameters, collections.abc.Iterator):
             self.param_groups.append(ParamGroup(parameters, self._default_options))
         else:
@@ -158,6 +164,26 @@ class RMSprop(Optimizer):
                     "decay_rate": param_group["alpha"],
                     "weight_decay": param_group["weight_decay"],
                 }
+                if param_group["foreach"]:
+                    params = [p for p in param_group.parameters if p.grad is not None]
+                    if len(params) == 0:
+                        continue
+                    centered = param_group["centered"]
+                    states = [self._state[p]["square_avg"] for p in params]
+                    input_names = ["model", "model_diff", "mean_square"]
+                    if centered:
+                        states += [self._state[p]["grad_avg"] for p in params]
+                        input_names.append("mean_gradient")
+                    op = self._multi_tensor_op(
+                        "multi_tensor_rmsprop_update",
+                        input_names,
+                        len(params),
+                        centered=centered,
+                        l1=0.0,
+                        l2=0.0,
+                    )
+                    op(*params, *[p.grad for p in params], *states, **kwargs)
+                    continue
                 for param in param_group.parameters:
                     if param.grad is None:
                         continue
@@ -50,6 +50,10 @@ class SGD(Optimizer):
         momentum (float, optional): Momentum factor (default: 0.0)
         weight_decay (float, optional): weight decay (L2 penalty) (default: 0.0)
         scale (float, optional): the scale factor of loss (default: 1.0)
+        foreach (bool, optional): whether to update all the parameters of a group
+            with a single multi-tensor op instead of one op per parameter, which
+            saves the per-op overhead for models with many small parameters
+            (default: False)
 
     """
 
@@ -60,6 +64,7 @@ class SGD(Optimizer):
         momentum: float = 0.0,
         weight_decay: float = 0.0,
         scale: float = 1.0,
+        foreach: bool = False,
     ):
         super().__init__()
         assert lr >= 0.0, f"Invalid learning rate: {lr}"
@@ -70,6 +75,7 @@ class SGD(Optimizer):
         self._default_options["scale"] = scale
         self._default_options["momentum"] = momentum
         self._default_options["weight_decay"] = weight_decay
+        self._default_options["foreach"] = foreach
         if isinstance(parameters, collections.abc.Iterator):
             self.param_groups.append(ParamGroup(parameters, self._default_options))
         else:
@@ -108,6 +114,9 @@ class SGD(Optimizer):
                 lr = param_group["lr"]
                 scale = param_group["scale"]
                 l2 = param_group["weight_decay"]
+                if param_group["foreach"]:
+                    self._multi_tensor_update(param_group)
+                    continue
                 for param in param_group.parameters:
                     if param.grad is None:
                         continue
@@ -130,6 +139,36 @@ class SGD(Optimizer):
             self._state["step"] = self._state["step"] + 1
             return loss
 
+    def _multi_tensor_update(self, param_group):
+        params = [param for param in param_group.parameters if param.grad is not None]
+        if len(params) == 0:
+            return
+        grads = [param.grad for param in params]
+        kwargs = {
+            "learning_rate_val": param_group["lr"],
+            "l2": param_group["weight_decay"],
+            "scale": param_group["scale"],
+        }
+        if param_group["momentum"] == 0.0:
+            op = self._multi_tensor_op(
+                "multi_tensor_sgd_update",
+                ["model", "model_diff"],
+                len(params),
+                l1=0.0,
+                weight_decay=0.0,
+            )
+            op(*params, *grads, **kwargs)
+        else:
+            momentum_bufs = [self._state[param]["momentum_buf"] for param in params]
+            op = self._multi_tensor_op(
+                "multi_tensor_momentum_update",
+                ["model", "model_diff", "momentum"],
+                len(params),
+                l1=0.0,
+                weight_decay=0.0,
+            )
+            op(*params, *grads, *momentum_bufs, beta=param_group["momentum"], **kwargs)
+
     def add_to_graph_train_config(self, train_conf, var2var_op_name_dict):
         for param_group in self.param_groups:
             optimizer_conf = train_conf.mutable_optimizer_conf().Add()
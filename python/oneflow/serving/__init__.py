@@ -19,3 +19,4 @@ from oneflow.serving.inference_session import (
     ModelVersionPolicy,
     SessionOption,
 )
+from oneflow.serving.model_server import ModelServer
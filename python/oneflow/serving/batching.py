@@ -0,0 +1,243 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+
+import numpy as np
+
+import oneflow as flow
+from oneflow.serving.buffers import empty_staging_buffer
+
+
+class BatchScheduler(object):
+    """
+    Coalesces the concurrent requests of one job into a single launch.
+
+    Requests are queued until either `max_batch_size` rows are pending or the
+    oldest one has waited for `max_queue_delay_ms`. The queued inputs are then
+    concatenated along the first axis, padded to the batch size declared by
+    the job's signature and run as one push/user/pull round. The rows of each
+    output are scattered back to the future of the request they belong to,
+    outputs without a batch axis are handed to every request as a whole.
+
+    Every request is checked against the inputs of the job when it is
+    submitted, so a malformed request is rejected on its own instead of
+    failing the batch it would have joined.
+    """
+
+    def __init__(
+        self,
+        session,
+        job_name,
+        max_batch_size=None,
+        max_queue_delay_ms=1.0,
+        pad_to_batch_size=True,
+    ):
+        if max_batch_size is not None and max_batch_size < 1:
+            raise ValueError(
+                "max_batch_size must be positive, got {}".format(max_batch_size)
+            )
+        if max_queue_delay_ms < 0:
+            raise ValueError(
+                "max_queue_delay_ms must not be negative, got {}".format(
+                    max_queue_delay_ms
+                )
+            )
+        self.session_ = session
+        self.job_name_ = job_name
+        self.max_batch_size_ = max_batch_size
+        self.max_queue_delay_ = max_queue_delay_ms / 1000.0
+        self.pad_to_batch_size_ = pad_to_batch_size
+        self.declared_batch_size_ = None
+        self.input_specs_ = None
+        self.pending_ = []
+        self.pending_rows_ = 0
+        self.flush_handle_ = None
+        self.tasks_ = set()
+
+    @property
+    def event_loop(self):
+        return self.session_.event_loop_
+
+    def _get_input_specs(self):
+        if self.input_specs_ is None:
+            input_specs = {}
+            for input_name in self.session_.list_inputs(self.job_name_):
+                info = self.session_.input_info(input_name, self.job_name_)
+                input_specs[input_name] = (
+                    tuple(info["shape"]),
+                    np.dtype(flow.convert_oneflow_dtype_to_numpy_dtype(info["dtype"])),
+                )
+            if len(input_specs) == 0:
+                raise ValueError("job {} has no inputs".format(self.job_name_))
+            self._set_declared_batch_size(input_specs)
+            self.input_specs_ = input_specs
+        return self.input_specs_
+
+    def _set_declared_batch_size(self, input_specs):
+        batch_sizes = set()
+        for (input_name, (shape, _)) in input_specs.items():
+            if len(shape) == 0:
+                raise ValueError(
+                    'input "{}" of job {} has no batch axis to batch along'.format(
+                        input_name, self.job_name_
+                    )
+                )
+            batch_sizes.add(shape[0])
+        if len(batch_sizes) != 1:
+            raise ValueError(
+                "the inputs of job {} have different batch sizes {}".format(
+                    self.job_name_, sorted(batch_sizes)
+                )
+            )
+        (self.declared_batch_size_,) = batch_sizes
+        if self.max_batch_size_ is None:
+            self.max_batch_size_ = self.declared_batch_size_
+        elif (
+            self.pad_to_batch_size_ and self.max_batch_size_ > self.declared_batch_size_
+        ):
+            raise ValueError(
+                "max_batch_size {} exceeds the batch size {} of job {}".format(
+                    self.max_batch_size_, self.declared_batch_size_, self.job_name_
+                )
+            )
+
+    def _check_request(self, inputs):
+        input_specs = self._get_input_specs()
+        for input_name in input_specs.keys():
+            if input_name not in inputs:
+                raise ValueError('input "{}" is absent'.format(input_name))
+        num_rows = None
+        for (input_name, value) in inputs.items():
+            if input_name not in input_specs:
+                raise ValueError(
+                    'job {} has no input "{}"'.format(self.job_name_, input_name)
+                )
+            if not isinstance(value, np.ndarray):
+                raise ValueError('input "{}" requires numpy.ndarray'.format(input_name))
+            (shape, dtype) = input_specs[input_name]
+            if value.ndim != len(shape) or value.shape[1:] != shape[1:]:
+                raise ValueError(
+                    'input "{}" of shape {} does not match the shape {} of job {} '
+                    "beyond the batch axis".format(
+                        input_name, value.shape, shape, self.job_name_
+                    )
+                )
+            if value.dtype != dtype:
+                raise ValueError(
+                    'input "{}" has dtype {}, job {} requires {}'.format(
+                        input_name, value.dtype, self.job_name_, dtype
+                    )
+                )
+            if num_rows is None:
+                num_rows = value.shape[0]
+            elif value.shape[0] != num_rows:
+                raise ValueError(
+                    "the inputs of a request differ in batch size, {} vs {}".format(
+                        num_rows, value.shape[0]
+                    )
+                )
+        return num_rows
+
+    def submit(self, inputs):
+        """Queues a request and returns the future of its outputs.
+
+        Raises ValueError if the request does not match the inputs of the job.
+        """
+        num_rows = self._check_request(inputs)
+        if num_rows > self.max_batch_size_:
+            raise ValueError(
+                "a request of {} rows exceeds max_batch_size {}".format(
+                    num_rows, self.max_batch_size_
+                )
+            )
+        if self.pending_rows_ + num_rows > self.max_batch_size_:
+            self.flush()
+        future = self.event_loop.create_future()
+        self.pending_.append((inputs, num_rows, future))
+        self.pending_rows_ += num_rows
+        if self.pending_rows_ >= self.max_batch_size_:
+            self.flush()
+        elif self.flush_handle_ is None:
+            self.flush_handle_ = self.event_loop.call_later(
+                self.max_queue_delay_, self.flush
+            )
+        return future
+
+    def flush(self):
+        """Launches the pending requests right away"""
+        if self.flush_handle_ is not None:
+            self.flush_handle_.cancel()
+            self.flush_handle_ = None
+        if len(self.pending_) == 0:
+            return
+        batch = self.pending_
+        self.pending_ = []
+        self.pending_rows_ = 0
+        task = self.event_loop.create_task(self._run_batch(batch))
+        self.tasks_.add(task)
+        task.add_done_callback(self.tasks_.discard)
+
+    async def join(self):
+        """Launches the pending requests and waits until all batches are done"""
+        self.flush()
+        if len(self.tasks_) > 0:
+            await asyncio.gather(*self.tasks_)
+
+    def _gather_inputs(self, batch):
+        num_rows = sum(num_rows for (_, num_rows, _) in batch)
+        if self.pad_to_batch_size_:
+            num_rows = self.declared_batch_size_
+        batched = {}
+        # every request was checked against the inputs of the job by `submit`
+        for input_name in self.input_specs_.keys():
+            first = batch[0][0][input_name]
+            if len(batch) == 1 and first.shape[0] == num_rows:
+                batched[input_name] = first
+                continue
+            # Concatenating and padding in a single copy. The batch is owned by
+            # the scheduler, so it is pushed without another copy.
+            value = empty_staging_buffer((num_rows,) + first.shape[1:], first.dtype)
+            start = 0
+            for (inputs, rows, _) in batch:
+                value[start : start + rows] = inputs[input_name]
+                start += rows
+            value[start:] = 0
+            batched[input_name] = value
+        return (batched, num_rows)
+
+    async def _run_batch(self, batch):
+        try:
+            (inputs, num_rows) = self._gather_inputs(batch)
+            outputs = await self.session_._launch(self.job_name_, inputs)
+        except Exception as e:
+            for (_, _, future) in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        start = 0
+        for (_, rows, future) in batch:
+            if future.cancelled():
+                start += rows
+                continue
+            future.set_result(
+                [
+                    output[start : start + rows]
+                    if output.ndim > 0 and output.shape[0] == num_rows
+                    else output
+                    for output in outputs
+                ]
+            )
+            start += rows
@@ -0,0 +1,76 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import collections
+import threading
+
+import numpy as np
+
+
+class StagingBuffer(np.ndarray):
+    r"""A C-contiguous input buffer which is pushed without a defensive copy.
+
+    The session reads a staging buffer while the push job runs, so it must not
+    be written again until the request it was passed to has completed.
+    """
+
+    pass
+
+
+def empty_staging_buffer(shape, dtype):
+    return np.empty(shape, dtype=dtype).view(StagingBuffer)
+
+
+class NdarrayPool(object):
+    r"""Recycles the arrays of each (shape, dtype) signature.
+
+    `acquire` hands out a recycled array when one is available and allocates a
+    new one otherwise, `release` gives an array back to the pool. At most
+    `max_arrays_per_signature` arrays are kept for each signature, the others
+    are left to the garbage collector.
+    """
+
+    def __init__(self, max_arrays_per_signature):
+        assert max_arrays_per_signature > 0
+        self.max_arrays_per_signature_ = max_arrays_per_signature
+        self.signature2arrays_ = collections.defaultdict(list)
+        # the pull callbacks acquire arrays on the runtime's threads
+        self.lock_ = threading.Lock()
+
+    @staticmethod
+    def _signature(shape, dtype):
+        return (tuple(shape), np.dtype(dtype).str)
+
+    def acquire(self, shape, dtype):
+        with self.lock_:
+            arrays = self.signature2arrays_.get(self._signature(shape, dtype))
+            if arrays:
+                return arrays.pop()
+        return np.empty(shape, dtype=dtype)
+
+    def release(self, array):
+        # only whole arrays own their memory, views are never recycled
+        if not isinstance(array, np.ndarray) or array.base is not None:
+            return
+        with self.lock_:
+            arrays = self.signature2arrays_[self._signature(array.shape, array.dtype)]
+            if len(arrays) < self.max_arrays_per_signature_ and all(
+                a is not array for a in arrays
+            ):
+                arrays.append(array)
+
+    def clear(self):
+        with self.lock_:
+            self.signature2arrays_.clear()
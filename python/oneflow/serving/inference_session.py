@@ -18,6 +18,7 @@ import contextlib
 import enum
 import inspect
 import os
+import time
 
 import google.protobuf.text_format as text_format
 import numpy as np
@@ -41,6 +42,8 @@ import oneflow.framework.placement_util as placement_util
 import oneflow.framework.runtime_mode as runtime_mode
 import oneflow.framework.scope_util as scope_util
 import oneflow.framework.session_util as session_util
+from oneflow.serving.batching import BatchScheduler
+from oneflow.serving.buffers import NdarrayPool, StagingBuffer, empty_staging_buffer
 
 
 def _is_int(val):
@@ -121,6 +124,9 @@ class SessionOption(object):
         self.device_tag = "gpu"
         self.device_num = 1
         self.is_mirrored_view = False
+        # the number of output arrays recycled per shape and dtype, 0 disables
+        # the pool
+        self.output_pool_size = 0
 
 
 class InferenceSession(object):
@@ -139,11 +145,20 @@ class InferenceSession(object):
         self.checkpoint_path_ = None
         self.config_proto_ = None
         self.job_name2job_conf_ = {}
+        # the input and return ops compiled into each job
+        self.job_name2input_names_ = {}
+        self.job_name2output_names_ = {}
         self.inter_user_job_info_ = None
         self.cur_job_name_ = None
         self.inferface_name2info_ = {}
         self.output_name2future_ = {}
         self.job_futures_ = []
+        self.job_name2batch_scheduler_ = {}
+        self.is_ready_ = False
+        self.warmup_latency_ = {}
+        self.output_pool_ = None
+        if self.option_.output_pool_size > 0:
+            self.output_pool_ = NdarrayPool(self.option_.output_pool_size)
         self.status_ = None
         self._init_event_loop()
         self.init()
@@ -177,6 +192,7 @@ class InferenceSession(object):
             oneflow._oneflow_internal.DestroyLazyGlobalSession()
         else:
             pass
+        self.is_ready_ = False
         self.status_ = self.SessionStatus.CLOSED
 
     def _check_status(self, *status):
@@ -224,6 +240,36 @@ class InferenceSession(object):
             mut_shape = mut_input_def.mutable_blob_conf().mutable_shape()
             mut_shape.mutable_dim()[0] = batch_size
 
+    def set_job_batching(
+        self,
+        job_name,
+        max_batch_size=None,
+        max_queue_delay_ms=1.0,
+        pad_to_batch_size=True,
+    ):
+        """Coalesces the concurrent `async_run` calls of `job_name` into one launch.
+
+        Args:
+            job_name: the job whose requests are batched.
+            max_batch_size: the most rows launched at once, defaults to the batch
+                size declared by the job's signature.
+            max_queue_delay_ms: how long the first queued request waits for
+                others before its batch is launched anyway.
+            pad_to_batch_size: pad every batch with zeros to the declared batch
+                size, which jobs with static input shapes require.
+
+        The outputs of a batched request are views of the rows of the batch's
+        outputs, so they are never recycled by `release_outputs`.
+        """
+        self._check_status(self.SessionStatus.OPEN, self.SessionStatus.RUNNING)
+        self.job_name2batch_scheduler_[job_name] = BatchScheduler(
+            self,
+            job_name,
+            max_batch_size=max_batch_size,
+            max_queue_delay_ms=max_queue_delay_ms,
+            pad_to_batch_size=pad_to_batch_size,
+        )
+
     def _get_job_conf(self, job_name):
         if job_name in self.job_name2job_conf_:
             return self.job_name2job_conf_[job_name]
@@ -269,6 +315,14 @@ class InferenceSession(object):
                     )
                 )
             compile_ctx.CurJobAddOp(op_conf)
+            if op_conf.HasField("input_conf"):
+                self.job_name2input_names_.setdefault(self.cur_job_name_, []).append(
+                    op_conf.name
+                )
+            elif op_conf.HasField("return_conf"):
+                self.job_name2output_names_.setdefault(self.cur_job_name_, []).append(
+                    op_conf.name
+                )
         oneflow._oneflow_internal.CurJobBuildAndInferCtx_Complete()
         oneflow._oneflow_internal.CurJobBuildAndInferCtx_Rebuild()
 
@@ -279,6 +333,66 @@ class InferenceSession(object):
         self._run_load_checkpoint_job()
         self.status_ = self.SessionStatus.RUNNING
 
+    @property
+    def is_ready(self):
+        """Whether the session is running and has been warmed up by `warmup`"""
+        return self.status_ == self.SessionStatus.RUNNING and self.is_ready_
+
+    @property
+    def warmup_latency(self):
+        """The warm latency in seconds of each job and batch size run by `warmup`"""
+        return self.warmup_latency_
+
+    def _make_warmup_inputs(self, job_name, batch_size):
+        inputs = {}
+        for input_name in self.job_name2input_names_.get(job_name, ()):
+            info = self.input_info(input_name, job_name)
+            shape = tuple(info["shape"])
+            if batch_size is not None and len(shape) > 0:
+                shape = (batch_size,) + shape[1:]
+            dtype = flow.convert_oneflow_dtype_to_numpy_dtype(info["dtype"])
+            # zeros are valid for every input, including indices
+            inputs[input_name] = np.zeros(shape, dtype=dtype)
+        return inputs
+
+    def warmup(self, batch_sizes=None, num_iters=3):
+        """Runs every job on synthetic inputs before the session takes traffic.
+
+        Each job is fed zeros for the inputs compiled into it. The first runs
+        initialize the allocators and kernels, so `is_ready` is only set once
+        they are done.
+
+        Args:
+            batch_sizes: the batch sizes to run, defaults to the batch size
+                declared by each job. Other batch sizes need a job with dynamic
+                inputs or batching enabled by `set_job_batching`.
+            num_iters: the number of runs of each job and batch size, the last
+                one is reported as its warm latency.
+
+        Returns:
+            a dict of the warm latency in seconds by job name and batch size.
+        """
+        self._check_status(self.SessionStatus.RUNNING)
+        assert num_iters > 0
+        self.is_ready_ = False
+        self.warmup_latency_ = {}
+        for job_name in self.list_jobs():
+            job_latency = {}
+            for batch_size in batch_sizes or [None]:
+                inputs = self._make_warmup_inputs(job_name, batch_size)
+                for _ in range(num_iters):
+                    start = time.perf_counter()
+                    self.run(job_name, **inputs)
+                    latency = time.perf_counter() - start
+                if batch_size is None:
+                    batch_size = next(
+                        (v.shape[0] for v in inputs.values() if v.ndim > 0), None
+                    )
+                job_latency[batch_size] = latency
+            self.warmup_latency_[job_name] = job_latency
+        self.is_ready_ = True
+        return self.warmup_latency_
+
     def load_saved_model(
         self,
         saved_model_dir,
@@ -357,8 +471,11 @@ class InferenceSession(object):
         self._check_status(self.SessionStatus.RUNNING)
         return list(self.job_name2job_conf_.keys())
 
-    def list_inputs(self):
+    def list_inputs(self, job_name=None):
+        """Lists the inputs of all jobs, or of `job_name` only if it is given"""
         self._check_status(self.SessionStatus.RUNNING)
+        if job_name is not None:
+            return tuple(self.job_name2input_names_.get(job_name, ()))
         input_names = []
         for (
             input_name,
@@ -400,16 +517,77 @@ class InferenceSession(object):
         self.inferface_name2info_[op_name] = info
         return info
 
+    def input_buffer(self, input_name, job_name=None):
+        """Returns a staging buffer of the declared shape and dtype of an input.
+
+        The buffer can be filled in place and passed to `run` again and again,
+        it is pushed without the copy made for other arrays. It must not be
+        written while a request it was passed to is still running.
+        """
+        info = self.input_info(input_name, job_name)
+        return empty_staging_buffer(
+            info["shape"], flow.convert_oneflow_dtype_to_numpy_dtype(info["dtype"])
+        )
+
+    def release_outputs(self, outputs):
+        """Gives the output arrays of a finished request back to the output pool.
+
+        Only arrays which own their memory are recycled. The outputs of jobs
+        batched by `set_job_batching` are row views of the batch's outputs and
+        are silently skipped, as are the leading rows filled in an array
+        passed to `run_into` for a dynamic output.
+        """
+        if self.output_pool_ is None:
+            return
+        for output in outputs:
+            self.output_pool_.release(output)
+
     def run(self, job_name, **kwargs):
         self._check_status(self.SessionStatus.RUNNING)
         return self.event_loop_.run_until_complete(self.async_run(job_name, **kwargs))
 
+    def run_into(self, job_name, outputs, **kwargs):
+        self._check_status(self.SessionStatus.RUNNING)
+        return self.event_loop_.run_until_complete(
+            self.async_run_into(job_name, outputs, **kwargs)
+        )
+
     async def async_run(self, job_name, **kwargs):
         self._check_status(self.SessionStatus.RUNNING)
-        self._run_push_jobs(**kwargs)
+        scheduler = self.job_name2batch_scheduler_.get(job_name)
+        if scheduler is not None:
+            return await scheduler.submit(kwargs)
+        return await self._launch(job_name, kwargs)
+
+    async def async_run_into(self, job_name, outputs, **kwargs):
+        """Like `async_run`, but the outputs named in the dict `outputs` are
+        copied into the preallocated arrays given for them"""
+        self._check_status(self.SessionStatus.RUNNING)
+        if job_name in self.job_name2batch_scheduler_:
+            raise ValueError(
+                "the outputs of the batched job {} can not be pulled into "
+                "preallocated arrays".format(job_name)
+            )
+        for (output_name, out) in outputs.items():
+            info = self.output_info(output_name, job_name)
+            np_dtype = flow.convert_oneflow_dtype_to_numpy_dtype(info["dtype"])
+            if (
+                not isinstance(out, np.ndarray)
+                or not out.flags.c_contiguous
+                or out.dtype != np_dtype
+                or tuple(out.shape) != tuple(info["shape"])
+            ):
+                raise ValueError(
+                    'output "{}" requires a C-contiguous numpy.ndarray of shape {} '
+                    "and dtype {}".format(output_name, tuple(info["shape"]), np_dtype)
+                )
+        return await self._launch(job_name, kwargs, outputs)
+
+    async def _launch(self, job_name, inputs, outputs=None):
+        self._run_push_jobs(job_name, inputs)
         job_inst = job_instance_util.MakeUserJobInstance(job_name)
         self._run_job(job_inst)
-        output_futures = tuple(self._run_pull_jobs(job_name).values())
+        output_futures = tuple(self._run_pull_jobs(job_name, outputs).values())
         return await asyncio.gather(*output_futures)
 
     def _run_job(self, job_inst):
@@ -422,30 +600,40 @@ class InferenceSession(object):
         oneflow._oneflow_internal.LaunchJob(job_inst)
         self.job_futures_.append(future)
 
-    def _run_push_jobs(self, **kwargs):
+    def _run_push_jobs(self, user_job_name, kwargs):
+        input_names = self.job_name2input_names_.get(user_job_name)
         for (
             input_name,
             push_job_name,
         ) in self.inter_user_job_info_.input_or_var_op_name2push_job_name.items():
+            if input_names is not None and input_name not in input_names:
+                # an input of another job
+                continue
             if input_name not in kwargs:
                 raise ValueError('input "{}" is absent'.format(input_name))
             input_numpy = kwargs[input_name]
             if not isinstance(input_numpy, np.ndarray):
                 raise ValueError('input "{}" requires numpy.ndarray'.format(input_name))
-            push_fn = input_blob_util._MakePushNdarrayCallback(input_numpy)
+            push_fn = input_blob_util._MakePushNdarrayCallback(
+                input_numpy, copy=not isinstance(input_numpy, StagingBuffer)
+            )
             push_job_inst = job_instance_util.MakePushJobInstance(
                 push_job_name, input_name, push_fn
             )
             self._run_job(push_job_inst)
 
-    def _run_pull_jobs(self, user_job_name):
+    def _run_pull_jobs(self, user_job_name, outputs=None):
+        output_names = self.job_name2output_names_.get(user_job_name)
         output_futures = {}
         for (
             output_name,
             pull_job_name,
         ) in self.inter_user_job_info_.output_or_var_op_name2pull_job_name.items():
+            if output_names is not None and output_name not in output_names:
+                continue
             future = self.event_loop_.create_future()
-            pull_fn = self._make_pull_job_cb(output_name, user_job_name, future)
+            out = None if outputs is None else outputs.get(output_name)
+            pull_fn = self._make_pull_job_cb(output_name, user_job_name, future, out)
             pull_job_inst = job_instance_util.MakePullJobInstance(
                 pull_job_name, output_name, pull_fn
             )
@@ -453,7 +641,7 @@ class InferenceSession(object):
             output_futures[output_name] = future
         return output_futures
 
-    def _make_pull_job_cb(self, output_name, user_job_name, future):
+    def _make_pull_job_cb(self, output_name, user_job_name, future, out=None):
         output_lbn = oneflow._oneflow_internal.JobBuildAndInferCtx_GetOpBlobLbn(
             user_job_name, output_name, "out"
         )
@@ -462,7 +650,11 @@ class InferenceSession(object):
         )
 
         def pull_fn(ofblob):
-            ndarray = ofblob.CopyToNdarray()
+            dst = out
+            if dst is None and self.output_pool_ is not None:
+                np_dtype = flow.convert_oneflow_dtype_to_numpy_dtype(ofblob.dtype)
+                dst = self.output_pool_.acquire(ofblob.shape, np_dtype)
+            ndarray = ofblob.CopyToNdarray(dst)
             self.event_loop_.call_soon_threadsafe(future.set_result, ndarray)
 
         return pull_fn
@@ -483,5 +675,7 @@ class InferenceSession(object):
         self._run_job(load_checkpoint_job_inst)
 
     async def wait_for_all_jobs_finished(self):
+        for scheduler in self.job_name2batch_scheduler_.values():
+            await scheduler.join()
         await asyncio.gather(*self.job_futures_)
         self.job_futures_ = []
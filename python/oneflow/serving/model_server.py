@@ -0,0 +1,369 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+import asyncio
+import concurrent.futures
+import itertools
+import multiprocessing
+import os
+import pickle
+import threading
+
+from oneflow.serving.inference_session import (
+    InferenceSession,
+    ModelVersionPolicy,
+    SessionOption,
+    _find_model_latest_version,
+)
+
+
+def _picklable_exception(e):
+    try:
+        pickle.dumps(e)
+        return e
+    except Exception:
+        return RuntimeError(repr(e))
+
+
+def _worker_main(conn, saved_model_dir, model_version, option, warmup):
+    # Every worker process owns a lazy global session, so a new version is
+    # compiled in its own process while the current one keeps serving.
+    try:
+        sess = InferenceSession(option)
+        sess.load_saved_model(saved_model_dir, model_version=model_version)
+        sess.launch()
+        # the version only takes traffic once its first runs are done
+        warmup_latency = sess.warmup() if warmup else {}
+        info = dict(
+            jobs=sess.list_jobs(),
+            inputs=sess.list_inputs(),
+            outputs=sess.list_outputs(),
+            warmup_latency=warmup_latency,
+        )
+    except Exception as e:
+        conn.send(("error", _picklable_exception(e)))
+        return
+    loop = sess.event_loop_
+    stop = loop.create_future()
+
+    async def serve(request_id, job_name, inputs):
+        try:
+            outputs = await sess.async_run(job_name, **inputs)
+            conn.send(("result", request_id, outputs, None))
+        except Exception as e:
+            conn.send(("result", request_id, None, _picklable_exception(e)))
+
+    def dispatch(message):
+        if message[0] == "close":
+            if not stop.done():
+                stop.set_result(None)
+            return
+        (_, request_id, job_name, inputs) = message
+        loop.create_task(serve(request_id, job_name, inputs))
+
+    def receive_loop():
+        while True:
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                message = ("close",)
+            loop.call_soon_threadsafe(dispatch, message)
+            if message[0] == "close":
+                return
+
+    conn.send(("ready", info))
+    threading.Thread(
+        target=receive_loop, name="oneflow_model_worker_receiver", daemon=True
+    ).start()
+    loop.run_until_complete(stop)
+    sess.close()
+    conn.close()
+
+
+class _WorkerRetired(Exception):
+    pass
+
+
+class _ModelWorker(object):
+    def __init__(self, model_name, saved_model_dir, model_version, option, warmup):
+        self.model_name_ = model_name
+        self.model_version_ = model_version
+        context = multiprocessing.get_context("spawn")
+        (self.conn_, child_conn) = context.Pipe()
+        self.process_ = context.Process(
+            target=_worker_main,
+            args=(child_conn, saved_model_dir, model_version, option, warmup),
+            name="oneflow_model_{}_{}".format(model_name, model_version),
+            daemon=True,
+        )
+        self.process_.start()
+        child_conn.close()
+        self.ready_ = concurrent.futures.Future()
+        self.info_ = None
+        # guards the sends on the pipe and the pending requests
+        self.lock_ = threading.Lock()
+        self.pending_ = {}
+        self.request_ids_ = itertools.count()
+        self.retired_ = False
+        self.receiver_ = threading.Thread(
+            target=self._receive_loop,
+            name="oneflow_model_server_receiver",
+            daemon=True,
+        )
+        self.receiver_.start()
+
+    @property
+    def model_version(self):
+        return self.model_version_
+
+    @property
+    def info(self):
+        return self.info_
+
+    def wait_ready(self, timeout=None):
+        self.info_ = self.ready_.result(timeout)
+        return self.info_
+
+    def _receive_loop(self):
+        while True:
+            try:
+                message = self.conn_.recv()
+            except (EOFError, OSError):
+                break
+            if message[0] == "ready":
+                self.ready_.set_result(message[1])
+            elif message[0] == "error":
+                self.ready_.set_exception(message[1])
+            else:
+                (_, request_id, outputs, exception) = message
+                with self.lock_:
+                    future = self.pending_.pop(request_id)
+                if exception is not None:
+                    future.set_exception(exception)
+                else:
+                    future.set_result(outputs)
+        error = RuntimeError(
+            "the worker of version {} of model {} exited".format(
+                self.model_version_, self.model_name_
+            )
+        )
+        if not self.ready_.done():
+            self.ready_.set_exception(error)
+        with self.lock_:
+            (pending, self.pending_) = (self.pending_, {})
+        for future in pending.values():
+            future.set_exception(error)
+
+    def submit(self, job_name, inputs):
+        future = concurrent.futures.Future()
+        with self.lock_:
+            if self.retired_:
+                raise _WorkerRetired()
+            request_id = next(self.request_ids_)
+            self.pending_[request_id] = future
+            self.conn_.send(("run", request_id, job_name, inputs))
+        return future
+
+    def close(self, timeout=None):
+        # the requests already routed to this worker are served before it exits
+        with self.lock_:
+            self.retired_ = True
+            pending = list(self.pending_.values())
+        concurrent.futures.wait(pending, timeout)
+        with self.lock_:
+            try:
+                self.conn_.send(("close",))
+            except (OSError, ValueError):
+                pass
+        self.process_.join(timeout)
+        if self.process_.is_alive():
+            self.process_.terminate()
+            self.process_.join()
+        self.receiver_.join()
+        self.conn_.close()
+
+
+class ModelServer(object):
+    r"""Serves several models, and several versions of each, in one process.
+
+    Every loaded version runs its own :class:`InferenceSession` in a worker
+    process. :meth:`load` compiles a new version in the background while the
+    current version of the model keeps taking requests. Requests are routed to
+    the new version atomically once it is ready, then the old version finishes
+    the requests it already received and is released. If the new version
+    fails to load, the current one keeps serving.
+
+    Loads of the same model take effect in the order they were called: a
+    version which becomes ready after a later :meth:`load` or :meth:`unload`
+    of its model is dropped.
+
+    Inputs and outputs are pickled through a pipe to and from the workers.
+    While a version is being replaced, both versions hold their device
+    memory.
+    """
+
+    def __init__(self, option=None):
+        if option is None:
+            option = SessionOption()
+        assert isinstance(option, SessionOption)
+        self.option_ = option
+        self.lock_ = threading.Lock()
+        self.model_name2worker_ = {}
+        # every load and unload takes a sequence number, a model only ever
+        # moves to the state of a later one
+        self.seqs_ = itertools.count()
+        self.model_name2seq_ = {}
+        self.model_name2num_loading_ = {}
+        self.swap_threads_ = set()
+
+    def load(
+        self,
+        model_name,
+        saved_model_dir,
+        model_version=ModelVersionPolicy.LATEST,
+        option=None,
+        warmup=True,
+    ):
+        """Loads a version of a model in the background.
+
+        With `warmup`, the version is run on synthetic inputs by
+        :meth:`InferenceSession.warmup` before it takes traffic.
+
+        Returns a :class:`concurrent.futures.Future` which is resolved with the
+        version once it takes the traffic of `model_name`, or cancelled if a
+        later load or unload of `model_name` took effect first.
+        """
+        if not os.path.isdir(saved_model_dir):
+            raise ValueError("{} is not a valid directory".format(saved_model_dir))
+        if model_version == ModelVersionPolicy.LATEST:
+            model_version = int(_find_model_latest_version(saved_model_dir))
+        elif not isinstance(model_version, int):
+            raise NotImplementedError
+        worker = _ModelWorker(
+            model_name, saved_model_dir, model_version, option or self.option_, warmup
+        )
+        swapped = concurrent.futures.Future()
+        with self.lock_:
+            seq = next(self.seqs_)
+            self.model_name2num_loading_[model_name] = (
+                self.model_name2num_loading_.get(model_name, 0) + 1
+            )
+
+        def swap():
+            try:
+                worker.wait_ready()
+            except Exception as e:
+                worker.close()
+                swapped.set_exception(e)
+                return
+            with self.lock_:
+                # superseded by a later load or unload of the model
+                stale = seq < self.model_name2seq_.get(model_name, -1)
+                if not stale:
+                    old_worker = self.model_name2worker_.get(model_name)
+                    self.model_name2worker_[model_name] = worker
+                    self.model_name2seq_[model_name] = seq
+            if stale:
+                worker.close()
+                swapped.cancel()
+                return
+            swapped.set_result(model_version)
+            if old_worker is not None:
+                old_worker.close()
+
+        def swap_and_forget():
+            try:
+                swap()
+            finally:
+                with self.lock_:
+                    self.swap_threads_.discard(thread)
+                    self.model_name2num_loading_[model_name] -= 1
+                    if self.model_name2num_loading_[model_name] == 0:
+                        del self.model_name2num_loading_[model_name]
+
+        thread = threading.Thread(
+            target=swap_and_forget, name="oneflow_model_server_swap", daemon=True
+        )
+        with self.lock_:
+            self.swap_threads_.add(thread)
+        thread.start()
+        return swapped
+
+    def list_models(self):
+        with self.lock_:
+            return {
+                model_name: worker.model_version
+                for (model_name, worker) in self.model_name2worker_.items()
+            }
+
+    def is_ready(self, model_name=None):
+        """Whether `model_name` takes traffic, or any model when it is None"""
+        with self.lock_:
+            if model_name is None:
+                return len(self.model_name2worker_) > 0
+            return model_name in self.model_name2worker_
+
+    def model_info(self, model_name):
+        return self._get_worker(model_name).info
+
+    def _get_worker(self, model_name):
+        with self.lock_:
+            worker = self.model_name2worker_.get(model_name)
+        if worker is None:
+            raise KeyError("model {} is not loaded".format(model_name))
+        return worker
+
+    def submit(self, model_name, job_name=None, **kwargs):
+        """Routes a request to the current version of `model_name`.
+
+        Returns a :class:`concurrent.futures.Future` of its outputs.
+        """
+        while True:
+            worker = self._get_worker(model_name)
+            try:
+                return worker.submit(job_name or worker.info["jobs"][0], kwargs)
+            except _WorkerRetired:
+                # swapped out in the meantime, retry with the new version
+                continue
+
+    def run(self, model_name, job_name=None, **kwargs):
+        return self.submit(model_name, job_name, **kwargs).result()
+
+    async def async_run(self, model_name, job_name=None, **kwargs):
+        return await asyncio.wrap_future(self.submit(model_name, job_name, **kwargs))
+
+    def unload(self, model_name):
+        """Unloads `model_name`, including the versions still being loaded"""
+        with self.lock_:
+            if (
+                model_name not in self.model_name2worker_
+                and model_name not in self.model_name2num_loading_
+            ):
+                raise KeyError("model {} is not loaded".format(model_name))
+            worker = self.model_name2worker_.pop(model_name, None)
+            # the versions still being loaded are dropped once they are ready
+            self.model_name2seq_[model_name] = next(self.seqs_)
+        if worker is not None:
+            worker.close()
+
+    def close(self):
+        with self.lock_:
+            swap_threads = list(self.swap_threads_)
+        for thread in swap_threads:
+            thread.join()
+        with self.lock_:
+            (workers, self.model_name2worker_) = (self.model_name2worker_, {})
+        for worker in workers.values():
+            worker.close()
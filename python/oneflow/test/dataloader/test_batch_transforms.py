@@ -0,0 +1,89 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+import oneflow.utils.vision.transforms as transforms
+
+
+MEAN = (0.485, 0.456, 0.406)
+STD = (0.229, 0.224, 0.225)
+
+
+def _reference(batch):
+    mean = np.array(MEAN, dtype=np.float32).reshape(1, 3, 1, 1)
+    std = np.array(STD, dtype=np.float32).reshape(1, 3, 1, 1)
+    return (batch.astype(np.float32) / 255 - mean) / std
+
+
+def _check_batch_compose(test_case, device):
+    batch = np.random.randint(0, 256, size=(8, 3, 16, 16)).astype(np.uint8)
+    to_tensor = transforms.BatchToTensor()
+    normalize = transforms.BatchNormalize(MEAN, STD)
+    fused = transforms.BatchCompose([to_tensor, normalize])
+    unfused = transforms.Compose([to_tensor, normalize])
+    x = flow.tensor(batch, device=flow.device(device))
+    fused_out = fused(x)
+    test_case.assertEqual(fused_out.dtype, flow.float32)
+    test_case.assertEqual(fused_out.shape, flow.Size([8, 3, 16, 16]))
+    test_case.assertTrue(
+        np.allclose(fused_out.numpy(), _reference(batch), rtol=1e-4, atol=1e-4)
+    )
+    test_case.assertTrue(
+        np.allclose(unfused(x).numpy(), _reference(batch), rtol=1e-4, atol=1e-4)
+    )
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestBatchTransforms(flow.unittest.TestCase):
+    def test_batch_compose_cpu(test_case):
+        _check_batch_compose(test_case, "cpu")
+
+    @unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test cpu cases")
+    def test_batch_compose_cuda(test_case):
+        _check_batch_compose(test_case, "cuda")
+
+    def test_batch_to_tensor_grayscale(test_case):
+        batch = np.random.randint(0, 256, size=(4, 28, 28)).astype(np.uint8)
+        out = transforms.BatchToTensor()(batch)
+        test_case.assertEqual(out.shape, flow.Size([4, 1, 28, 28]))
+        test_case.assertTrue(
+            np.allclose(out.numpy()[:, 0], batch.astype(np.float32) / 255)
+        )
+
+    def test_batch_compose_with_resize(test_case):
+        batch = np.random.randint(0, 256, size=(2, 3, 32, 32)).astype(np.uint8)
+        pipeline = transforms.BatchCompose(
+            [
+                transforms.BatchToTensor(),
+                transforms.Resize((16, 16)),
+                transforms.BatchNormalize(MEAN, STD),
+            ]
+        )
+        test_case.assertEqual(pipeline(batch).shape, flow.Size([2, 3, 16, 16]))
+
+    def test_zero_std(test_case):
+        with test_case.assertRaises(ValueError):
+            transforms.BatchNormalize((0.5,), (0.0,))(np.zeros((1, 1, 2, 2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+import oneflow.utils.data as data
+
+
+class SequenceDataset(flow.utils.data.Dataset):
+    def __init__(self, lengths):
+        self.lengths = lengths
+
+    def __getitem__(self, index):
+        tokens = np.full((self.lengths[index],), index + 1, dtype=np.int64)
+        return (tokens, index)
+
+    def __len__(self):
+        return len(self.lengths)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestBucketBatchSampler(flow.unittest.TestCase):
+    def test_sorted_batches(test_case):
+        lengths = np.random.randint(1, 50, size=101).tolist()
+        sampler = data.BucketBatchSampler(range(101), lengths, batch_size=8)
+        batches = list(sampler)
+        test_case.assertEqual(len(batches), len(sampler))
+        test_case.assertEqual(len(sampler), 13)
+        indices = [i for batch in batches for i in batch]
+        test_case.assertEqual(sorted(indices), list(range(101)))
+        # every batch holds neighbouring lengths of the sorted order
+        sorted_lengths = sorted(lengths)
+        spread = sum(
+            max(lengths[i] for i in b) - min(lengths[i] for i in b) for b in batches
+        )
+        test_case.assertLessEqual(spread, sorted_lengths[-1] - sorted_lengths[0])
+
+    def test_bucket_boundaries(test_case):
+        lengths = np.random.randint(1, 40, size=64).tolist()
+        boundaries = [10, 20, 30]
+        sampler = data.BucketBatchSampler(
+            range(64),
+            lambda i: lengths[i],
+            batch_size=4,
+            bucket_boundaries=boundaries,
+            drop_last=True,
+        )
+        batches = list(sampler)
+        test_case.assertEqual(len(batches), len(sampler))
+        for batch in batches:
+            test_case.assertEqual(len(batch), 4)
+            buckets = np.digitize([lengths[i] for i in batch], boundaries)
+            test_case.assertEqual(len(set(buckets.tolist())), 1)
+
+    def test_pad_collate(test_case):
+        collate_fn = data.PadCollate(padding_value=-1)
+        (tokens, index) = collate_fn([([1, 2, 3], 0), ([4], 1)])
+        test_case.assertEqual(tokens.dtype, flow.int64)
+        test_case.assertTrue(
+            np.array_equal(tokens.numpy(), np.array([[1, 2, 3], [4, -1, -1]]))
+        )
+        test_case.assertTrue(np.array_equal(index.numpy(), np.array([0, 1])))
+
+    def test_dataloader(test_case):
+        lengths = np.random.randint(1, 30, size=50).tolist()
+        dataset = SequenceDataset(lengths)
+        sampler = data.BucketBatchSampler(dataset, lengths, batch_size=5)
+        for num_workers in (0, 2):
+            dataloader = data.DataLoader(
+                dataset,
+                batch_sampler=sampler,
+                collate_fn=data.PadCollate(),
+                num_workers=num_workers,
+            )
+            seen = []
+            for (tokens, index) in dataloader:
+                index = index.numpy().tolist()
+                batch_lengths = [lengths[i] for i in index]
+                test_case.assertEqual(tokens.shape, (len(index), max(batch_lengths)))
+                test_case.assertTrue(
+                    np.array_equal((tokens.numpy() != 0).sum(axis=1), batch_lengths)
+                )
+                seen.extend(index)
+            test_case.assertEqual(sorted(seen), list(range(50)))
+
+
+if __name__ == "__main__":
+    unittest.main()
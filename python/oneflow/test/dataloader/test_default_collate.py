@@ -0,0 +1,69 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import collections
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.utils.data._utils.collate import default_collate
+
+
+Point = collections.namedtuple("Point", ["x", "y"])
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestDefaultCollate(flow.unittest.TestCase):
+    def test_numpy_arrays(test_case):
+        batch = [np.random.randn(3, 5) for _ in range(16)]
+        out = default_collate(batch)
+        test_case.assertEqual(out.shape, flow.Size([16, 3, 5]))
+        test_case.assertEqual(out.dtype, flow.float32)
+        test_case.assertTrue(
+            np.allclose(out.numpy(), np.stack(batch).astype(np.float32))
+        )
+
+    def test_numpy_scalars(test_case):
+        batch = [np.int64(i) for i in range(8)]
+        out = default_collate(batch)
+        test_case.assertEqual(out.shape, flow.Size([8]))
+        test_case.assertEqual(out.dtype, flow.float32)
+        test_case.assertTrue(np.array_equal(out.numpy(), np.arange(8)))
+
+    def test_nested_samples(test_case):
+        batch = [
+            {"image": np.full((2, 2), i, dtype=np.uint8), "label": i} for i in range(4)
+        ]
+        out = default_collate(batch)
+        test_case.assertEqual(out["image"].shape, flow.Size([4, 2, 2]))
+        test_case.assertEqual(out["image"].dtype, flow.float32)
+        test_case.assertEqual(out["label"].dtype, flow.int64)
+        test_case.assertTrue(np.array_equal(out["label"].numpy(), np.arange(4)))
+        batch = [Point(np.ones(3) * i, float(i)) for i in range(4)]
+        out = default_collate(batch)
+        test_case.assertTrue(isinstance(out, Point))
+        test_case.assertEqual(out.x.shape, flow.Size([4, 3]))
+        test_case.assertEqual(out.y.dtype, flow.float64)
+        batch = [(np.zeros(2), np.ones(2)) for _ in range(4)]
+        (first, second) = default_collate(batch)
+        test_case.assertEqual(first.shape, flow.Size([4, 2]))
+        test_case.assertTrue(np.array_equal(second.numpy(), np.ones((4, 2))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+import oneflow.utils.data as data
+
+
+class FailingDataset(flow.utils.data.Dataset):
+    def __getitem__(self, index):
+        if index == 5:
+            raise ValueError("bad sample")
+        return np.full((3,), index, dtype=np.float32)
+
+    def __len__(self):
+        return 10
+
+
+def _check_prefetched_batches(test_case, device):
+    features = flow.Tensor(np.arange(40).reshape(20, 2))
+    labels = flow.tensor(np.arange(20), dtype=flow.int64)
+    loader = data.DataLoader(data.TensorDataset(features, labels), batch_size=6)
+    prefetcher = data.DevicePrefetcher(loader, device=device, num_prefetch=3)
+    test_case.assertEqual(len(prefetcher), 4)
+    for epoch in range(2):
+        values = []
+        for (x, y) in prefetcher:
+            test_case.assertEqual(x.device, flow.device(device))
+            test_case.assertEqual(y.device, flow.device(device))
+            values.extend(y.numpy().tolist())
+        test_case.assertEqual(values, list(range(20)))
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestDevicePrefetcher(flow.unittest.TestCase):
+    def test_cpu_prefetch(test_case):
+        _check_prefetched_batches(test_case, "cpu")
+
+    @unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test cpu cases")
+    def test_cuda_prefetch(test_case):
+        _check_prefetched_batches(test_case, "cuda")
+
+    def test_nested_batch(test_case):
+        batches = [{"x": flow.Tensor(np.ones((2, 2))), "name": "a"}, [1, 2]]
+        out = list(data.DevicePrefetcher(batches, device="cpu"))
+        test_case.assertEqual(out[0]["name"], "a")
+        test_case.assertEqual(out[0]["x"].shape, flow.Size([2, 2]))
+        test_case.assertEqual(out[1], [1, 2])
+
+    def test_exception(test_case):
+        loader = data.DataLoader(FailingDataset(), batch_size=2)
+        with test_case.assertRaises(ValueError):
+            for _ in data.DevicePrefetcher(loader, device="cpu"):
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+
+import oneflow as flow
+import oneflow.unittest
+import oneflow.utils.data as data
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestDistributedSampler(flow.unittest.TestCase):
+    def test_shards_are_disjoint(test_case):
+        dataset = list(range(103))
+        samplers = [
+            data.DistributedSampler(dataset, num_replicas=4, rank=rank)
+            for rank in range(4)
+        ]
+        shards = [list(sampler) for sampler in samplers]
+        for shard in shards:
+            test_case.assertEqual(len(shard), 26)
+        # 104 indices in total, one of them is padded from the start
+        test_case.assertEqual(sorted(set(sum(shards, []))), dataset)
+        test_case.assertEqual(len(sum(shards, [])), 104)
+
+    def test_drop_last(test_case):
+        dataset = list(range(103))
+        shards = [
+            list(
+                data.DistributedSampler(
+                    dataset, num_replicas=4, rank=rank, shuffle=False, drop_last=True
+                )
+            )
+            for rank in range(4)
+        ]
+        test_case.assertEqual(shards[1], list(range(1, 100, 4)))
+        test_case.assertEqual(len(set(sum(shards, []))), 100)
+
+    def test_set_epoch(test_case):
+        dataset = list(range(50))
+        sampler = data.DistributedSampler(dataset, num_replicas=2, rank=1, seed=3)
+        other = data.DistributedSampler(dataset, num_replicas=2, rank=1, seed=3)
+        first_epoch = list(sampler)
+        test_case.assertEqual(first_epoch, list(other))
+        test_case.assertEqual(first_epoch, list(sampler))
+        sampler.set_epoch(1)
+        test_case.assertNotEqual(first_epoch, list(sampler))
+        other.set_epoch(1)
+        other.rank = 0
+        test_case.assertEqual(sorted(list(sampler) + list(other)), dataset)
+
+    def test_invalid_rank(test_case):
+        with test_case.assertRaises(ValueError):
+            data.DistributedSampler(list(range(10)), num_replicas=2, rank=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
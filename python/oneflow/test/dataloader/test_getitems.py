@@ -0,0 +1,106 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+import oneflow.utils.data as data
+
+
+class CountingDataset(flow.utils.data.Dataset):
+    def __init__(self, length=20):
+        self.length = length
+        self.getitems_calls = 0
+
+    def __getitem__(self, index):
+        return np.full((2,), index, dtype=np.float32)
+
+    def __getitems__(self, indices):
+        self.getitems_calls += 1
+        return [self[i] for i in indices]
+
+    def __len__(self):
+        return self.length
+
+
+class DoubledTensorDataset(data.TensorDataset):
+    def __getitem__(self, index):
+        return tuple(tensor[index] * 2 for tensor in self.tensors)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestGetitems(flow.unittest.TestCase):
+    def test_dataloader_calls_getitems(test_case):
+        dataset = CountingDataset()
+        dataloader = data.DataLoader(dataset, batch_size=8)
+        values = []
+        for x in dataloader:
+            values.extend(x.numpy()[:, 0].tolist())
+        test_case.assertEqual(values, list(range(20)))
+        test_case.assertEqual(dataset.getitems_calls, 3)
+
+    def test_tensor_dataset(test_case):
+        features = flow.tensor(np.arange(30).reshape(10, 3), dtype=flow.float32)
+        labels = flow.tensor(np.arange(10), dtype=flow.int64)
+        dataset = data.TensorDataset(features, labels)
+        indices = [3, 0, -1, 7]
+        dataloader = data.DataLoader(dataset, batch_size=4, sampler=indices)
+        (x, y) = next(iter(dataloader))
+        test_case.assertEqual(x.shape, flow.Size([4, 3]))
+        test_case.assertEqual(y.dtype, flow.int64)
+        test_case.assertTrue(np.array_equal(y.numpy(), [3, 0, 9, 7]))
+        test_case.assertTrue(
+            np.array_equal(x.numpy(), np.arange(30).reshape(10, 3)[[3, 0, 9, 7]])
+        )
+        samples = dataset.__getitems__(indices)
+        test_case.assertEqual(len(samples), 4)
+        test_case.assertEqual(samples[2][1].numpy().item(), 9)
+        with test_case.assertRaises(IndexError):
+            dataset.__getitems__([10])
+
+    def test_subset_and_concat_dataset(test_case):
+        first = CountingDataset(length=5)
+        second = CountingDataset(length=5)
+        concat = data.ConcatDataset([first, second])
+        samples = concat.__getitems__([6, 1, 9, 0])
+        test_case.assertEqual([s[0] for s in samples], [1, 1, 4, 0])
+        test_case.assertEqual(first.getitems_calls, 1)
+        test_case.assertEqual(second.getitems_calls, 1)
+        subset = data.Subset(concat, [9, 8, 7])
+        samples = subset.__getitems__([0, 2])
+        test_case.assertEqual([s[0] for s in samples], [4, 2])
+        test_case.assertEqual(second.getitems_calls, 2)
+        with test_case.assertRaises(IndexError):
+            concat.__getitems__([3, 10])
+        with test_case.assertRaises(IndexError):
+            subset.__getitems__([3])
+
+    def test_overridden_getitem(test_case):
+        features = flow.tensor(np.arange(10), dtype=flow.float32)
+        dataset = DoubledTensorDataset(features)
+        dataloader = data.DataLoader(dataset, batch_size=4)
+        (x,) = next(iter(dataloader))
+        test_case.assertTrue(np.array_equal(x.numpy(), [0, 2, 4, 6]))
+        subset = data.Subset(dataset, [9, 1])
+        (x,) = next(iter(data.DataLoader(subset, batch_size=2)))
+        test_case.assertTrue(np.array_equal(x.numpy(), [18, 2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import struct
+import tempfile
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+
+
+def _write_idx(path, array):
+    with open(path, "wb") as f:
+        f.write(struct.pack(">I", (8 << 8) + array.ndim))
+        for dim in array.shape:
+            f.write(struct.pack(">I", dim))
+        f.write(array.astype(np.uint8).tobytes())
+
+
+def _make_fake_mnist(root, num_images=12):
+    raw_folder = os.path.join(root, "MNIST", "raw")
+    os.makedirs(raw_folder)
+    images = np.random.randint(0, 256, size=(num_images, 28, 28))
+    labels = np.arange(num_images) % 10
+    for prefix in ("train", "t10k"):
+        _write_idx(os.path.join(raw_folder, prefix + "-images-idx3-ubyte"), images)
+        _write_idx(os.path.join(raw_folder, prefix + "-labels-idx1-ubyte"), labels)
+    return images.astype(np.uint8), labels
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestMNISTMmap(flow.unittest.TestCase):
+    def test_mmap_numpy_samples(test_case):
+        with tempfile.TemporaryDirectory() as root:
+            (images, labels) = _make_fake_mnist(root)
+            dataset = flow.utils.vision.datasets.MNIST(
+                root, train=True, mmap=True, pil_image=False
+            )
+            test_case.assertTrue(isinstance(dataset.data, np.memmap))
+            test_case.assertEqual(len(dataset), 12)
+            for i in range(len(dataset)):
+                (img, target) = dataset[i]
+                test_case.assertEqual(img.dtype, np.uint8)
+                test_case.assertTrue(np.array_equal(img, images[i]))
+                test_case.assertEqual(target, labels[i])
+            del dataset
+
+    def test_mmap_matches_tensor_dataset(test_case):
+        with tempfile.TemporaryDirectory() as root:
+            _make_fake_mnist(root)
+            dataset = flow.utils.vision.datasets.MNIST(root, train=False)
+            mmap_dataset = flow.utils.vision.datasets.MNIST(
+                root, train=False, mmap=True
+            )
+            for i in range(len(dataset)):
+                (img, target) = dataset[i]
+                (mmap_img, mmap_target) = mmap_dataset[i]
+                test_case.assertTrue(np.array_equal(np.array(img), np.array(mmap_img)))
+                test_case.assertEqual(target, mmap_target)
+            del mmap_dataset
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import pickle
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+import oneflow.utils.data as data
+
+
+class RangeDataset(flow.utils.data.Dataset):
+    def __init__(self, length=100, dim=4):
+        self.length = length
+        self.dim = dim
+
+    def __getitem__(self, index):
+        worker_info = data.get_worker_info()
+        worker_id = -1 if worker_info is None else worker_info.id
+        return (np.full((self.dim,), index, dtype=np.float32), worker_id)
+
+    def __len__(self):
+        return self.length
+
+
+class RangeIterableDataset(flow.utils.data.IterableDataset):
+    def __init__(self, length=100):
+        self.length = length
+
+    def __iter__(self):
+        worker_info = data.get_worker_info()
+        if worker_info is None:
+            return iter(range(self.length))
+        return iter(range(worker_info.id, self.length, worker_info.num_workers))
+
+
+class FailingDataset(RangeDataset):
+    def __getitem__(self, index):
+        if index == 7:
+            raise ValueError("bad sample")
+        return super().__getitem__(index)
+
+
+class TensorDataset(RangeDataset):
+    def __getitem__(self, index):
+        return flow.utils.vision.transforms.ToTensor()(
+            np.full((2, 2, 3), index, dtype=np.uint8)
+        )
+
+
+def _record_worker_init(worker_id):
+    np.random.seed(worker_id)
+
+
+def _numpy_collate(batch):
+    return np.stack([x for (x, _) in batch])
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestMultiprocessDataLoader(flow.unittest.TestCase):
+    def test_ordered_batches(test_case):
+        dataset = RangeDataset()
+        dataloader = data.DataLoader(
+            dataset, batch_size=8, num_workers=3, prefetch_factor=4
+        )
+        test_case.assertEqual(len(dataloader), 13)
+        indices = []
+        worker_ids = set()
+        for (x, worker_id) in dataloader:
+            test_case.assertTrue(isinstance(x, flow.Tensor))
+            test_case.assertEqual(x.dtype, flow.float32)
+            indices.extend(x.numpy()[:, 0].astype(np.int64).tolist())
+            worker_ids.update(worker_id.numpy().tolist())
+        test_case.assertEqual(indices, list(range(100)))
+        test_case.assertEqual(worker_ids, {0, 1, 2})
+
+    def test_persistent_workers(test_case):
+        dataset = RangeDataset(length=20)
+        dataloader = data.DataLoader(
+            dataset,
+            batch_size=4,
+            shuffle=True,
+            num_workers=2,
+            persistent_workers=True,
+            worker_init_fn=_record_worker_init,
+        )
+        for _ in range(3):
+            indices = []
+            for (x, _) in dataloader:
+                indices.extend(x.numpy()[:, 0].astype(np.int64).tolist())
+            test_case.assertEqual(sorted(indices), list(range(20)))
+
+    def test_iterable_dataset(test_case):
+        dataset = RangeIterableDataset(length=30)
+        dataloader = data.DataLoader(dataset, batch_size=5, num_workers=3)
+        values = []
+        for x in dataloader:
+            values.extend(x.numpy().tolist())
+        test_case.assertEqual(sorted(values), list(range(30)))
+
+    def test_shared_memory_batch(test_case):
+        from oneflow.utils.data._utils import shared_memory
+
+        sharing_dir = shared_memory.make_sharing_dir()
+        shared_memory.set_sharing_dir(sharing_dir)
+        try:
+            arr = shared_memory.empty((64, 1024), np.float32)
+            arr[:] = np.arange(1024, dtype=np.float32)
+            payload = pickle.dumps(arr)
+            # only the file name, shape and dtype are pickled
+            test_case.assertLess(len(payload), 1024)
+            test_case.assertEqual(len(os.listdir(sharing_dir)), 1)
+            rebuilt = pickle.loads(payload)
+            test_case.assertEqual(len(os.listdir(sharing_dir)), 0)
+            test_case.assertTrue(np.array_equal(rebuilt, arr))
+            # views are pickled by value
+            view = pickle.loads(pickle.dumps(arr[1]))
+            test_case.assertTrue(np.array_equal(view, arr[1]))
+        finally:
+            shared_memory.set_sharing_dir(None)
+            os.rmdir(sharing_dir)
+
+    def test_custom_collate(test_case):
+        for num_workers in [0, 2]:
+            dataloader = data.DataLoader(
+                RangeDataset(length=8),
+                batch_size=4,
+                num_workers=num_workers,
+                collate_fn=_numpy_collate,
+            )
+            batches = list(dataloader)
+            # the batches of a custom collate_fn are not converted
+            for (i, batch) in enumerate(batches):
+                test_case.assertTrue(isinstance(batch, np.ndarray))
+                test_case.assertEqual(
+                    batch[:, 0].tolist(), list(range(i * 4, i * 4 + 4))
+                )
+
+    def test_tensor_in_worker(test_case):
+        dataloader = data.DataLoader(TensorDataset(), batch_size=4, num_workers=2)
+        with test_case.assertRaises(RuntimeError):
+            for _ in dataloader:
+                pass
+        # fine without workers
+        batch = next(iter(data.DataLoader(TensorDataset(), batch_size=4)))
+        test_case.assertEqual(batch.shape, (4, 3, 2, 2))
+        # tensors created before the workers are forked can not be returned
+        tensors = [flow.tensor([i]) for i in range(8)]
+        dataloader = data.DataLoader(
+            tensors, batch_size=4, num_workers=2, collate_fn=list
+        )
+        with test_case.assertRaises(TypeError):
+            for _ in dataloader:
+                pass
+
+    def test_worker_exception(test_case):
+        dataloader = data.DataLoader(FailingDataset(), batch_size=4, num_workers=2)
+        with test_case.assertRaises(ValueError):
+            for _ in dataloader:
+                pass
+
+
+if __name__ == "__main__":
+    unittest.main()
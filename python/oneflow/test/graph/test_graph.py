@@ -195,8 +195,8 @@ class TestGraph(flow.unittest.TestCase):
             def forward(self, x):
                 scope = oneflow.current_scope()
                 scope_proto = graph_build_util.scope_to_proto(scope)
-                ck_bool = scope_proto.attr_name2attr_value["checkpointing"].at_bool
-                test_case.assertEqual(ck_bool, True)
+                ck_bool = scope_proto.attr_name2attr_value["checkpointing"]
+                test_case.assertEqual(ck_bool.WhichOneof("value"), None)
                 stage_int = scope_proto.attr_name2attr_value[
                     "pipeline_stage_id_hint"
                 ].at_int64
@@ -261,19 +261,49 @@ class TestGraph(flow.unittest.TestCase):
                 super().__init__()
                 self.m = m
                 self.m.layer0.config.stage_id = 0
-                self.m.layer0.config.activation_checkpointing = True
                 self.m.layer1.config.stage_id = 1
+                # stages are pipelined over micro-batches
+                self.config.set_gradient_accumulation_steps(2)
 
             def build(self, x, y):
                 return self.m(x, y)
 
         g = CustomGraphBlockScope()
-        x = np.ones((1, 1, 10, 10))
+        x = np.ones((2, 1, 10, 10))
         x = flow.tensor(x, dtype=flow.float32)
-        y = np.ones((16, 36))
+        y = np.ones((2, 36))
         y = flow.tensor(y, dtype=flow.float32)
         g._compile(x, y)
 
+    def test_block_config(test_case):
+        class CustomGraphBlockConfig(flow.nn.Graph):
+            def __init__(self, module):
+                super().__init__()
+                self.m = module
+
+            def build(self, x):
+                return self.m(x)
+
+        g = CustomGraphBlockConfig(flow.nn.Linear(4, 4))
+        x = flow.tensor(np.ones((2, 4)), dtype=flow.float32)
+        with test_case.assertRaises(ValueError):
+            g.m.config.stage_id = -1
+        with test_case.assertRaises(ValueError):
+            g.m.config.activation_checkpointing = 1
+        # checkpointing needs an optimizer
+        g.m.config.activation_checkpointing = True
+        with test_case.assertRaises(ValueError):
+            g._compile(x)
+        g.m.config.activation_checkpointing = False
+        # stages need gradient accumulation
+        g.m.config.stage_id = 1
+        with test_case.assertRaises(ValueError):
+            g._compile(x)
+        g.m.config.stage_id = 0
+        g._compile(x)
+        with test_case.assertRaises(RuntimeError):
+            g.m.config.activation_checkpointing = True
+
 
 if __name__ == "__main__":
     unittest.main()
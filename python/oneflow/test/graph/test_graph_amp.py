@@ -0,0 +1,108 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import os
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.framework.c_api_util as c_api_util
+import oneflow.unittest
+
+
+def _amp_list(proto, name):
+    size = getattr(proto, "amp_{}_list_size".format(name))()
+    return [getattr(proto, "amp_{}_list".format(name))(i) for i in range(size)]
+
+
+def _num_cast_ops(job_name):
+    (job,) = [
+        job for job in c_api_util.GetJobSet().job if job.job_conf.job_name == job_name
+    ]
+    return len(
+        [
+            op
+            for op in job.net.op
+            if op.HasField("user_conf") and op.user_conf.op_type_name == "cast"
+        ]
+    )
+
+
+class LinearGraph(flow.nn.Graph):
+    def __init__(self, module, black_list=None):
+        super().__init__()
+        self.m = module
+        self.config.enable_amp(black_list=black_list)
+
+    def build(self, x):
+        return self.m(x)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestGraphAMP(flow.unittest.TestCase):
+    def test_amp_config(test_case):
+        config = flow.nn.graph.GraphConfig()
+        config.enable_amp(white_list=["matmul"], black_list=["softmax", "gelu"])
+        test_case.assertTrue(config.proto.enable_auto_mixed_precision())
+        test_case.assertEqual(_amp_list(config.proto, "white"), ["matmul"])
+        test_case.assertEqual(_amp_list(config.proto, "black"), ["softmax", "gelu"])
+        test_case.assertEqual(_amp_list(config.proto, "gray"), [])
+        test_case.assertEqual(_amp_list(config.proto, "clear"), [])
+        # the lists are replaced, not extended
+        config.enable_amp(gray_list=["relu"])
+        test_case.assertEqual(_amp_list(config.proto, "white"), [])
+        test_case.assertEqual(_amp_list(config.proto, "gray"), ["relu"])
+        config.enable_amp(False)
+        test_case.assertFalse(config.proto.enable_auto_mixed_precision())
+        for name in ["white", "black", "gray", "clear"]:
+            test_case.assertEqual(_amp_list(config.proto, name), [])
+
+    @unittest.skipIf(os.getenv("ONEFLOW_TEST_CPU_ONLY"), "only test cpu cases")
+    def test_amp_list_override(test_case):
+        # AutoMixedPrecision only casts ops placed on gpu
+        m = flow.nn.Linear(8, 4)
+        m.to("cuda")
+        x = flow.Tensor(np.ones((2, 8), dtype=np.float32)).to("cuda")
+        g = LinearGraph(m)
+        g._compile(x)
+        # matmul is in the default white list, it runs in half precision
+        test_case.assertGreater(_num_cast_ops(g.name), 0)
+        g = LinearGraph(m, black_list=["matmul", "broadcast_matmul"])
+        g._compile(x)
+        # moved into the black list, nothing around it is cast to half
+        test_case.assertEqual(_num_cast_ops(g.name), 0)
+
+    def test_dynamic_loss_scale(test_case):
+        config = flow.nn.graph.GraphConfig()
+        config.set_dynamic_loss_scale(
+            initial_loss_scale=1024.0, increment_period=100, multiplier=4.0
+        )
+        # only training graphs scale the loss
+        test_case.assertFalse(config.proto.has_train_conf())
+        config._train(True)
+        train_conf = config.proto.train_conf()
+        test_case.assertTrue(train_conf.has_dynamic_loss_scale_policy())
+        policy = train_conf.dynamic_loss_scale_policy()
+        test_case.assertEqual(policy.initial_loss_scale(), 1024.0)
+        test_case.assertEqual(policy.increment_period(), 100.0)
+        test_case.assertEqual(policy.multiplier(), 4.0)
+        with test_case.assertRaises(AssertionError):
+            config.set_dynamic_loss_scale(multiplier=1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
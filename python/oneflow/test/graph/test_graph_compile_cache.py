@@ -0,0 +1,149 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+
+
+class LinearGraph(flow.nn.Graph):
+    def __init__(self, module):
+        super().__init__()
+        self.m = module
+
+    def build(self, x):
+        return self.m(x)
+
+
+def _random_input(batch_size):
+    return flow.Tensor(
+        np.random.uniform(-1, 1, (batch_size, 8)).astype(np.float32),
+        device=flow.device("cuda"),
+    )
+
+
+def _compile_with_cache_dir(cache_dir):
+    np.random.seed(0)
+    m = flow.nn.Linear(8, 4)
+    m.weight.copy_(np.random.uniform(-1, 1, (4, 8)).astype(np.float32))
+    m.bias.copy_(np.random.uniform(-1, 1, (4,)).astype(np.float32))
+    m.to("cuda")
+    x = _random_input(4)
+    g = LinearGraph(m)
+    g.config.set_compile_cache_dir(cache_dir)
+    y = g(x)
+    # a graph compiled after the cached one gets fresh ids and still runs
+    other = LinearGraph(m)
+    other_y = other(x)
+    assert np.allclose(other_y.numpy(), y.numpy(), rtol=1e-4, atol=1e-4)
+    return (g.compile_cache_info().disk_hits, y.numpy(), m(x).numpy())
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestGraphCompileCache(flow.unittest.TestCase):
+    def test_plan_per_signature(test_case):
+        m = flow.nn.Linear(8, 4)
+        m.to("cuda")
+        g = LinearGraph(m)
+        g.config.set_compile_cache_size(2)
+        for batch_size in (4, 4, 2, 4, 3, 2):
+            x = _random_input(batch_size)
+            y = g(x)
+            test_case.assertEqual(y.shape, (batch_size, 4))
+            test_case.assertTrue(
+                np.allclose(y.numpy(), m(x).numpy(), rtol=1e-4, atol=1e-4)
+            )
+        info = g.compile_cache_info()
+        test_case.assertEqual(info.hits, 2)
+        test_case.assertEqual(info.misses, 4)
+        test_case.assertEqual(info.evictions, 2)
+        test_case.assertEqual(info.size, 2)
+        test_case.assertGreater(info.compile_time, 0)
+        # the first plan was evicted, nothing keeps its runtime alive
+        test_case.assertIsNone(g._c_nn_graph)
+        test_case.assertIsNotNone(g._graph_proto)
+
+    def test_batch_size_buckets(test_case):
+        m = flow.nn.Linear(8, 4)
+        m.to("cuda")
+        g = LinearGraph(m)
+        g.config.set_batch_size_buckets([8, 4])
+        for batch_size in (3, 4, 1, 6, 10):
+            x = _random_input(batch_size)
+            y = g(x)
+            test_case.assertEqual(y.shape, (batch_size, 4))
+            test_case.assertTrue(
+                np.allclose(y.numpy(), m(x).numpy(), rtol=1e-4, atol=1e-4)
+            )
+        info = g.compile_cache_info()
+        # 3, 4 and 1 share the plan of bucket 4, 10 is larger than every bucket
+        test_case.assertEqual(info.misses, 3)
+        test_case.assertEqual(info.hits, 2)
+
+    @unittest.skip(
+        " NOTE(chengcheng): nn.Graph train cannot run right now for JobCompleter."
+    )
+    def test_train_graph_single_signature(test_case):
+        m = flow.nn.Linear(8, 4)
+        m.to("cuda")
+        sgd = flow.optim.SGD([{"params": m.parameters(), "lr": 0.1}])
+
+        class TrainGraph(flow.nn.Graph):
+            def __init__(self):
+                super().__init__()
+                self.m = m
+                self.add_optimizer("sgd", sgd)
+
+            def build(self, x):
+                out = self.m(x).sum()
+                out.backward()
+                return out
+
+        g = TrainGraph()
+        g(_random_input(4))
+        g(_random_input(4))
+        with test_case.assertRaises(RuntimeError):
+            g(_random_input(2))
+        test_case.assertEqual(g.compile_cache_info().size, 1)
+
+    def test_compile_cache_dir(test_case):
+        ctx = multiprocessing.get_context("spawn")
+        with tempfile.TemporaryDirectory() as cache_dir:
+            results = []
+            # every run compiles the graph in a fresh process, the second one
+            # loads the completed job cached by the first one
+            for _ in range(2):
+                with ctx.Pool(1) as pool:
+                    results.append(pool.apply(_compile_with_cache_dir, (cache_dir,)))
+                files = os.listdir(cache_dir)
+                test_case.assertEqual(len(files), 1)
+                test_case.assertTrue(files[0].endswith(".job"))
+        ((first_disk_hits, first_y, first_expected), (disk_hits, y, expected)) = results
+        test_case.assertEqual(first_disk_hits, 0)
+        test_case.assertEqual(disk_hits, 1)
+        test_case.assertTrue(np.allclose(first_y, first_expected, rtol=1e-4, atol=1e-4))
+        test_case.assertTrue(np.allclose(y, expected, rtol=1e-4, atol=1e-4))
+        test_case.assertTrue(np.allclose(y, first_y, rtol=1e-4, atol=1e-4))
+
+
+if __name__ == "__main__":
+    unittest.main()
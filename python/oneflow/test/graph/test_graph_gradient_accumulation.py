@@ -0,0 +1,83 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+
+
+class TrainGraph(flow.nn.Graph):
+    def __init__(self, module, optimizer, steps):
+        super().__init__()
+        self.m = module
+        self.add_optimizer("sgd", optimizer)
+        self.config.set_gradient_accumulation_steps(steps)
+
+    def build(self, x):
+        out = self.m(x)
+        loss = out.sum()
+        loss.backward()
+        return (out, loss)
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestGraphGradientAccumulation(flow.unittest.TestCase):
+    def test_config(test_case):
+        config = flow.nn.graph.GraphConfig()
+        test_case.assertEqual(config.gradient_accumulation_steps, 1)
+        config.set_gradient_accumulation_steps(4)
+        config.set_pipeline_buffer_size(3)
+        test_case.assertEqual(config.gradient_accumulation_steps, 4)
+        test_case.assertEqual(config.proto.num_gradient_accumulation_steps(), 4)
+        test_case.assertEqual(config.proto.pipeline_buffer_size(), 3)
+        with test_case.assertRaises(AssertionError):
+            config.set_gradient_accumulation_steps(0)
+
+    def test_inputs_of_different_batch(test_case):
+        class AddGraph(flow.nn.Graph):
+            def __init__(self):
+                super().__init__()
+                self.config.set_gradient_accumulation_steps(2)
+
+            def build(self, x, y):
+                return x + y
+
+        g = AddGraph()
+        x = flow.Tensor(np.zeros((4, 8), dtype=np.float32))
+        y = flow.Tensor(np.zeros((2, 8), dtype=np.float32))
+        with test_case.assertRaises(AssertionError):
+            g(x, y)
+        test_case.assertFalse(g._is_compiled)
+
+    @unittest.skip("nn.Graph train cannot run right now for JobCompleter.")
+    def test_split_micro_batches(test_case):
+        m = flow.nn.Linear(8, 4)
+        sgd = flow.optim.SGD(m.parameters(), lr=0.1)
+        g = TrainGraph(m, sgd, 4)
+        x = flow.Tensor(np.random.uniform(-1, 1, (16, 8)).astype(np.float32))
+        (out, loss) = g(x)
+        test_case.assertEqual(out.shape, (16, 4))
+        # the loss is not batch-shaped, it holds the last micro-batch
+        test_case.assertEqual(loss.shape, out.sum().shape)
+        with test_case.assertRaises(AssertionError):
+            g(flow.Tensor(np.zeros((10, 8), dtype=np.float32)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,6 +15,7 @@ limitations under the License.
 """
 
 import collections.abc
+import os
 import tempfile
 import unittest
 from itertools import repeat
@@ -109,6 +110,31 @@ class TestModule(flow.unittest.TestCase):
         m = CustomModule(4)
         test_case.assertEqual(m(3), 7)
 
+    def test_forward_pre_hook(test_case):
+        class CustomModule(flow.nn.Module):
+            def __init__(self, w):
+                super().__init__()
+                self.w = w
+
+            def forward(self, x):
+                return x + self.w
+
+        m = CustomModule(5)
+        test_case.assertEqual(m(1), 6)
+        calls = []
+
+        def record(module, args):
+            calls.append(args)
+
+        def double(module, args):
+            return args[0] * 2
+
+        # hooks registered after the first call are still run, in order
+        m.register_forward_pre_hook(record)
+        m.register_forward_pre_hook(double)
+        test_case.assertEqual(m(1), 7)
+        test_case.assertEqual(calls, [(1,)])
+
     def test_train_eval(test_case):
         m = flow.nn.Module()
         test_case.assertEqual(m.training, True)
@@ -178,6 +204,104 @@ class TestModule(flow.unittest.TestCase):
         res2 = m()
         test_case.assertTrue(np.array_equal(res1.numpy(), res2.numpy()))
 
+    def test_save_state_dict_single_file(test_case):
+        class CustomModule(flow.nn.Module):
+            def __init__(self):
+                super().__init__()
+                self.param1 = flow.nn.Parameter(flow.Tensor(3, 5))
+                self.param2 = flow.nn.Parameter(flow.Tensor(7))
+
+            def forward(self):
+                return flow.sum(self.param1) + flow.sum(self.param2)
+
+        m = CustomModule()
+        res1 = m()
+        state_dict = m.state_dict()
+        with tempfile.TemporaryDirectory() as save_dir:
+            path = os.path.join(save_dir, "model.ckpt")
+            flow.save(state_dict, path, single_file=True)
+            test_case.assertEqual(os.listdir(save_dir), ["model.ckpt"])
+            loaded_state_dict = flow.load(path)
+            test_case.assertEqual(
+                sorted(loaded_state_dict.keys()), ["param1", "param2"]
+            )
+            test_case.assertTrue(
+                np.array_equal(
+                    loaded_state_dict["param1"].numpy(), state_dict["param1"].numpy()
+                )
+            )
+            m.param1 = flow.nn.Parameter(flow.Tensor(3, 5))
+            m.param2 = flow.nn.Parameter(flow.Tensor(7))
+            m.load_state_dict(loaded_state_dict)
+        res2 = m()
+        test_case.assertTrue(np.array_equal(res1.numpy(), res2.numpy()))
+
+    def test_save_state_dict_async(test_case):
+        m = flow.nn.Linear(16, 8)
+        expected = {k: v.numpy() for (k, v) in m.state_dict().items()}
+        for single_file in (False, True):
+            with tempfile.TemporaryDirectory() as save_dir:
+                path = os.path.join(save_dir, "model")
+                handle = flow.save(
+                    m.state_dict(), path, single_file=single_file, blocking=False
+                )
+                # the values were snapshotted, so they can be updated right away
+                m.weight.copy_(np.zeros((8, 16), dtype=np.float32))
+                handle.wait()
+                test_case.assertTrue(handle.done())
+                loaded_state_dict = flow.load(path)
+                for (k, v) in expected.items():
+                    test_case.assertTrue(
+                        np.array_equal(loaded_state_dict[k].numpy(), v)
+                    )
+                m.load_state_dict(loaded_state_dict)
+                test_case.assertTrue(
+                    np.array_equal(m.weight.numpy(), expected["weight"])
+                )
+
+    def test_load_state_dict_subset(test_case):
+        m = flow.nn.Sequential(flow.nn.Linear(16, 8), flow.nn.Linear(8, 4))
+        expected = {k: v.numpy() for (k, v) in m.state_dict().items()}
+        with tempfile.TemporaryDirectory() as save_dir:
+            flow.save(m.state_dict(), save_dir)
+            loaded_state_dict = flow.load(save_dir)
+            # the meta info is only parsed when the variable is used
+            for v in loaded_state_dict.values():
+                test_case.assertIsNone(v.has_meta_info_)
+            out = np.empty((8, 16), dtype=np.float32)
+            loaded_state_dict["0.weight"].read_into(out)
+            test_case.assertTrue(np.array_equal(out, expected["0.weight"]))
+            sub = flow.nn.Linear(8, 4)
+            sub.load_state_dict(
+                {k[2:]: v for (k, v) in loaded_state_dict.items() if k[0] == "1"}
+            )
+            test_case.assertIsNone(loaded_state_dict["0.bias"].has_meta_info_)
+        test_case.assertTrue(np.array_equal(sub.weight.numpy(), expected["1.weight"]))
+        test_case.assertTrue(np.array_equal(sub.bias.numpy(), expected["1.bias"]))
+
+    def test_load_state_dict_inplace(test_case):
+        from oneflow.framework.check_point_v2 import AssignValueToTensor
+
+        m = flow.nn.Linear(16, 8)
+        expected = {k: v.numpy() for (k, v) in m.state_dict().items()}
+        with tempfile.TemporaryDirectory() as save_dir:
+            flow.save(m.state_dict(), save_dir)
+            loaded_state_dict = flow.load(save_dir)
+            dst = flow.nn.Linear(16, 8)
+            weight = dst.weight
+            dst.load_state_dict(loaded_state_dict, inplace=True)
+            # the existing parameters are updated, not replaced
+            test_case.assertTrue(dst.weight is weight)
+            for (k, v) in expected.items():
+                test_case.assertTrue(np.array_equal(dst.state_dict()[k].numpy(), v))
+            # the value is read in slices of a single row
+            out = flow.Tensor(8, 16)
+            AssignValueToTensor(out, loaded_state_dict["weight"], chunk_bytes=64)
+            test_case.assertTrue(np.array_equal(out.numpy(), expected["weight"]))
+        dst = flow.nn.Linear(16, 8)
+        dst.load_state_dict(m.state_dict(), inplace=True)
+        test_case.assertTrue(np.array_equal(dst.bias.numpy(), expected["bias"]))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -35,6 +35,7 @@ def compare_with_numpy_adam(
     betas,
     weight_decay,
     eps,
+    foreach,
 ):
     random_grad_seq = []
     for _ in range(train_iters):
@@ -52,6 +53,7 @@ def compare_with_numpy_adam(
                     "eps": eps,
                     "weight_decay": weight_decay,
                     "scale": scale,
+                    "foreach": foreach,
                 }
             ]
         )
@@ -106,6 +108,7 @@ class TestAdam(flow.unittest.TestCase):
         arg_dict["betas"] = [(0.99, 0.9), (0.8, 0.7)]
         arg_dict["weight_decay"] = [0.0, 0.1]
         arg_dict["eps"] = [1e-08, 1e-07]
+        arg_dict["foreach"] = [False, True]
         for arg in GenArgList(arg_dict):
             compare_with_numpy_adam(test_case, *arg)
 
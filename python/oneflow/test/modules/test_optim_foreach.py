@@ -0,0 +1,80 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+import unittest
+from collections import OrderedDict
+
+import numpy as np
+from test_util import GenArgList
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.nn.parameter import Parameter
+
+
+def _train(optimizer_cls, device, init_values, grad_seq, foreach, **options):
+    params = [
+        Parameter(flow.Tensor(value, device=flow.device(device)))
+        for value in init_values
+    ]
+    optimizer = optimizer_cls([{"params": params, "foreach": foreach, **options}])
+    for grads in grad_seq:
+        loss = 0
+        for (param, grad) in zip(params, grads):
+            # leave one parameter without gradient to cover skipped params
+            if grad is None:
+                continue
+            grad_tensor = flow.Tensor(grad, device=flow.device(device))
+            loss = loss + flow.sum(param * grad_tensor)
+        loss.backward()
+        optimizer.step()
+        optimizer.zero_grad()
+    return [param.numpy() for param in params]
+
+
+def compare_foreach_with_per_tensor(test_case, device, optimizer_name):
+    (optimizer_cls, options) = {
+        "sgd": (flow.optim.SGD, {"lr": 0.1, "weight_decay": 0.1}),
+        "momentum": (flow.optim.SGD, {"lr": 0.1, "momentum": 0.9, "scale": 0.5}),
+        "adam": (flow.optim.Adam, {"lr": 0.1, "betas": (0.9, 0.99)}),
+        "rmsprop": (flow.optim.RMSprop, {"lr": 0.01, "centered": True}),
+    }[optimizer_name]
+    shapes = [(3, 4), (5,), (2, 3, 2), (1,), (7,)]
+    init_values = [np.random.uniform(size=s).astype(np.float32) for s in shapes]
+    grad_seq = []
+    for _ in range(5):
+        grads = [np.random.uniform(size=s).astype(np.float32) for s in shapes]
+        grads[-1] = None
+        grad_seq.append(grads)
+    per_tensor = _train(optimizer_cls, device, init_values, grad_seq, False, **options)
+    foreach = _train(optimizer_cls, device, init_values, grad_seq, True, **options)
+    for (a, b) in zip(per_tensor, foreach):
+        test_case.assertTrue(np.allclose(a, b, rtol=1e-05, atol=1e-05))
+    test_case.assertTrue(np.array_equal(foreach[-1], init_values[-1]))
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestForeachOptimizers(flow.unittest.TestCase):
+    def test_foreach_matches_per_tensor(test_case):
+        arg_dict = OrderedDict()
+        arg_dict["device"] = ["cpu", "cuda"]
+        arg_dict["optimizer_name"] = ["sgd", "momentum", "adam", "rmsprop"]
+        for arg in GenArgList(arg_dict):
+            compare_foreach_with_per_tensor(test_case, *arg)
+
+
+if __name__ == "__main__":
+    unittest.main()
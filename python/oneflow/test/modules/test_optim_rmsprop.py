@@ -37,6 +37,7 @@ def compare_with_numpy_rmsprop(
     eps,
     weight_decay,
     centered,
+    foreach,
 ):
     random_grad_seq = []
     for _ in range(train_iters):
@@ -58,6 +59,7 @@ def compare_with_numpy_rmsprop(
                     "momentum": momentum,
                     "centered": centered,
                     "scale": scale,
+                    "foreach": foreach,
                 }
             ]
         )
@@ -121,6 +123,7 @@ class TestRMSProp(flow.unittest.TestCase):
         arg_dict["eps"] = [1e-08, 1e-05]
         arg_dict["weight_decay"] = [0.1, 0.99]
         arg_dict["centered"] = [False, True]
+        arg_dict["foreach"] = [False, True]
         for arg in GenArgList(arg_dict):
             compare_with_numpy_rmsprop(test_case, *arg)
 
@@ -34,6 +34,7 @@ def compare_with_numpy_sgd(
     weight_decay,
     learning_rate,
     train_iters,
+    foreach,
 ):
     random_grad_seq = []
     for _ in range(train_iters):
@@ -50,6 +51,7 @@ def compare_with_numpy_sgd(
                     "momentum": momentum,
                     "scale": scale,
                     "weight_decay": weight_decay,
+                    "foreach": foreach,
                 }
             ]
         )
@@ -101,6 +103,7 @@ class TestOptimizers(flow.unittest.TestCase):
         arg_dict["weight_decay"] = [0.0, 0.9]
         arg_dict["learning_rate"] = [1, 0.1]
         arg_dict["train_iters"] = [10]
+        arg_dict["foreach"] = [False, True]
         for arg in GenArgDict(arg_dict):
             compare_with_numpy_sgd(test_case, **arg)
 
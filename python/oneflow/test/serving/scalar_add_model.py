@@ -0,0 +1,76 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+
+import os
+
+import oneflow.core.common.data_type_pb2 as data_type_pb
+import oneflow.core.job.job_conf_pb2 as job_conf_pb
+import oneflow.core.operator.op_conf_pb2 as op_conf_pb
+import oneflow.core.serving.saved_model_pb2 as saved_model_pb
+
+
+def make_scalar_add_graph(
+    operand, batch_size=4, is_dynamic=False, input_name="x", output_name="y"
+):
+    r"""Returns the op list and the signature of a job computing
+    `output_name = input_name + operand` on float inputs of shape (batch_size, 2)
+    """
+    input_op = op_conf_pb.OperatorConf()
+    input_op.name = input_name
+    input_op.input_conf.out = "out"
+    blob_conf = input_op.input_conf.blob_conf
+    blob_conf.shape.dim.extend([batch_size, 2])
+    blob_conf.data_type = data_type_pb.kFloat
+    blob_conf.is_dynamic = is_dynamic
+    add_op = op_conf_pb.OperatorConf()
+    add_op.name = output_name + "_add"
+    add_op.user_conf.op_type_name = "scalar_add"
+    add_op.user_conf.input["in"].s.append(input_name + "/out")
+    add_op.user_conf.output["out"].s.append(add_op.name + "/out_0")
+    add_op.user_conf.attr["has_int_operand"].at_bool = False
+    add_op.user_conf.attr["int_operand"].at_int64 = 0
+    add_op.user_conf.attr["has_float_operand"].at_bool = True
+    add_op.user_conf.attr["float_operand"].at_double = float(operand)
+    return_op = op_conf_pb.OperatorConf()
+    return_op.name = output_name
+    setattr(return_op.return_conf, "in", add_op.name + "/out_0")
+    return_op.return_conf.out = "out"
+    signature = job_conf_pb.JobSignatureDef()
+    signature.inputs[input_name].lbi.op_name = input_name
+    signature.inputs[input_name].lbi.blob_name = "out"
+    signature.inputs[input_name].blob_conf.CopyFrom(blob_conf)
+    signature.outputs[output_name].lbi.op_name = output_name
+    signature.outputs[output_name].lbi.blob_name = "out"
+    return ([input_op, add_op, return_op], signature)
+
+
+def save_scalar_add_model(saved_model_dir, version, operand, **kwargs):
+    r"""Saves a scalar add job as `version` of a saved model without variables"""
+    (op_list, signature) = make_scalar_add_graph(operand, **kwargs)
+    saved_model = saved_model_pb.SavedModel()
+    saved_model.name = "scalar_add"
+    saved_model.version = version
+    saved_model.checkpoint_dir = "variables"
+    saved_model.default_graph_name = "scalar_add"
+    graph_def = saved_model.graphs["scalar_add"]
+    graph_def.op_list.extend(op_list)
+    graph_def.signatures["default"].CopyFrom(signature)
+    graph_def.default_signature_name = "default"
+    version_dir = os.path.join(saved_model_dir, str(version))
+    os.makedirs(os.path.join(version_dir, saved_model.checkpoint_dir))
+    with open(os.path.join(version_dir, "saved_model.pb"), "wb") as f:
+        f.write(saved_model.SerializeToString())
@@ -0,0 +1,206 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+
+import asyncio
+import unittest
+
+import numpy as np
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.serving.batching import BatchScheduler
+
+
+class EchoSession(object):
+    """Stands in for an InferenceSession, its job returns the batched input
+    and the number of launches so far"""
+
+    def __init__(self, batch_size=4, error=None):
+        self.event_loop_ = asyncio.new_event_loop()
+        self.batch_size = batch_size
+        self.error = error
+        self.launched = []
+
+    def list_inputs(self, job_name=None):
+        return ("x",)
+
+    def input_info(self, input_name, job_name=None):
+        return dict(shape=(self.batch_size, 2), dtype=flow.float32)
+
+    async def _launch(self, job_name, inputs):
+        self.launched.append({k: v.copy() for (k, v) in inputs.items()})
+        if self.error is not None:
+            raise self.error
+        return [inputs["x"] * 2, np.array(len(self.launched))]
+
+
+def _rows(start, num_rows):
+    return np.arange(start * 2, (start + num_rows) * 2, dtype=np.float32).reshape(
+        num_rows, 2
+    )
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestBatchScheduler(flow.unittest.TestCase):
+    def _run(test_case, session, coro):
+        try:
+            return session.event_loop_.run_until_complete(coro)
+        finally:
+            session.event_loop_.close()
+
+    def test_coalesce_and_scatter(test_case):
+        session = EchoSession()
+        scheduler = BatchScheduler(session, "job", max_queue_delay_ms=1000.0)
+
+        async def main():
+            futures = [
+                scheduler.submit({"x": _rows(0, 1)}),
+                scheduler.submit({"x": _rows(1, 2)}),
+                scheduler.submit({"x": _rows(3, 1)}),
+            ]
+            # the batch is full, it is launched without waiting for the delay
+            return await asyncio.wait_for(asyncio.gather(*futures), 1.0)
+
+        results = test_case._run(session, main())
+        test_case.assertEqual(len(session.launched), 1)
+        test_case.assertTrue(np.array_equal(session.launched[0]["x"], _rows(0, 4)))
+        for ((y, num_launches), (start, num_rows)) in zip(
+            results, [(0, 1), (1, 2), (3, 1)]
+        ):
+            test_case.assertTrue(np.array_equal(y, _rows(start, num_rows) * 2))
+            # outputs without the batch axis are handed to every request
+            test_case.assertEqual(num_launches, 1)
+
+    def test_flush_by_delay_and_padding(test_case):
+        session = EchoSession()
+        scheduler = BatchScheduler(session, "job", max_queue_delay_ms=10.0)
+
+        async def main():
+            future = scheduler.submit({"x": _rows(0, 1)})
+            await asyncio.sleep(0)
+            test_case.assertEqual(len(session.launched), 0)
+            return await asyncio.wait_for(future, 1.0)
+
+        (y, _) = test_case._run(session, main())
+        test_case.assertEqual(len(session.launched), 1)
+        # padded with zeros to the declared batch size
+        expected = np.zeros((4, 2), dtype=np.float32)
+        expected[:1] = _rows(0, 1)
+        test_case.assertTrue(np.array_equal(session.launched[0]["x"], expected))
+        test_case.assertTrue(np.array_equal(y, _rows(0, 1) * 2))
+
+    def test_no_padding(test_case):
+        session = EchoSession()
+        scheduler = BatchScheduler(
+            session, "job", max_queue_delay_ms=1.0, pad_to_batch_size=False
+        )
+
+        async def main():
+            futures = [scheduler.submit({"x": _rows(i, 1)}) for i in range(3)]
+            await scheduler.join()
+            return await asyncio.gather(*futures)
+
+        results = test_case._run(session, main())
+        test_case.assertEqual(len(session.launched), 1)
+        test_case.assertEqual(session.launched[0]["x"].shape, (3, 2))
+        for (i, (y, _)) in enumerate(results):
+            test_case.assertTrue(np.array_equal(y, _rows(i, 1) * 2))
+
+    def test_flush_when_batch_overflows(test_case):
+        session = EchoSession()
+        scheduler = BatchScheduler(
+            session, "job", max_batch_size=3, max_queue_delay_ms=1000.0
+        )
+
+        async def main():
+            first = scheduler.submit({"x": _rows(0, 2)})
+            # does not fit next to the first request, which is launched alone
+            second = scheduler.submit({"x": _rows(2, 2)})
+            test_case.assertEqual(len(scheduler.pending_), 1)
+            await scheduler.join()
+            return await asyncio.gather(first, second)
+
+        ((y0, n0), (y1, n1)) = test_case._run(session, main())
+        test_case.assertEqual(len(session.launched), 2)
+        test_case.assertEqual((n0, n1), (1, 2))
+        test_case.assertTrue(np.array_equal(y0, _rows(0, 2) * 2))
+        test_case.assertTrue(np.array_equal(y1, _rows(2, 2) * 2))
+        with test_case.assertRaises(ValueError):
+            scheduler.submit({"x": _rows(0, 4)})
+        with test_case.assertRaises(ValueError):
+            BatchScheduler(session, "job", max_batch_size=8).submit({"x": _rows(0, 1)})
+
+    def test_error_propagation(test_case):
+        session = EchoSession(error=RuntimeError("job failed"))
+        scheduler = BatchScheduler(session, "job", max_queue_delay_ms=1.0)
+
+        async def main():
+            futures = [scheduler.submit({"x": _rows(i, 1)}) for i in range(3)]
+            return await asyncio.gather(*futures, return_exceptions=True)
+
+        results = test_case._run(session, main())
+        test_case.assertEqual(len(session.launched), 1)
+        for result in results:
+            test_case.assertIsInstance(result, RuntimeError)
+            test_case.assertEqual(str(result), "job failed")
+
+    def test_bad_request_rejected_alone(test_case):
+        session = EchoSession()
+        scheduler = BatchScheduler(session, "job", max_queue_delay_ms=1.0)
+
+        async def main():
+            first = scheduler.submit({"x": _rows(0, 1)})
+            bad_requests = [
+                {},
+                {"x": _rows(1, 1), "y": _rows(1, 1)},
+                {"x": np.zeros((1, 3), dtype=np.float32)},
+                {"x": np.zeros((1, 2, 1), dtype=np.float32)},
+                {"x": _rows(1, 1).astype(np.float64)},
+                {"x": _rows(1, 1).tolist()},
+            ]
+            for inputs in bad_requests:
+                with test_case.assertRaises(ValueError):
+                    scheduler.submit(inputs)
+            second = scheduler.submit({"x": _rows(1, 1)})
+            return await asyncio.wait_for(asyncio.gather(first, second), 1.0)
+
+        ((y0, _), (y1, _)) = test_case._run(session, main())
+        # the rejected requests never joined the batch
+        test_case.assertEqual(len(session.launched), 1)
+        test_case.assertTrue(np.array_equal(y0, _rows(0, 1) * 2))
+        test_case.assertTrue(np.array_equal(y1, _rows(1, 1) * 2))
+
+    def test_cancelled_request(test_case):
+        session = EchoSession()
+        scheduler = BatchScheduler(session, "job", max_queue_delay_ms=1.0)
+
+        async def main():
+            futures = [scheduler.submit({"x": _rows(i, 1)}) for i in range(3)]
+            futures[1].cancel()
+            await scheduler.join()
+            return futures
+
+        futures = test_case._run(session, main())
+        # the cancelled request keeps its rows, the others get their own
+        test_case.assertTrue(futures[1].cancelled())
+        test_case.assertTrue(np.array_equal(session.launched[0]["x"][:3], _rows(0, 3)))
+        test_case.assertTrue(np.array_equal(futures[0].result()[0], _rows(0, 1) * 2))
+        test_case.assertTrue(np.array_equal(futures[2].result()[0], _rows(2, 1) * 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+
+import tempfile
+import unittest
+
+import numpy as np
+from scalar_add_model import make_scalar_add_graph
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.serving.buffers import NdarrayPool, StagingBuffer, empty_staging_buffer
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestBuffers(flow.unittest.TestCase):
+    def test_ndarray_pool(test_case):
+        pool = NdarrayPool(max_arrays_per_signature=2)
+        a = pool.acquire((4, 2), np.float32)
+        b = pool.acquire((4, 2), np.float32)
+        c = pool.acquire((4, 2), np.float32)
+        test_case.assertEqual(a.shape, (4, 2))
+        test_case.assertEqual(a.dtype, np.float32)
+        pool.release(a)
+        pool.release(a)
+        pool.release(b)
+        # only two arrays are kept for a signature
+        pool.release(c)
+        test_case.assertEqual(len(pool.signature2arrays_[((4, 2), a.dtype.str)]), 2)
+        recycled = [pool.acquire((4, 2), np.float32) for _ in range(2)]
+        test_case.assertEqual({id(x) for x in recycled}, {id(a), id(b)})
+        test_case.assertIsNot(pool.acquire((4, 2), np.float32), c)
+        # other signatures are never handed out
+        pool.release(a)
+        test_case.assertIsNot(pool.acquire((4, 2), np.float64), a)
+        test_case.assertIsNot(pool.acquire((2, 4), np.float32), a)
+        # views do not own their memory and are never recycled
+        pool.clear()
+        whole = np.empty((8, 2), dtype=np.float32)
+        pool.release(whole[:4])
+        pool.release(whole.reshape(2, 8))
+        pool.release([1, 2])
+        test_case.assertEqual(sum(len(v) for v in pool.signature2arrays_.values()), 0)
+
+    def test_staging_buffer(test_case):
+        buf = empty_staging_buffer((4, 2), np.int32)
+        test_case.assertIsInstance(buf, StagingBuffer)
+        test_case.assertTrue(buf.flags.c_contiguous)
+        test_case.assertEqual(buf.shape, (4, 2))
+        test_case.assertEqual(buf.dtype, np.int32)
+
+    def test_run_into_dynamic_output(test_case):
+        option = flow.serving.SessionOption()
+        option.device_tag = "cpu"
+        sess = flow.serving.InferenceSession(option)
+        (op_list, signature) = make_scalar_add_graph(1.0, is_dynamic=True)
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            sess.set_checkpoint_path(checkpoint_dir)
+            with sess.open("scalar_add", signature):
+                sess.compile(op_list)
+            sess.launch()
+            x = sess.input_buffer("x")
+            test_case.assertIsInstance(x, StagingBuffer)
+            test_case.assertEqual(x.shape, (4, 2))
+            x[:] = 1
+            out = np.full((4, 2), -1, dtype=np.float32)
+            (y,) = sess.run_into("scalar_add", {"y": out}, x=x[:2].copy())
+            # the dynamic output fills the leading rows of the array
+            test_case.assertEqual(y.shape, (2, 2))
+            test_case.assertIs(y.base, out)
+            test_case.assertTrue(np.array_equal(out[:2], np.full((2, 2), 2)))
+            test_case.assertTrue(np.array_equal(out[2:], np.full((2, 2), -1)))
+            (y,) = sess.run_into("scalar_add", {"y": out}, x=x)
+            test_case.assertTrue(np.array_equal(out, np.full((4, 2), 2)))
+            with test_case.assertRaises(ValueError):
+                sess.run_into("scalar_add", {"y": out[:, :1]}, x=x)
+            sess.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+
+import tempfile
+import unittest
+
+import numpy as np
+from scalar_add_model import make_scalar_add_graph
+
+import oneflow as flow
+import oneflow.unittest
+
+
+def _make_session(checkpoint_dir, jobs):
+    option = flow.serving.SessionOption()
+    option.device_tag = "cpu"
+    sess = flow.serving.InferenceSession(option)
+    sess.set_checkpoint_path(checkpoint_dir)
+    for (job_name, kwargs) in jobs.items():
+        (op_list, signature) = make_scalar_add_graph(**kwargs)
+        with sess.open(job_name, signature):
+            sess.compile(op_list)
+    sess.launch()
+    return sess
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestInferenceSession(flow.unittest.TestCase):
+    def test_warmup(test_case):
+        with tempfile.TemporaryDirectory() as checkpoint_dir:
+            # each job only takes its own inputs
+            sess = _make_session(
+                checkpoint_dir,
+                {
+                    "add_one": dict(operand=1.0, input_name="a", output_name="c"),
+                    "add_two": dict(
+                        operand=2.0, batch_size=2, input_name="b", output_name="d"
+                    ),
+                },
+            )
+            test_case.assertFalse(sess.is_ready)
+            test_case.assertEqual(sess.warmup_latency, {})
+            latency = sess.warmup(num_iters=2)
+            test_case.assertTrue(sess.is_ready)
+            test_case.assertIs(sess.warmup_latency, latency)
+            test_case.assertEqual(sorted(latency.keys()), ["add_one", "add_two"])
+            test_case.assertEqual(list(latency["add_one"].keys()), [4])
+            test_case.assertEqual(list(latency["add_two"].keys()), [2])
+            for job_latency in latency.values():
+                for seconds in job_latency.values():
+                    test_case.assertGreater(seconds, 0)
+            (d,) = sess.run("add_two", b=np.ones((2, 2), dtype=np.float32))
+            test_case.assertTrue(np.array_equal(d, np.full((2, 2), 3)))
+            sess.close()
+            test_case.assertFalse(sess.is_ready)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,205 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+
+
+import concurrent.futures
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+from scalar_add_model import save_scalar_add_model
+
+import oneflow as flow
+import oneflow.unittest
+from oneflow.serving import model_server
+
+
+class FakeWorker(object):
+    """Stands in for a worker process, it becomes ready once the event of its
+    version is set and echoes the version for every request"""
+
+    ready_events = {}
+    errors = {}
+    instances = []
+
+    def __init__(self, model_name, saved_model_dir, model_version, option, warmup):
+        self.model_version_ = model_version
+        self.info_ = None
+        self.closed = False
+        self.on_submit = None
+        FakeWorker.instances.append(self)
+
+    @property
+    def model_version(self):
+        return self.model_version_
+
+    @property
+    def info(self):
+        return self.info_
+
+    def wait_ready(self, timeout=None):
+        FakeWorker.ready_events.setdefault(self.model_version_, threading.Event()).wait(
+            timeout
+        )
+        if self.model_version_ in FakeWorker.errors:
+            raise FakeWorker.errors[self.model_version_]
+        self.info_ = dict(jobs=["job"], inputs=("x",), outputs=("y",))
+        return self.info_
+
+    def submit(self, job_name, inputs):
+        if self.on_submit is not None:
+            self.on_submit()
+        if self.closed:
+            raise model_server._WorkerRetired()
+        future = concurrent.futures.Future()
+        future.set_result(self.model_version_)
+        return future
+
+    def close(self, timeout=None):
+        self.closed = True
+
+
+def _set_ready(version):
+    FakeWorker.ready_events.setdefault(version, threading.Event()).set()
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestModelServerRouting(flow.unittest.TestCase):
+    def setUp(test_case):
+        FakeWorker.ready_events = {}
+        FakeWorker.errors = {}
+        FakeWorker.instances = []
+        patcher = mock.patch.object(model_server, "_ModelWorker", FakeWorker)
+        patcher.start()
+        test_case.addCleanup(patcher.stop)
+        saved_model_dir = tempfile.TemporaryDirectory()
+        test_case.addCleanup(saved_model_dir.cleanup)
+        test_case.saved_model_dir = saved_model_dir.name
+
+    def test_later_load_wins(test_case):
+        server = model_server.ModelServer()
+        v2 = server.load("m", test_case.saved_model_dir, model_version=2)
+        v3 = server.load("m", test_case.saved_model_dir, model_version=3)
+        _set_ready(3)
+        test_case.assertEqual(v3.result(5), 3)
+        # v2 becomes ready after v3 took over and is dropped
+        _set_ready(2)
+        with test_case.assertRaises(concurrent.futures.CancelledError):
+            v2.result(5)
+        test_case.assertTrue(FakeWorker.instances[0].closed)
+        test_case.assertEqual(server.list_models(), {"m": 3})
+        test_case.assertEqual(server.run("m", x=None), 3)
+        server.close()
+
+    def test_earlier_load_after_failed_load(test_case):
+        server = model_server.ModelServer()
+        v2 = server.load("m", test_case.saved_model_dir, model_version=2)
+        v3 = server.load("m", test_case.saved_model_dir, model_version=3)
+        FakeWorker.errors[3] = ValueError("bad version")
+        _set_ready(3)
+        with test_case.assertRaises(ValueError):
+            v3.result(5)
+        # nothing later took effect, so v2 still takes over
+        _set_ready(2)
+        test_case.assertEqual(v2.result(5), 2)
+        test_case.assertEqual(server.list_models(), {"m": 2})
+        server.close()
+
+    def test_retry_on_retired_worker(test_case):
+        server = model_server.ModelServer()
+        _set_ready(1)
+        server.load("m", test_case.saved_model_dir, model_version=1).result(5)
+        v2 = server.load("m", test_case.saved_model_dir, model_version=2)
+        (v1_worker, v2_worker) = FakeWorker.instances
+
+        def swap_in_meantime():
+            # v1 is retired between routing the request and sending it
+            v1_worker.on_submit = None
+            _set_ready(2)
+            v2.result(5)
+
+        v1_worker.on_submit = swap_in_meantime
+        test_case.assertEqual(server.run("m", x=None), 2)
+        test_case.assertTrue(v1_worker.closed)
+        test_case.assertFalse(v2_worker.closed)
+        server.close()
+
+    def test_unload_while_loading(test_case):
+        server = model_server.ModelServer()
+        with test_case.assertRaises(KeyError):
+            server.unload("m")
+        v1 = server.load("m", test_case.saved_model_dir, model_version=1)
+        server.unload("m")
+        _set_ready(1)
+        with test_case.assertRaises(concurrent.futures.CancelledError):
+            v1.result(5)
+        test_case.assertTrue(FakeWorker.instances[0].closed)
+        test_case.assertEqual(server.list_models(), {})
+        test_case.assertFalse(server.is_ready("m"))
+        # a load after the unload takes effect again
+        _set_ready(2)
+        test_case.assertEqual(
+            server.load("m", test_case.saved_model_dir, model_version=2).result(5), 2
+        )
+        server.close()
+
+
+@flow.unittest.skip_unless_1n1d()
+class TestModelServer(flow.unittest.TestCase):
+    def test_swap_and_unload(test_case):
+        option = flow.serving.SessionOption()
+        option.device_tag = "cpu"
+        x = np.ones((4, 2), dtype=np.float32)
+        with tempfile.TemporaryDirectory() as saved_model_dir:
+            save_scalar_add_model(saved_model_dir, 1, 1.0)
+            save_scalar_add_model(saved_model_dir, 2, 2.0)
+            server = flow.serving.ModelServer(option)
+            test_case.assertEqual(
+                server.load("m", saved_model_dir, model_version=1).result(), 1
+            )
+            test_case.assertTrue(server.is_ready("m"))
+            info = server.model_info("m")
+            test_case.assertEqual(info["jobs"], ["scalar_add"])
+            test_case.assertIn(4, info["warmup_latency"]["scalar_add"])
+            (y,) = server.run("m", x=x)
+            test_case.assertTrue(np.array_equal(y, x + 1))
+            # the current version keeps serving while the next one loads
+            swapped = server.load("m", saved_model_dir)
+            futures = []
+            while not swapped.done():
+                futures.append(server.submit("m", x=x))
+                time.sleep(0.01)
+            test_case.assertEqual(swapped.result(), 2)
+            for future in futures:
+                (y,) = future.result()
+                test_case.assertTrue(
+                    np.array_equal(y, x + 1) or np.array_equal(y, x + 2)
+                )
+            (y,) = server.run("m", x=x)
+            test_case.assertTrue(np.array_equal(y, x + 2))
+            test_case.assertEqual(server.list_models(), {"m": 2})
+            server.unload("m")
+            test_case.assertEqual(server.list_models(), {})
+            with test_case.assertRaises(KeyError):
+                server.run("m", x=x)
+            server.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
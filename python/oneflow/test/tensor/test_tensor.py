@@ -72,6 +72,33 @@ class TestTensor(flow.unittest.TestCase):
         test_case.assertFalse(np_arr.flags["C_CONTIGUOUS"])
         test_case.assertTrue(np.array_equal(tensor.numpy(), np_arr))
 
+    def test_share_memory_with_numpy(test_case):
+        np_arr = np.arange(6, dtype=np.float32).reshape(2, 3)
+        tensor = flow.from_numpy(np_arr)
+        test_case.assertEqual(tensor.dtype, flow.float32)
+        test_case.assertEqual(tensor.shape, flow.Size([2, 3]))
+        np_arr[0, 0] = 10
+        test_case.assertEqual(tensor.numpy()[0, 0], 10)
+        view = np.asarray(tensor)
+        tensor.fill_(1)
+        ones = np.ones((2, 3), dtype=np.float32)
+        test_case.assertTrue(np.array_equal(np.asarray(tensor), ones))
+        # once synced again, the earlier view sees the update
+        test_case.assertTrue(np.array_equal(view, ones))
+        test_case.assertTrue(np.array_equal(np_arr, view))
+        # numpy() still returns a snapshot
+        snapshot = tensor.numpy()
+        tensor.fill_(2)
+        test_case.assertTrue(np.array_equal(snapshot, np.ones((2, 3))))
+        test_case.assertEqual(tensor.tolist(), [[2.0] * 3] * 2)
+        # in-place ops run asynchronously, a new view waits for them
+        for _ in range(10):
+            tensor.add_(1)
+        test_case.assertTrue(np.array_equal(np.asarray(tensor), np.full((2, 3), 12)))
+        test_case.assertTrue(np.array_equal(np_arr, np.full((2, 3), 12)))
+        test_case.assertTrue(np.array_equal(view, np.full((2, 3), 12)))
+        test_case.assertEqual(tensor.tolist(), [[12.0] * 3] * 2)
+
     def test_construct_from_another_tensor(test_case):
         shape = (2, 3, 4, 5)
         np_arr = np.random.rand(*shape).astype(np.float32)
@@ -19,6 +19,8 @@ from oneflow.utils.data.sampler import (
     RandomSampler,
     SubsetRandomSampler,
     BatchSampler,
+    DistributedSampler,
+    BucketBatchSampler,
 )
 from oneflow.utils.data.dataset import (
     Dataset,
@@ -29,7 +31,9 @@ from oneflow.utils.data.dataset import (
     random_split,
 )
 from oneflow.utils.data.dataset import IterableDataset as IterDataPipe
-from oneflow.utils.data.dataloader import DataLoader, _DatasetKind
+from oneflow.utils.data.dataloader import DataLoader, DevicePrefetcher, _DatasetKind
+from oneflow.utils.data._utils.collate import PadCollate
+from oneflow.utils.data._utils.worker import get_worker_info
 from oneflow.utils.data.decorator import (
     functional_datapipe,
     guaranteed_datapipes_determinism,
@@ -43,6 +47,8 @@ __all__ = [
     "RandomSampler",
     "SubsetRandomSampler",
     "BatchSampler",
+    "DistributedSampler",
+    "BucketBatchSampler",
     "Dataset",
     "IterableDataset",
     "TensorDataset",
@@ -50,7 +56,10 @@ __all__ = [
     "Subset",
     "random_split",
     "DataLoader",
+    "DevicePrefetcher",
+    "PadCollate",
     "_DatasetKind",
+    "get_worker_info",
     "IterDataPipe",
     "functional_datapipe",
     "guaranteed_datapipes_determinism",
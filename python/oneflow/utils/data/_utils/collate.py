@@ -21,9 +21,14 @@ static methods.
 """
 import re
 import collections
+import numbers
+
+import numpy as np
 
 import oneflow as flow
 
+from . import fetch, shared_memory, worker
+
 
 string_classes = (str, bytes)
 
@@ -32,6 +37,9 @@ np_str_obj_array_pattern = re.compile(r"[SaUO]")
 
 def default_convert(data):
     r"""Converts each NumPy array data field into a tensor"""
+    if worker.get_worker_info() is not None:
+        # See NOTE [ Collation in DataLoader worker processes ]
+        return data
     elem_type = type(data)
     if isinstance(data, (flow.Tensor, flow._oneflow_internal.Tensor)):
         return data
@@ -73,6 +81,11 @@ default_convert_err_msg_format = (
 
 def default_collate(batch):
     r"""Puts each data field into a tensor with outer dimension batch size"""
+    if worker.get_worker_info() is not None:
+        # See NOTE [ Collation in DataLoader worker processes ]
+        return numpy_collate(batch)
+    if isinstance(batch, fetch.GatheredSamples):
+        return list(batch.tensors)
 
     elem = batch[0]
     elem_type = type(elem)
@@ -89,9 +102,11 @@ def default_collate(batch):
             if np_str_obj_array_pattern.search(elem.dtype.str) is not None:
                 raise TypeError(default_collate_err_msg_format.format(elem.dtype))
 
-            return default_collate([flow.Tensor(b) for b in batch])
+            # Stacks the batch into one contiguous array and creates a single
+            # tensor from it, instead of creating a tensor per sample first.
+            return flow.tensor(numpy_collate(batch))
         elif elem.shape == ():  # scalars
-            return flow.Tensor(batch)
+            return flow.tensor(numpy_collate(batch))
     elif isinstance(elem, float):
         return flow.tensor(batch, dtype=flow.float64)
     elif isinstance(elem, int):
@@ -112,3 +127,208 @@ def default_collate(batch):
         return [default_collate(samples) for samples in transposed]
 
     raise TypeError(default_collate_err_msg_format.format(elem_type))
+
+
+# NOTE [ Collation in DataLoader worker processes ]
+#
+# The OneFlow runtime lives in the main process and can not be used from the
+# forked DataLoader worker processes, and tensors can not be sent between
+# processes either. So inside a worker, `default_collate` and `default_convert`
+# only produce numpy arrays (with the same dtypes the tensors would have had),
+# and the main process turns every numpy array of a received batch into a
+# tensor with `convert_numpy_to_tensor`.
+#
+# Stacked arrays are collated straight into shared memory buffers (see
+# `_utils/shared_memory.py`), so that the batch is not pickled on its way to
+# the main process.
+#
+# Only the batches of these collate functions (and of `PadCollate`) are
+# converted, see `converts_in_main_process`. A custom `collate_fn` returns the
+# same types whatever `num_workers` is. Workers raise as soon as the dataset
+# creates a tensor or a batch holds one, instead of touching the runtime of
+# the main process.
+
+
+def numpy_collate(batch):
+    r"""Like :func:`default_collate`, but puts each data field into a numpy
+    array with outer dimension batch size instead of a tensor"""
+
+    elem = batch[0]
+    elem_type = type(elem)
+    if isinstance(elem, (flow.Tensor, flow._oneflow_internal.Tensor)):
+        raise TypeError(
+            "DataLoader worker processes can not create or share tensors, "
+            "the dataset should return numpy arrays instead of {} when "
+            "num_workers > 0".format(elem_type)
+        )
+    elif (
+        elem_type.__module__ == "numpy"
+        and elem_type.__name__ != "str_"
+        and elem_type.__name__ != "string_"
+    ):
+        if elem_type.__name__ == "ndarray" or elem_type.__name__ == "memmap":
+            # array of string classes and object
+            if np_str_obj_array_pattern.search(elem.dtype.str) is not None:
+                raise TypeError(default_collate_err_msg_format.format(elem.dtype))
+
+            out = None
+            if shared_memory.is_enabled():
+                out = shared_memory.empty((len(batch),) + elem.shape, np.float32)
+            return np.stack(batch, out=out).astype(np.float32, copy=False)
+        elif elem.shape == ():  # scalars
+            return np.array(batch, dtype=np.float32)
+    elif isinstance(elem, float):
+        return np.array(batch, dtype=np.float64)
+    elif isinstance(elem, int):
+        return np.array(batch, dtype=np.int64)
+    elif isinstance(elem, string_classes):
+        return batch
+    elif isinstance(elem, collections.abc.Mapping):
+        return {key: numpy_collate([d[key] for d in batch]) for key in elem}
+    elif isinstance(elem, tuple) and hasattr(elem, "_fields"):  # namedtuple
+        return elem_type(*(numpy_collate(samples) for samples in zip(*batch)))
+    elif isinstance(elem, collections.abc.Sequence):
+        # check to make sure that the elements in batch have consistent size
+        it = iter(batch)
+        elem_size = len(next(it))
+        if not all(len(elem) == elem_size for elem in it):
+            raise RuntimeError("each element in list of batch should be of equal size")
+        transposed = zip(*batch)
+        return [numpy_collate(samples) for samples in transposed]
+
+    raise TypeError(default_collate_err_msg_format.format(elem_type))
+
+
+def converts_in_main_process(collate_fn):
+    r"""Whether the batches of `collate_fn` are collated into numpy arrays in
+    DataLoader worker processes and converted into tensors by the main process"""
+    return (
+        collate_fn is default_collate
+        or collate_fn is default_convert
+        or isinstance(collate_fn, PadCollate)
+    )
+
+
+def convert_numpy_to_tensor(data):
+    r"""Converts each NumPy array data field into a tensor, leaving the other
+    fields untouched"""
+    elem_type = type(data)
+    if (
+        elem_type.__module__ == "numpy"
+        and elem_type.__name__ != "str_"
+        and elem_type.__name__ != "string_"
+    ):
+        # array of string classes and object
+        if (
+            elem_type.__name__ in ("ndarray", "memmap")
+            and np_str_obj_array_pattern.search(data.dtype.str) is not None
+        ):
+            return data
+        return flow.tensor(data)
+    elif isinstance(data, collections.abc.Mapping):
+        return {key: convert_numpy_to_tensor(data[key]) for key in data}
+    elif isinstance(data, tuple) and hasattr(data, "_fields"):  # namedtuple
+        return elem_type(*(convert_numpy_to_tensor(d) for d in data))
+    elif isinstance(data, collections.abc.Sequence) and not isinstance(
+        data, string_classes
+    ):
+        return [convert_numpy_to_tensor(d) for d in data]
+    else:
+        return data
+
+
+class PadCollate(object):
+    r"""Collates samples like :func:`default_collate`, but pads the arrays of a
+    data field to the longest one in the batch along their first dimension,
+    instead of requiring all of them to have the same shape.
+
+    Each batch is only padded to its own maximum length, so together with
+    :class:`~flow.utils.data.BucketBatchSampler` little padding is left. The
+    padded arrays keep their dtype (e.g. integer token ids stay integers),
+    tensors are padded the same way and lists of numbers are treated as 1-D
+    arrays. Other data fields are collated by :func:`default_collate`.
+
+    Args:
+        padding_value (int or float): value of the padded elements. Default: ``0``
+
+    Example:
+        >>> collate_fn = PadCollate(padding_value=-1)
+        >>> collate_fn([([1, 2, 3], 0), ([4], 1)])[0].numpy()
+        array([[ 1,  2,  3],
+               [ 4, -1, -1]])
+    """
+
+    def __init__(self, padding_value=0):
+        self.padding_value = padding_value
+
+    def __call__(self, batch):
+        return _pad_collate(batch, self.padding_value)
+
+
+def _is_number_list(batch):
+    return all(isinstance(d, list) for d in batch) and all(
+        isinstance(x, numbers.Number) for d in batch for x in d
+    )
+
+
+def _pad_stack(batch, padding_value):
+    elem = batch[0]
+    max_len = max(d.shape[0] for d in batch)
+    shape = (len(batch), max_len) + elem.shape[1:]
+    dtype = np.result_type(*batch)
+    if shared_memory.is_enabled():
+        out = shared_memory.empty(shape, dtype)
+        out[...] = padding_value
+    else:
+        out = np.full(shape, padding_value, dtype=dtype)
+    for (i, d) in enumerate(batch):
+        if d.shape[1:] != elem.shape[1:]:
+            raise RuntimeError(
+                "each element in batch can only differ in its first dimension, "
+                "but got shapes {} and {}".format(elem.shape, d.shape)
+            )
+        out[i, : d.shape[0]] = d
+    return out
+
+
+def _pad_collate(batch, padding_value):
+    elem = batch[0]
+    if isinstance(elem, list) and _is_number_list(batch):
+        batch = [np.asarray(d) for d in batch]
+    elif (
+        isinstance(elem, (flow.Tensor, flow._oneflow_internal.Tensor))
+        and worker.get_worker_info() is None
+    ):
+        batch = [d.numpy() for d in batch]
+
+    elem = batch[0]
+    elem_type = type(elem)
+    if (
+        isinstance(elem, np.ndarray)
+        and elem.ndim > 0
+        and np_str_obj_array_pattern.search(elem.dtype.str) is None
+    ):
+        out = _pad_stack(batch, padding_value)
+        if worker.get_worker_info() is not None:
+            # See NOTE [ Collation in DataLoader worker processes ]
+            return out
+        return flow.tensor(out)
+    elif isinstance(elem, collections.abc.Mapping):
+        return {
+            key: _pad_collate([d[key] for d in batch], padding_value) for key in elem
+        }
+    elif isinstance(elem, tuple) and hasattr(elem, "_fields"):  # namedtuple
+        return elem_type(
+            *(_pad_collate(samples, padding_value) for samples in zip(*batch))
+        )
+    elif isinstance(elem, collections.abc.Sequence) and not isinstance(
+        elem, string_classes
+    ):
+        # check to make sure that the elements in batch have consistent size
+        it = iter(batch)
+        elem_size = len(next(it))
+        if not all(len(elem) == elem_size for elem in it):
+            raise RuntimeError("each element in list of batch should be of equal size")
+        transposed = zip(*batch)
+        return [_pad_collate(samples, padding_value) for samples in transposed]
+    return default_collate(batch)
@@ -17,6 +17,54 @@ limitations under the License.
 data from an iterable-style or map-style dataset. This logic is shared in both
 single- and multi-processing data loading.
 """
+import collections
+
+
+class GatheredSamples(collections.abc.Sequence):
+    r"""The samples of a batch gathered at once by a ``__getitems__`` method,
+    stored as tensors with outer dimension batch size.
+
+    It behaves like the list of samples it stands for, so custom
+    ``collate_fn`` keep working, while :func:`default_collate` directly takes
+    the gathered tensors as the collated batch.
+    """
+
+    def __init__(self, *tensors):
+        self.tensors = tensors
+
+    def __len__(self):
+        return self.tensors[0].shape[0]
+
+    def __getitem__(self, index):
+        return tuple(tensor[index] for tensor in self.tensors)
+
+
+def _defining_class(cls, name):
+    for klass in cls.__mro__:
+        if name in vars(klass):
+            return klass
+    return None
+
+
+def _has_batched_getitems(dataset):
+    # A subclass that overrides ``__getitem__`` (e.g. to apply a transform)
+    # but not ``__getitems__`` would be silently bypassed by the inherited
+    # ``__getitems__``, so it is only used if it is defined at least as deep in
+    # the class hierarchy as ``__getitem__``.
+    cls = type(dataset)
+    getitems_owner = _defining_class(cls, "__getitems__")
+    if getitems_owner is None:
+        return False
+    getitem_owner = _defining_class(cls, "__getitem__")
+    return getitem_owner is None or issubclass(getitems_owner, getitem_owner)
+
+
+def getitems(dataset, indices):
+    r"""Returns the samples of ``dataset`` at ``indices``, in a single
+    ``dataset.__getitems__(indices)`` call if the dataset implements it"""
+    if _has_batched_getitems(dataset):
+        return dataset.__getitems__(indices)
+    return [dataset[idx] for idx in indices]
 
 
 class _BaseDatasetFetcher(object):
@@ -62,7 +110,7 @@ class _MapDatasetFetcher(_BaseDatasetFetcher):
 
     def fetch(self, possibly_batched_index):
         if self.auto_collation:
-            data = [self.dataset[idx] for idx in possibly_batched_index]
+            data = getitems(self.dataset, possibly_batched_index)
         else:
             data = self.dataset[possibly_batched_index]
         return self.collate_fn(data)
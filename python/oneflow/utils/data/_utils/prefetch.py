@@ -0,0 +1,82 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+r""""Contains definitions of the methods used by the DevicePrefetcher to move
+batches to the target device on a background thread.
+"""
+import collections
+import queue
+
+import oneflow as flow
+
+from . import MP_STATUS_CHECK_INTERVAL, ExceptionWrapper
+
+
+string_classes = (str, bytes)
+
+
+class _PrefetchDone(object):
+    r"""Dummy class used to signal the end of the wrapped iterable"""
+
+    pass
+
+
+def to_device(data, device):
+    r"""Moves each tensor data field to ``device``"""
+    if isinstance(data, (flow.Tensor, flow._oneflow_internal.Tensor)):
+        return data.to(device)
+    elif isinstance(data, string_classes):
+        return data
+    elif isinstance(data, collections.abc.Mapping):
+        return {k: to_device(sample, device) for k, sample in data.items()}
+    elif isinstance(data, tuple) and hasattr(data, "_fields"):  # namedtuple
+        return type(data)(*(to_device(sample, device) for sample in data))
+    elif isinstance(data, collections.abc.Sequence):
+        return [to_device(sample, device) for sample in data]
+    elif hasattr(data, "to"):
+        return data.to(device)
+    else:
+        return data
+
+
+def _put(out_queue, item, done_event):
+    while not done_event.is_set():
+        try:
+            out_queue.put(item, timeout=MP_STATUS_CHECK_INTERVAL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def _prefetch_loop(data_iter, out_queue, device, done_event):
+    # The copies are only issued here; OneFlow runs them asynchronously, so
+    # they overlap with the training step that consumes the previous batches.
+    while not done_event.is_set():
+        try:
+            data = to_device(next(data_iter), device)
+        except StopIteration:
+            _put(out_queue, _PrefetchDone(), done_event)
+            return
+        except Exception:
+            _put(
+                out_queue,
+                ExceptionWrapper(where="in device prefetching thread"),
+                done_event,
+            )
+            return
+        if not _put(out_queue, data, done_event):
+            return
+        del data
@@ -0,0 +1,115 @@
+"""
+Copyright 2020 The OneFlow Authors. All rights reserved.
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+"""
+r""""Contains the shared memory buffers used to send batches from the
+_MultiProcessingDataLoaderIter workers to the main process.
+
+A worker collates a batch directly into a :class:`SharedNDArray`, which is
+backed by a file mapped from a directory on a RAM filesystem. Pickling such an
+array only sends its file name, shape and dtype through the result queue. The
+main process maps the same file, removes its name right away and gets an
+ordinary ndarray which owns the mapping, so the data itself is never pickled
+or copied on the way.
+
+The directory is created by the main process for every iterator and removed
+when the iterator shuts down, so the files of batches which were never
+received (e.g. prefetched batches when iteration stops early) are cleaned up
+as well.
+"""
+import itertools
+import mmap
+import os
+import tempfile
+
+import numpy as np
+
+
+_sharing_dir = None
+_sharing_counter = itertools.count()
+
+
+def make_sharing_dir():
+    r"""Creates a directory for the shared memory files of one iterator,
+    preferring ``/dev/shm`` so that the files are never written to disk"""
+    root = "/dev/shm" if os.path.isdir("/dev/shm") else None
+    return tempfile.mkdtemp(prefix="oneflow_dataloader_", dir=root)
+
+
+def set_sharing_dir(path):
+    r"""Sets the directory in which :func:`empty` creates files, ``None``
+    disables shared memory"""
+    global _sharing_dir
+    _sharing_dir = path
+
+
+def is_enabled():
+    return _sharing_dir is not None
+
+
+class SharedNDArray(np.ndarray):
+    r"""ndarray backed by a shared memory file, pickled by name"""
+
+    def __array_finalize__(self, obj):
+        # Views and results derived from a shared array do not cover the whole
+        # file, so only arrays made by `empty` are pickled by name.
+        self._sharing_path = None
+
+    def __reduce__(self):
+        if self._sharing_path is None:
+            return np.asarray(self).__reduce__()
+        return (
+            _rebuild_shared_ndarray,
+            (self._sharing_path, self.shape, self.dtype.str),
+        )
+
+
+def _map_file(fd, nbytes):
+    # mmap can not map an empty file
+    return mmap.mmap(fd, max(nbytes, 1))
+
+
+def empty(shape, dtype):
+    r"""Returns an uninitialized :class:`SharedNDArray`"""
+    assert _sharing_dir is not None
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+    path = os.path.join(
+        _sharing_dir, "{}_{}".format(os.getpid(), next(_sharing_counter))
+    )
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o600)
+    try:
+        os.ftruncate(fd, max(nbytes, 1))
+        buf = _map_file(fd, nbytes)
+    finally:
+        os.close(fd)
+    arr = np.frombuffer(buf, dtype=dtype, count=nbytes // dtype.itemsize)
+    arr = arr.reshape(shape).view(SharedNDArray)
+    arr._sharing_path = path
+    return arr
+
+
+def _rebuild_shared_ndarray(path, shape, dtype):
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+    fd = os.open(path, os.O_RDWR)
+    try:
+        buf = _map_file(fd, nbytes)
+    finally:
+        os.close(fd)
+        os.unlink(path)
+    # The returned array keeps the mapping alive and unmaps it when freed.
+    return np.frombuffer(buf, dtype=dtype, count=nbytes // dtype.itemsize).reshape(
+        shape
+    )
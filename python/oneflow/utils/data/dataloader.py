@@ -13,44 +13,20 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
-import sys
-import traceback
+import itertools
+import os
+import multiprocessing as python_multiprocessing
+import queue
+import shutil
+import threading
 import warnings
+import weakref
 
 from typing import Any, Callable, TypeVar, Generic, Sequence, List, Optional
 
-import oneflow as flow
-
+import numpy as np
 
-class ExceptionWrapper(object):
-    r"""Wraps an exception plus traceback to communicate across threads"""
-
-    def __init__(self, exc_info=None, where="in background"):
-        # It is important that we don't store exc_info, see
-        # NOTE [ Python Traceback Reference Cycle Problem ]
-        if exc_info is None:
-            exc_info = sys.exc_info()
-        self.exc_type = exc_info[0]
-        self.exc_msg = "".join(traceback.format_exception(*exc_info))
-        self.where = where
-
-    def reraise(self):
-        r"""Reraises the wrapped exception in the current thread"""
-        # Format a message such as: "Caught ValueError in DataLoader worker
-        # process 2. Original Traceback:", followed by the traceback.
-        msg = "Caught {} {}.\nOriginal {}".format(
-            self.exc_type.__name__, self.where, self.exc_msg
-        )
-        if self.exc_type == KeyError:
-            # KeyError calls repr() on its argument (usually a dict key). This
-            # makes stack traces unreadable. It will not be changed in Python
-            # (https://bugs.python.org/issue2651), so we work around it.
-            msg = KeyErrorMessage(msg)
-        elif getattr(self.exc_type, "message", None):
-            # Some exceptions have first argument as non-str but explicitly
-            # have message field
-            raise self.exc_type(message=msg)
-        raise self.exc_type(msg)
+import oneflow as flow
 
 
 string_classes = (str, bytes)
@@ -162,6 +138,16 @@ class DataLoader(Generic[T_co]):
             maintain the workers `Dataset` instances alive. (default: ``False``)
 
 
+    .. note:: The OneFlow runtime is not available in the worker processes, so
+              with ``num_workers > 0`` the dataset should return numpy arrays
+              (or other picklable Python objects) rather than tensors, and a
+              worker raises if the dataset creates or returns a tensor. The
+              default :attr:`collate_fn` collates them into numpy arrays inside
+              the workers and the main process converts every numpy array of
+              a batch into a tensor, see :func:`~flow.utils.data.get_worker_info`.
+              The batches of a custom :attr:`collate_fn` are returned as they
+              are, whatever ``num_workers`` is.
+
     .. warning:: If the ``spawn`` start method is used, :attr:`worker_init_fn`
                  cannot be an unpicklable object, e.g., a lambda function. See
                  :ref:`multiprocessing-best-practices` on more details related
@@ -222,12 +208,6 @@ class DataLoader(Generic[T_co]):
                 "use num_workers=0 to disable multiprocessing."
             )
 
-        if num_workers >= 1:
-            warnings.warn(
-                "Not support multiprocessing dataloader yet, we will temporary set num_workers=0!"
-            )
-            num_workers = 0
-
         if timeout < 0:
             raise ValueError("timeout option should be non-negative")
 
@@ -360,10 +340,11 @@ class DataLoader(Generic[T_co]):
         self._iterator = None
 
     def _get_iterator(self) -> "_BaseDataLoaderIter":
-        if self.num_workers == 0 or self.num_workers == 1:
+        if self.num_workers == 0:
             return _SingleProcessDataLoaderIter(self)
         else:
-            raise NotImplementedError("Multiprocessing dataloader is not support yet!")
+            self.check_worker_number_rationality()
+            return _MultiProcessingDataLoaderIter(self)
 
     def __setattr__(self, attr, val):
         if self.__initialized and attr in (
@@ -414,6 +395,31 @@ class DataLoader(Generic[T_co]):
         else:
             return self.sampler
 
+    def check_worker_number_rationality(self):
+        # Warns (instead of raising) when the user asks for more workers than
+        # this process may run on, since more workers than cores only adds
+        # contention on the data loading critical path.
+        if hasattr(os, "sched_getaffinity"):
+            try:
+                max_num_worker_suggest = len(os.sched_getaffinity(0))
+            except Exception:
+                max_num_worker_suggest = os.cpu_count()
+        else:
+            max_num_worker_suggest = os.cpu_count()
+        if max_num_worker_suggest is None:
+            return
+        if self.num_workers > max_num_worker_suggest:
+            warnings.warn(
+                "This DataLoader will create {} worker processes in total. Our "
+                "suggested max number of worker in current system is {}, which is "
+                "smaller than what this DataLoader is going to create. Please be "
+                "aware that excessive worker creation might get DataLoader running "
+                "slow or even freeze, lower the worker number to avoid potential "
+                "slowness/freeze if necessary.".format(
+                    self.num_workers, max_num_worker_suggest
+                )
+            )
+
     def __len__(self) -> int:
         if self._dataset_kind == _DatasetKind.Iterable:
             # NOTE [ IterableDataset and __len__ ]
@@ -460,7 +466,7 @@ class _BaseDataLoaderIter(object):
         self._timeout = loader.timeout
         self._collate_fn = loader.collate_fn
         self._sampler_iter = iter(self._index_sampler)
-        self._base_seed = flow.Tensor([0], dtype=flow.int64).uniform_().numpy().item()
+        self._base_seed = int(np.random.randint(0, 2 ** 62, dtype=np.int64))
         # TODO: flow.empty()
         # self._base_seed = flow.empty((), dtype=flow.int64).random_(generator=loader.generator).item()
         self._persistent_workers = loader.persistent_workers
@@ -497,8 +503,12 @@ class _BaseDataLoaderIter(object):
                 "Length of IterableDataset {} was reported to be {} (when accessing len(dataloader)), but {} "
                 "samples have been fetched. "
             ).format(self._dataset, self._IterableDataset_len_called, self._num_yielded)
-            if self._num_workers > 1:
-                warn_msg += "Multiprocessing dataloader is not support yet!"
+            if self._num_workers > 0:
+                warn_msg += (
+                    "For multiprocessing data-loading, this could be caused by not "
+                    "properly configuring the IterableDataset replica at each "
+                    "worker, see `flow.utils.data.get_worker_info`."
+                )
             warnings.warn(warn_msg)
         return data
 
@@ -513,7 +523,7 @@ class _SingleProcessDataLoaderIter(_BaseDataLoaderIter):
     def __init__(self, loader):
         super(_SingleProcessDataLoaderIter, self).__init__(loader)
         assert self._timeout == 0
-        assert 0 <= self._num_workers <= 1
+        assert self._num_workers == 0
 
         self._dataset_fetcher = _DatasetKind.create_fetcher(
             self._dataset_kind,
@@ -526,3 +536,437 @@ class _SingleProcessDataLoaderIter(_BaseDataLoaderIter):
     def _next_data(self):
         index = self._next_index()  # may raise StopIteration
         return self._dataset_fetcher.fetch(index)
+
+
+# NOTE [ Data Loader Multiprocessing Shutdown Logic ]
+#
+# The main process keeps one index queue per worker and a single result queue
+# shared by all workers. A worker exits when it receives `None` from its index
+# queue, or when its `ManagerWatchdog` finds that the main process is gone.
+#
+# `_shutdown_workers` is called when the iterator is exhausted (unless workers
+# are persistent), when it is garbage collected, and when the main process
+# raises an error while waiting for data. It
+#
+#   1. sets `done_event`, so that workers stop processing new indices,
+#   2. sends `None` to every worker which is still active,
+#   3. joins the workers, terminating the ones which do not exit in time,
+#   4. closes the queues.
+#
+# Workers never set `done_event` themselves since it is shared by all of them.
+# An `IterableDataset` worker which runs out of data instead sends an
+# `_IterableDatasetStopIteration` to the main process, which then marks it
+# inactive and sends it `None`.
+
+
+class _MultiProcessingDataLoaderIter(_BaseDataLoaderIter):
+    r"""Iterates once over the DataLoader's dataset, as specified by the sampler,
+    with the samples loaded and collated in ``num_workers`` worker processes.
+
+    Batches are delivered in sampler order: each worker receives the batch
+    indices round-robin through its own index queue, at most
+    ``prefetch_factor * num_workers`` batches are in flight at any time, and
+    batches which arrive out of order are kept in ``_task_info`` until their
+    turn comes.
+    """
+
+    def __init__(self, loader):
+        super(_MultiProcessingDataLoaderIter, self).__init__(loader)
+
+        assert self._num_workers > 0
+        assert self._prefetch_factor > 0
+
+        # Forking avoids re-importing (and re-initializing) OneFlow in every
+        # worker; the workers never touch the OneFlow runtime anyway, see
+        # NOTE [ Collation in DataLoader worker processes ].
+        if "fork" in python_multiprocessing.get_all_start_methods():
+            multiprocessing_context = python_multiprocessing.get_context("fork")
+        else:
+            multiprocessing_context = python_multiprocessing.get_context()
+
+        self._worker_init_fn = loader.worker_init_fn
+        self._convert_in_main_process = _utils.collate.converts_in_main_process(
+            self._collate_fn
+        )
+        # See NOTE [ Collation in DataLoader worker processes ]
+        self._sharing_dir = _utils.shared_memory.make_sharing_dir()
+        # Removes the shared memory of the batches which were prefetched but
+        # never received, also when Python exits without shutting us down.
+        self._remove_sharing_dir = weakref.finalize(
+            self, shutil.rmtree, self._sharing_dir, ignore_errors=True
+        )
+        self._worker_queue_idx_cycle = itertools.cycle(range(self._num_workers))
+        self._worker_result_queue = multiprocessing_context.Queue()
+        self._shutdown = False
+        self._workers_done_event = multiprocessing_context.Event()
+
+        self._index_queues = []
+        self._workers = []
+        for i in range(self._num_workers):
+            index_queue = multiprocessing_context.Queue()
+            # Need to `cancel_join_thread` here, otherwise the main process may
+            # hang at exit flushing indices to a worker which is already gone.
+            index_queue.cancel_join_thread()
+            w = multiprocessing_context.Process(
+                target=_utils.worker._worker_loop,
+                args=(
+                    self._dataset_kind,
+                    self._dataset,
+                    index_queue,
+                    self._worker_result_queue,
+                    self._workers_done_event,
+                    self._auto_collation,
+                    self._collate_fn,
+                    self._drop_last,
+                    self._base_seed,
+                    self._worker_init_fn,
+                    i,
+                    self._num_workers,
+                    self._persistent_workers,
+                    self._sharing_dir,
+                ),
+            )
+            w.daemon = True
+            # NB: Process.start() actually take some time as it needs to
+            #     start a process and pass the arguments over via a pipe.
+            #     Therefore, we only add a worker to self._workers list after
+            #     it started, so that we do not call .join() if program dies
+            #     before it starts, and __del__ tries to join but will get:
+            #     AssertionError: can only join a started process.
+            w.start()
+            self._index_queues.append(index_queue)
+            self._workers.append(w)
+
+        self._data_queue = self._worker_result_queue
+        self._reset(loader, first_iter=True)
+
+    def _reset(self, loader, first_iter=False):
+        super()._reset(loader, first_iter)
+        self._send_idx = 0  # idx of the next task to be sent to workers
+        self._rcvd_idx = 0  # idx of the next task to be returned in __next__
+        # information about data not yet yielded, i.e., tasks w/ indices in range [rcvd_idx, send_idx).
+        # map: task idx => - (worker_id,)        if data isn't fetched (outstanding)
+        #                  \ (worker_id, data)   if data is already fetched (out-of-order)
+        self._task_info = {}
+        self._tasks_outstanding = (
+            0  # always equal to count(v for v in task_info.values() if len(v) == 1)
+        )
+        # A list of booleans representing whether each worker still has work to
+        # do, i.e., not having exhausted its iterable dataset object. It always
+        # contains all `True`s if not using an iterable-style dataset
+        # (i.e., if kind != Iterable).
+        # Not that this indicates that a worker still has work to do *for this epoch*.
+        # It does not mean that a worker is dead. In case of `_persistent_workers`,
+        # the worker will be reset to available in the next epoch.
+        self._workers_status = [True for i in range(self._num_workers)]
+        # We resume the prefetching in case it was enabled
+        if not first_iter:
+            for idx in range(self._num_workers):
+                self._index_queues[idx].put(_utils.worker._ResumeIteration())
+            resume_iteration_cnt = self._num_workers
+            while resume_iteration_cnt > 0:
+                return_idx, return_data = self._get_data()
+                if isinstance(return_idx, _utils.worker._ResumeIteration):
+                    assert return_data is None
+                    resume_iteration_cnt -= 1
+        # prime the prefetch loop
+        for _ in range(self._prefetch_factor * self._num_workers):
+            self._try_put_index()
+
+    def _try_get_data(self, timeout=_utils.MP_STATUS_CHECK_INTERVAL):
+        # Tries to fetch data from `self._data_queue` once for a given timeout.
+        # This can also be used as inner loop of fetching without timeout, with
+        # the sender status as the loop condition.
+        #
+        # This raises a `RuntimeError` if any worker died expectedly, which is
+        # detected by the manual check below on errors and timeouts.
+        #
+        # Returns a 2-tuple:
+        #   (bool: whether successfully get data, any: data if successful else None)
+        try:
+            data = self._data_queue.get(timeout=timeout)
+            return (True, data)
+        except Exception as e:
+            # At timeout and error, we manually check whether any worker has
+            # failed.
+            failed_workers = []
+            for worker_id, w in enumerate(self._workers):
+                if self._workers_status[worker_id] and not w.is_alive():
+                    failed_workers.append(w)
+                    self._mark_worker_as_unavailable(worker_id)
+            if len(failed_workers) > 0:
+                pids_str = ", ".join(str(w.pid) for w in failed_workers)
+                raise RuntimeError(
+                    "DataLoader worker (pid(s) {}) exited unexpectedly".format(pids_str)
+                ) from e
+            if isinstance(e, queue.Empty):
+                return (False, None)
+            raise
+
+    def _get_data(self):
+        # Fetches data from `self._data_queue`.
+        #
+        # We check workers' status every `MP_STATUS_CHECK_INTERVAL` seconds,
+        # which we achieve by running `self._try_get_data(timeout=MP_STATUS_CHECK_INTERVAL)`
+        # in a loop. This is the only mechanism to detect worker failures.
+        if self._timeout > 0:
+            success, data = self._try_get_data(self._timeout)
+            if success:
+                return data
+            else:
+                raise RuntimeError(
+                    "DataLoader timed out after {} seconds".format(self._timeout)
+                )
+        else:
+            while True:
+                success, data = self._try_get_data()
+                if success:
+                    return data
+
+    def _next_data(self):
+        while True:
+            # If the worker responsible for `self._rcvd_idx` has already ended
+            # and was unable to fulfill this task (due to exhausting an `IterableDataset`),
+            # we try to advance `self._rcvd_idx` to find the next valid index.
+            #
+            # This part needs to run in the loop because both the `self._get_data()`
+            # call and `_IterableDatasetStopIteration` check below can mark
+            # extra worker(s) as dead.
+            while self._rcvd_idx < self._send_idx:
+                info = self._task_info[self._rcvd_idx]
+                worker_id = info[0]
+                if (
+                    len(info) == 2 or self._workers_status[worker_id]
+                ):  # has data or is still active
+                    break
+                del self._task_info[self._rcvd_idx]
+                self._rcvd_idx += 1
+            else:
+                # no valid `self._rcvd_idx` is found (i.e., didn't break)
+                if not self._persistent_workers:
+                    self._shutdown_workers()
+                raise StopIteration
+
+            # Now `self._rcvd_idx` is the batch index we want to fetch
+
+            # Check if the next sample has already been generated
+            if len(self._task_info[self._rcvd_idx]) == 2:
+                data = self._task_info.pop(self._rcvd_idx)[1]
+                return self._process_data(data)
+
+            assert not self._shutdown and self._tasks_outstanding > 0
+            idx, data = self._get_data()
+            self._tasks_outstanding -= 1
+            if self._dataset_kind == _DatasetKind.Iterable:
+                # Check for _IterableDatasetStopIteration
+                if isinstance(data, _utils.worker._IterableDatasetStopIteration):
+                    if self._persistent_workers:
+                        self._workers_status[data.worker_id] = False
+                    else:
+                        self._mark_worker_as_unavailable(data.worker_id)
+                    self._try_put_index()
+                    continue
+
+            if idx != self._rcvd_idx:
+                # store out-of-order samples
+                self._task_info[idx] += (data,)
+            else:
+                del self._task_info[idx]
+                return self._process_data(data)
+
+    def _try_put_index(self):
+        assert self._tasks_outstanding < self._prefetch_factor * self._num_workers
+
+        try:
+            index = self._next_index()
+        except StopIteration:
+            return
+        for _ in range(self._num_workers):  # find the next active worker, if any
+            worker_queue_idx = next(self._worker_queue_idx_cycle)
+            if self._workers_status[worker_queue_idx]:
+                break
+        else:
+            # not found (i.e., didn't break)
+            return
+
+        self._index_queues[worker_queue_idx].put((self._send_idx, index))
+        self._task_info[self._send_idx] = (worker_queue_idx,)
+        self._tasks_outstanding += 1
+        self._send_idx += 1
+
+    def _process_data(self, data):
+        self._rcvd_idx += 1
+        self._try_put_index()
+        if isinstance(data, _utils.ExceptionWrapper):
+            data.reraise()
+        # See NOTE [ Collation in DataLoader worker processes ]
+        if self._convert_in_main_process:
+            return _utils.collate.convert_numpy_to_tensor(data)
+        return data
+
+    def _mark_worker_as_unavailable(self, worker_id, shutdown=False):
+        # Mark a worker as having finished its work e.g., due to
+        # exhausting an `IterableDataset`. This should be used only when this
+        # `_MultiProcessingDataLoaderIter` is going to continue running.
+
+        assert self._workers_status[worker_id] or (
+            self._persistent_workers and shutdown
+        )
+
+        # Signal termination to that specific worker.
+        q = self._index_queues[worker_id]
+        # Indicate that no more data will be put on this queue by the current
+        # process.
+        q.put(None)
+
+        # Note that we don't actually join the worker here because (1) joining
+        # may be slow, and (2) since we don't join, the worker may still raise error, and we
+        # prefer capturing those, rather than ignoring them, even though they
+        # are raised after the worker has finished its job.
+        # Joinning is deferred to `_shutdown_workers`, which it is called when
+        # all workers finish their jobs (e.g., `IterableDataset` replicas) or
+        # when this iterator is garbage collected.
+
+        self._workers_status[worker_id] = False
+
+        assert self._workers_done_event.is_set() == shutdown
+
+    def _shutdown_workers(self):
+        # Called when shutting down this `_MultiProcessingDataLoaderIter`.
+        # See NOTE [ Data Loader Multiprocessing Shutdown Logic ] for details on
+        # the logic of this function.
+        python_exit_status = _utils.python_exit_status
+        if python_exit_status is True or python_exit_status is None:
+            # If Python is shutting down, the daemonic workers are terminated
+            # by `multiprocessing` itself, do no-op.
+            return
+        # Normal exit when last reference is gone / iterator is depleted.
+        if not self._shutdown:
+            self._shutdown = True
+            try:
+                # Exit workers now.
+                self._workers_done_event.set()
+                for worker_id in range(len(self._workers)):
+                    # Get number of workers from `len(self._workers)` instead of
+                    # `self._num_workers` in case we error before starting all
+                    # workers.
+                    # If we are using workers_status with persistent_workers
+                    # we have to shut it down because the worker is paused
+                    if self._persistent_workers or self._workers_status[worker_id]:
+                        self._mark_worker_as_unavailable(worker_id, shutdown=True)
+                for w in self._workers:
+                    # We should be able to join here, but in case anything went
+                    # wrong, we set a timeout and if the workers fail to join,
+                    # they are killed in the `finally` block.
+                    w.join(timeout=_utils.MP_STATUS_CHECK_INTERVAL)
+                for q in self._index_queues:
+                    q.cancel_join_thread()
+                    q.close()
+            finally:
+                for w in self._workers:
+                    if w.is_alive():
+                        # Existing mechanisms try to make the workers exit
+                        # peacefully, but in case that we unfortunately reach
+                        # here, which we shouldn't, we kill the worker.
+                        w.terminate()
+                self._remove_sharing_dir()
+
+    def __del__(self):
+        self._shutdown_workers()
+
+
+class DevicePrefetcher(object):
+    r"""
+    Wraps a :class:`~flow.utils.data.DataLoader` (or any iterable of batches)
+    and moves the upcoming batches to :attr:`device` on a background thread, so
+    that the batches returned by ``for batch in prefetcher`` are already on
+    :attr:`device` and the host-to-device copies overlap with the training step
+    instead of running inline on the training thread.
+
+    Every tensor in a batch is moved, including the ones nested in dicts,
+    lists, tuples and namedtuples; other fields are returned unchanged. With
+    ``device="cpu"`` the batches are only read ahead, which needs no GPU.
+
+    Args:
+        loader (Iterable): the iterable of batches to wrap, usually a
+            :class:`~flow.utils.data.DataLoader`.
+        device (str or flow.device, optional): the device to move batches to
+            (default: ``"cuda"``).
+        num_prefetch (int, optional): how many batches are moved ahead of the
+            one being consumed (default: ``2``).
+
+    For example:
+
+    .. code-block:: python
+
+        >>> import numpy as np
+        >>> import oneflow as flow
+        >>> dataset = flow.utils.data.TensorDataset(flow.Tensor(np.ones((8, 3))))
+        >>> loader = flow.utils.data.DataLoader(dataset, batch_size=4)
+        >>> for (x,) in flow.utils.data.DevicePrefetcher(loader, device="cpu"):
+        ...     print(x.shape)
+        flow.Size([4, 3])
+        flow.Size([4, 3])
+
+    """
+
+    def __init__(self, loader, device="cuda", num_prefetch: int = 2):
+        if not isinstance(num_prefetch, int) or num_prefetch <= 0:
+            raise ValueError(
+                "num_prefetch should be a positive integer value, "
+                "but got num_prefetch={}".format(num_prefetch)
+            )
+        self.loader = loader
+        self.device = flow.device(device) if isinstance(device, str) else device
+        self.num_prefetch = num_prefetch
+
+    def __iter__(self) -> "_DevicePrefetcherIter":
+        return _DevicePrefetcherIter(self)
+
+    def __len__(self) -> int:
+        return len(self.loader)
+
+
+class _DevicePrefetcherIter(object):
+    def __init__(self, prefetcher):
+        self._done_event = threading.Event()
+        self._data_queue = queue.Queue(maxsize=prefetcher.num_prefetch)
+        self._thread = threading.Thread(
+            target=_utils.prefetch._prefetch_loop,
+            args=(
+                iter(prefetcher.loader),
+                self._data_queue,
+                prefetcher.device,
+                self._done_event,
+            ),
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._done_event.is_set():
+            raise StopIteration
+        while True:
+            try:
+                data = self._data_queue.get(timeout=_utils.MP_STATUS_CHECK_INTERVAL)
+                break
+            except queue.Empty:
+                if not self._thread.is_alive():
+                    raise RuntimeError("Device prefetching thread exited unexpectedly")
+        if isinstance(data, (_utils.prefetch._PrefetchDone, _utils.ExceptionWrapper)):
+            self._shutdown()
+            if isinstance(data, _utils.ExceptionWrapper):
+                data.reraise()
+            raise StopIteration
+        return data
+
+    def _shutdown(self):
+        if not self._done_event.is_set():
+            self._done_event.set()
+            self._thread.join(timeout=_utils.MP_STATUS_CHECK_INTERVAL)
+
+    def __del__(self):
+        self._shutdown()
@@ -28,8 +28,11 @@ from typing import (
     Callable,
 )
 
+import numpy as np
+
 import oneflow as flow
 from oneflow.framework.tensor import Tensor
+from oneflow.utils.data._utils.fetch import GatheredSamples, getitems
 
 
 default_generator = flow._oneflow_internal.default_generator("auto")
@@ -64,6 +67,14 @@ class Dataset(Generic[T_co]):
     :class:`~flow.utils.data.Sampler` implementations and the default options
     of :class:`~flow.utils.data.DataLoader`.
 
+    Subclasses could also optionally implement :meth:`__getitems__`, which
+    takes the list of indices of a batch and returns the list of their samples,
+    to fetch a whole batch at once, e.g. with a single vectorized read. The
+    :class:`~flow.utils.data.DataLoader` calls it instead of :meth:`__getitem__`
+    when automatic batching is enabled. An inherited :meth:`__getitems__` is
+    ignored by subclasses which overwrite :meth:`__getitem__` without
+    overwriting it as well.
+
     .. note::
       :class:`~flow.utils.data.DataLoader` by default constructs a index
       sampler that yields integral indices.  To make it work with a map-style
@@ -206,6 +217,26 @@ class TensorDataset(Dataset[Tuple[Tensor, ...]]):
     def __getitem__(self, index):
         return tuple(tensor[index] for tensor in self.tensors)
 
+    def __getitems__(self, indices):
+        # Gathers the whole batch from each tensor with a single op.
+        length = len(self)
+        index = np.asarray(indices, dtype=np.int64)
+        index = np.where(index < 0, index + length, index)
+        if np.any((index < 0) | (index >= length)):
+            raise IndexError(
+                "index out of range for TensorDataset of size {}".format(length)
+            )
+        return GatheredSamples(
+            *(
+                flow.F.gather(
+                    tensor,
+                    flow.tensor(index, dtype=flow.int64, device=tensor.device),
+                    axis=0,
+                )
+                for tensor in self.tensors
+            )
+        )
+
     def __len__(self):
         return self.tensors[0].size(0)
 
@@ -258,6 +289,32 @@ class ConcatDataset(Dataset[T_co]):
             sample_idx = idx - self.cumulative_sizes[dataset_idx - 1]
         return self.datasets[dataset_idx][sample_idx]
 
+    def __getitems__(self, indices):
+        length = len(self)
+        idx = np.asarray(indices, dtype=np.int64)
+        if np.any(-idx > length):
+            raise ValueError("absolute value of index should not exceed dataset length")
+        if np.any(idx >= length):
+            raise IndexError(
+                "index out of range for ConcatDataset of size {}".format(length)
+            )
+        idx = np.where(idx < 0, idx + length, idx)
+        dataset_idx = np.searchsorted(self.cumulative_sizes, idx, side="right")
+        offsets = np.asarray([0] + self.cumulative_sizes[:-1], dtype=np.int64)
+        sample_idx = idx - offsets[dataset_idx]
+        if len(idx) > 0 and np.all(dataset_idx == dataset_idx[0]):
+            # The whole batch comes from one dataset, which is the common case
+            # with sequential sampling.
+            return getitems(self.datasets[dataset_idx[0]], sample_idx.tolist())
+        samples = [None] * len(idx)
+        for d in np.unique(dataset_idx).tolist():
+            positions = np.nonzero(dataset_idx == d)[0].tolist()
+            for (position, sample) in zip(
+                positions, getitems(self.datasets[d], sample_idx[positions].tolist())
+            ):
+                samples[position] = sample
+        return samples
+
 
 class ChainDataset(IterableDataset):
     r"""Dataset for chainning multiple :class:`IterableDataset` s.
@@ -311,6 +368,9 @@ class Subset(Dataset[T_co]):
     def __getitem__(self, idx):
         return self.dataset[self.indices[idx]]
 
+    def __getitems__(self, indices):
+        return getitems(self.dataset, [self.indices[idx] for idx in indices])
+
     def __len__(self):
         return len(self.indices)
 
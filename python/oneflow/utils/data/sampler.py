@@ -254,3 +254,230 @@ class BatchSampler(Sampler[List[int]]):
             return len(self.sampler) // self.batch_size  # type: ignore
         else:
             return (len(self.sampler) + self.batch_size - 1) // self.batch_size  # type: ignore
+
+
+class BucketBatchSampler(Sampler[List[int]]):
+    r"""Yields mini-batches of indices of samples with similar lengths, so that
+    padding each batch to its longest sample wastes little compute.
+
+    The indices are grouped into buckets by length, shuffled within each
+    bucket, split into batches and the batches are shuffled across buckets.
+    Without :attr:`bucket_boundaries`, the indices are sorted by length and
+    every batch holds neighbouring lengths. Use it together with
+    :class:`~flow.utils.data.PadCollate` as the ``batch_sampler`` of a
+    :class:`~flow.utils.data.DataLoader`.
+
+    Args:
+        data_source (Dataset): dataset to sample from
+        lengths (sequence or callable): the length of each sample, or a callable
+            which returns the length of the sample at a given index. A callable
+            is evaluated once for every index on construction.
+        batch_size (int): Size of mini-batch.
+        bucket_boundaries (sequence of int, optional): increasing lengths which
+            separate the buckets, bucket ``i`` holds the samples whose length
+            is in ``[bucket_boundaries[i - 1], bucket_boundaries[i])``.
+        shuffle (bool): If ``True`` (default), shuffles the samples within each
+            bucket and the order of the batches.
+        drop_last (bool): If ``True``, the sampler will drop the last batch of
+            each bucket if its size would be less than ``batch_size``
+
+    Example:
+        >>> lengths = [5, 1, 4, 2, 3, 6]
+        >>> list(BucketBatchSampler(range(6), lengths, batch_size=2, shuffle=False))
+        [[1, 3], [4, 2], [0, 5]]
+        >>> list(BucketBatchSampler(range(6), lengths, batch_size=2, bucket_boundaries=[4], shuffle=False))
+        [[1, 3], [4], [0, 2], [5]]
+    """
+
+    def __init__(
+        self,
+        data_source: Sized,
+        lengths,
+        batch_size: int,
+        bucket_boundaries: Optional[Sequence[int]] = None,
+        shuffle: bool = True,
+        drop_last: bool = False,
+    ) -> None:
+        if (
+            not isinstance(batch_size, int)
+            or isinstance(batch_size, bool)
+            or batch_size <= 0
+        ):
+            raise ValueError(
+                "batch_size should be a positive integer value, "
+                "but got batch_size={}".format(batch_size)
+            )
+        if not isinstance(drop_last, bool):
+            raise ValueError(
+                "drop_last should be a boolean value, but got "
+                "drop_last={}".format(drop_last)
+            )
+        if callable(lengths):
+            lengths = [lengths(i) for i in range(len(data_source))]
+        self.lengths = np.asarray(lengths, dtype=np.int64)
+        if self.lengths.shape != (len(data_source),):
+            raise ValueError(
+                "lengths should have one entry for each sample, but got {} "
+                "lengths for {} samples".format(self.lengths.size, len(data_source))
+            )
+        if bucket_boundaries is not None:
+            bucket_boundaries = np.asarray(bucket_boundaries, dtype=np.int64)
+            if np.any(np.diff(bucket_boundaries) <= 0):
+                raise ValueError("bucket_boundaries should be strictly increasing")
+        self.data_source = data_source
+        self.batch_size = batch_size
+        self.bucket_boundaries = bucket_boundaries
+        self.shuffle = shuffle
+        self.drop_last = drop_last
+
+    def _bucket_ids(self, indices):
+        return np.digitize(self.lengths[indices], self.bucket_boundaries)
+
+    def __iter__(self):
+        n = len(self.lengths)
+        if self.shuffle:
+            indices = np.random.permutation(n)
+        else:
+            indices = np.arange(n)
+        if self.bucket_boundaries is None:
+            # a stable sort keeps the shuffled order among equal lengths
+            buckets = [indices[np.argsort(self.lengths[indices], kind="stable")]]
+        else:
+            bucket_ids = self._bucket_ids(indices)
+            buckets = [indices[bucket_ids == b] for b in np.unique(bucket_ids)]
+
+        batches = []
+        for bucket in buckets:
+            for start in range(0, len(bucket), self.batch_size):
+                batch = bucket[start : start + self.batch_size]
+                if len(batch) < self.batch_size and self.drop_last:
+                    continue
+                batches.append(batch)
+        if self.shuffle:
+            batches = [batches[i] for i in np.random.permutation(len(batches))]
+        for batch in batches:
+            yield batch.tolist()
+
+    def __len__(self):
+        if self.bucket_boundaries is None:
+            bucket_sizes = np.array([len(self.lengths)])
+        else:
+            bucket_sizes = np.bincount(self._bucket_ids(np.arange(len(self.lengths))))
+        if self.drop_last:
+            return int(np.sum(bucket_sizes // self.batch_size))
+        else:
+            return int(np.sum((bucket_sizes + self.batch_size - 1) // self.batch_size))
+
+
+class DistributedSampler(Sampler[T_co]):
+    r"""Sampler that restricts data loading to a subset of the dataset.
+
+    It is especially useful in conjunction with processes started by
+    :mod:`oneflow.distributed.launch`. In such a case, each process can pass a
+    :class:`~flow.utils.data.DistributedSampler` instance as a
+    :class:`~flow.utils.data.DataLoader` sampler, and load a subset of the
+    original dataset that is exclusive to it.
+
+    .. note::
+        Dataset is assumed to be of constant size.
+
+    Args:
+        dataset: Dataset used for sampling.
+        num_replicas (int, optional): Number of processes participating in
+            distributed training. By default, :attr:`world_size` is retrieved from
+            :func:`oneflow.distributed.get_world_size`.
+        rank (int, optional): Rank of the current process within :attr:`num_replicas`.
+            By default, :attr:`rank` is retrieved from
+            :func:`oneflow.distributed.get_rank`.
+        shuffle (bool, optional): If ``True`` (default), sampler will shuffle the
+            indices.
+        seed (int, optional): random seed used to shuffle the sampler if
+            :attr:`shuffle=True`. This number should be identical across all
+            processes in the distributed group. Default: ``0``.
+        drop_last (bool, optional): if ``True``, then the sampler will drop the
+            tail of the data to make it evenly divisible across the number of
+            replicas. If ``False``, the sampler will add extra indices to make
+            the data evenly divisible across the replicas. Default: ``False``.
+
+    .. warning::
+        In distributed mode, calling the :meth:`set_epoch` method at
+        the beginning of each epoch **before** creating the :class:`DataLoader` iterator
+        is necessary to make shuffling work properly across multiple epochs. Otherwise,
+        the same ordering will be always used.
+
+    Example::
+
+        >>> sampler = DistributedSampler(dataset) if is_distributed else None
+        >>> loader = DataLoader(dataset, shuffle=(sampler is None),
+        ...                     sampler=sampler)
+        >>> for epoch in range(start_epoch, n_epochs):
+        ...     if is_distributed:
+        ...         sampler.set_epoch(epoch)
+        ...     train(loader)
+    """
+
+    def __init__(
+        self,
+        dataset: Sized,
+        num_replicas: Optional[int] = None,
+        rank: Optional[int] = None,
+        shuffle: bool = True,
+        seed: int = 0,
+        drop_last: bool = False,
+    ) -> None:
+        if num_replicas is None:
+            num_replicas = flow.distributed.get_world_size()
+        if rank is None:
+            rank = flow.distributed.get_rank()
+        if rank >= num_replicas or rank < 0:
+            raise ValueError(
+                "Invalid rank {}, rank should be in the interval"
+                " [0, {}]".format(rank, num_replicas - 1)
+            )
+        self.dataset = dataset
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.epoch = 0
+        self.drop_last = drop_last
+        # If the dataset length is evenly divisible by # of replicas, then there
+        # is no need to drop any data, since the dataset will be split equally.
+        if self.drop_last:
+            self.num_samples = len(self.dataset) // self.num_replicas
+        else:
+            self.num_samples = -(-len(self.dataset) // self.num_replicas)
+        self.total_size = self.num_samples * self.num_replicas
+        self.shuffle = shuffle
+        self.seed = seed
+
+    def __iter__(self) -> Iterator[T_co]:
+        n = len(self.dataset)
+        if self.shuffle:
+            # deterministically shuffle based on epoch and seed, so that every
+            # rank draws the same permutation and keeps a disjoint slice of it
+            rng = np.random.RandomState((self.seed + self.epoch) % (2 ** 32))
+            indices = rng.permutation(n)
+        else:
+            indices = np.arange(n)
+
+        if self.total_size > n:
+            # add extra samples to make it evenly divisible
+            indices = np.resize(indices, self.total_size)
+        # subsample, only the indices of this rank are turned into a list
+        indices = indices[self.rank : self.total_size : self.num_replicas]
+        assert len(indices) == self.num_samples
+
+        return iter(indices.tolist())
+
+    def __len__(self) -> int:
+        return self.num_samples
+
+    def set_epoch(self, epoch: int) -> None:
+        r"""
+        Sets the epoch for this sampler. When :attr:`shuffle=True`, this ensures all replicas
+        use a different random ordering for each epoch. Otherwise, the next iteration of this
+        sampler will yield the same ordering.
+
+        Args:
+            epoch (int): Epoch number.
+        """
+        self.epoch = epoch
@@ -42,6 +42,12 @@ class MNIST(VisionDataset):
             and returns a transformed version. E.g, ``transforms.RandomCrop``
         target_transform (callable, optional): A function/transform that takes in the
             target and transforms it.
+        mmap (bool, optional): If True, the raw IDX files are memory-mapped with
+            ``np.memmap`` instead of being read into a tensor, so that nothing is
+            loaded up front and each sample is only read when it is indexed.
+        pil_image (bool, optional): If True (default), images are returned as PIL
+            images. Otherwise they are returned as ``uint8`` numpy arrays of shape
+            ``(28, 28)``, which skips the per-sample PIL round trip.
     """
 
     mirrors = [
@@ -99,11 +105,15 @@ class MNIST(VisionDataset):
         target_transform: Optional[Callable] = None,
         download: bool = False,
         source_url: Optional[str] = None,
+        mmap: bool = False,
+        pil_image: bool = True,
     ) -> None:
         super(MNIST, self).__init__(
             root, transform=transform, target_transform=target_transform
         )
         self.train = train  # training set or test set
+        self.mmap = mmap
+        self.pil_image = pil_image
         if source_url is not None:
             self.mirrors = [source_url]
 
@@ -139,11 +149,13 @@ class MNIST(VisionDataset):
 
     def _load_data(self):
         image_file = f"{'train' if self.train else 't10k'}-images-idx3-ubyte"
-        data = read_image_file(os.path.join(self.raw_folder, image_file))
+        image_path = os.path.join(self.raw_folder, image_file)
 
         label_file = f"{'train' if self.train else 't10k'}-labels-idx1-ubyte"
-        targets = read_label_file(os.path.join(self.raw_folder, label_file))
-        return data, targets
+        label_path = os.path.join(self.raw_folder, label_file)
+        if self.mmap:
+            return (mmap_image_file(image_path), mmap_label_file(label_path))
+        return (read_image_file(image_path), read_label_file(label_path))
 
     def __getitem__(self, index: int) -> Tuple[Any, Any]:
         """
@@ -152,11 +164,16 @@ class MNIST(VisionDataset):
         Returns:
             tuple: (image, target) where target is index of the target class.
         """
-        img, target = self.data[index], int(self.targets[index].numpy())
+        img, target = self.data[index], self.targets[index]
+        if isinstance(img, np.ndarray):
+            img, target = np.asarray(img), int(target)
+        else:
+            img, target = img.numpy(), int(target.numpy())
 
-        # doing this so that it is consistent with all other datasets
-        # to return a PIL Image
-        img = Image.fromarray(img.numpy(), mode="L")
+        if self.pil_image:
+            # doing this so that it is consistent with all other datasets
+            # to return a PIL Image
+            img = Image.fromarray(img, mode="L")
 
         if self.transform is not None:
             img = self.transform(img)
@@ -167,7 +184,7 @@ class MNIST(VisionDataset):
         return img, target
 
     def __len__(self) -> int:
-        return self.data.size(0)
+        return self.data.shape[0]
 
     @property
     def raw_folder(self) -> str:
@@ -273,6 +290,21 @@ def get_int(b: bytes) -> int:
     return int(codecs.encode(b, "hex"), 16)
 
 
+def mmap_sn3_pascalvincent_ndarray(path: str) -> np.ndarray:
+    """Memory-map a SN3 file in "Pascal Vincent" format as a read-only ndarray.
+       Only the header is read here, the data is paged in when it is accessed.
+    """
+    with open(path, "rb") as f:
+        magic = get_int(f.read(4))
+        nd = magic % 256
+        ty = magic // 256
+        assert 1 <= nd <= 3
+        assert 8 <= ty <= 14
+        s = [get_int(f.read(4)) for i in range(nd)]
+    m = SN3_PASCALVINCENT_TYPEMAP[ty]
+    return np.memmap(path, dtype=m[1], mode="r", offset=4 * (nd + 1), shape=tuple(s))
+
+
 def read_sn3_pascalvincent_tensor(path: str, strict: bool = True) -> Tensor:
     """Read a SN3 file in "Pascal Vincent" format (Lush file 'libidx/idx-io.lsh').
        Argument may be a filename, compressed filename, or file object.
@@ -306,3 +338,17 @@ def read_image_file(path: str) -> Tensor:
     assert x.dtype == flow.uint8
     assert x.ndimension() == 3
     return x
+
+
+def mmap_label_file(path: str) -> np.ndarray:
+    x = mmap_sn3_pascalvincent_ndarray(path)
+    assert x.dtype == np.uint8
+    assert x.ndim == 1
+    return x
+
+
+def mmap_image_file(path: str) -> np.ndarray:
+    x = mmap_sn3_pascalvincent_ndarray(path)
+    assert x.dtype == np.uint8
+    assert x.ndim == 3
+    return x
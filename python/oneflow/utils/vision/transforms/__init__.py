@@ -13,6 +13,22 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
-from .transforms import Normalize, Compose, ToTensor, Resize
+from .transforms import (
+    Normalize,
+    Compose,
+    ToTensor,
+    Resize,
+    BatchToTensor,
+    BatchNormalize,
+    BatchCompose,
+)
 
-__all__ = ["Normalize", "Compose", "ToTensor", "Resize"]
+__all__ = [
+    "Normalize",
+    "Compose",
+    "ToTensor",
+    "Resize",
+    "BatchToTensor",
+    "BatchNormalize",
+    "BatchCompose",
+]
@@ -197,6 +197,93 @@ def normalize(
     return tensor
 
 
+def _as_image_batch(batch: Any) -> Tensor:
+    if isinstance(batch, np.ndarray):
+        batch = flow.tensor(batch)
+    elif not isinstance(batch, flow.Tensor) and not isinstance(
+        batch, flow._oneflow_internal.Tensor
+    ):
+        raise TypeError(
+            "batch should be a oneflow tensor or ndarray. Got {}.".format(type(batch))
+        )
+    if batch.ndim == 3:
+        # a batch of single channel images
+        batch = batch.reshape(shape=(batch.shape[0], 1) + tuple(batch.shape[1:]))
+    elif batch.ndim != 4:
+        raise ValueError(
+            "Expected an image batch of size (B, C, H, W) or (B, H, W). Got "
+            "batch.size() = {}.".format(batch.size())
+        )
+    return batch
+
+
+def batch_to_tensor(batch: Any, scale: float = 1.0 / 255) -> Tensor:
+    """Convert a collated image batch to a float tensor.
+    See :class:`~transforms.BatchToTensor` for more details.
+    Args:
+        batch (Tensor or numpy.ndarray): Image batch of size (B, C, H, W) or (B, H, W).
+        scale (float): Factor the pixel values are multiplied by.
+    Returns:
+        Tensor: Float tensor image batch of size (B, C, H, W).
+    """
+    batch = _as_image_batch(batch)
+    if batch.dtype != flow.float32:
+        batch = flow.F.cast(batch, dtype=flow.float32)
+    if scale != 1.0:
+        batch = batch.mul(scale)
+    return batch
+
+
+def batch_normalize(
+    batch: Any, mean: List[float], std: List[float], scale: float = 1.0
+) -> Tensor:
+    """Convert a collated image batch to float, then scale and normalize it,
+    i.e. ``output[:, channel] = (batch[:, channel] * scale - mean[channel]) / std[channel]``.
+    See :class:`~transforms.BatchNormalize` for more details.
+    Args:
+        batch (Tensor or numpy.ndarray): Image batch of size (B, C, H, W) or (B, H, W)
+            of any dtype, e.g. a collated ``uint8`` batch.
+        mean (sequence): Sequence of means for each channel.
+        std (sequence): Sequence of standard deviations for each channel.
+        scale (float): Factor the pixel values are multiplied by before normalization.
+    Returns:
+        Tensor: Normalized float tensor image batch of size (B, C, H, W).
+    """
+    batch = _as_image_batch(batch)
+    num_channels = batch.shape[1]
+    mean = np.broadcast_to(np.asarray(mean, dtype=np.float32), (num_channels,))
+    std = np.broadcast_to(np.asarray(std, dtype=np.float32), (num_channels,))
+    if np.any(std == 0):
+        raise ValueError("std evaluated to zero, leading to division by zero.")
+    # Folds the scaling and the normalization into one per-channel affine
+    # transform, (batch * scale - mean) / std == batch * weight + bias.
+    weight = (scale / std).astype(np.float32)
+    bias = (-mean / std).astype(np.float32)
+
+    if batch.dtype != flow.float32:
+        batch = flow.F.cast(batch, dtype=flow.float32)
+    if batch.is_cuda:
+        # The inference normalization kernel computes the affine transform in a
+        # single pass, as (x - 0) / sqrt(1 + epsilon) * gamma + beta.
+        epsilon = 1e-5
+        return flow.F.normalization(
+            batch,
+            flow.tensor(np.zeros_like(weight), device=batch.device),
+            flow.tensor(np.ones_like(weight), device=batch.device),
+            flow.tensor(
+                (weight * np.sqrt(1 + epsilon)).astype(np.float32), device=batch.device,
+            ),
+            flow.tensor(bias, device=batch.device),
+            axis=1,
+            epsilon=epsilon,
+            is_training=False,
+        )
+    shape = (1, num_channels, 1, 1)
+    weight = flow.tensor(weight.reshape(shape), device=batch.device)
+    bias = flow.tensor(bias.reshape(shape), device=batch.device)
+    return batch * weight + bias
+
+
 def resize(
     img: Tensor,
     size: List[int],
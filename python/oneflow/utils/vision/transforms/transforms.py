@@ -13,6 +13,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 """
+import functools
 import warnings
 from collections.abc import Sequence
 
@@ -175,3 +176,113 @@ class Resize(Module):
         return self.__class__.__name__ + "(size={0}, interpolation={1})".format(
             self.size, interpolate_str
         )
+
+
+class BatchToTensor:
+    """Convert a collated image batch to a float tensor.
+    Converts a ``flow.Tensor`` or ``numpy.ndarray`` batch of size (B x C x H x W),
+    or (B x H x W) for single channel images, with pixel values in the range
+    [0, 255] and any dtype (e.g. ``uint8``) to a flow.FloatTensor of shape
+    (B x C x H x W) in the range [0.0, 1.0].
+    This is the batched counterpart of :class:`ToTensor`, to be applied once per
+    batch after collation instead of once per sample in the dataset.
+    Args:
+        scale (float): Factor the pixel values are multiplied by. Default is ``1 / 255``.
+    """
+
+    def __init__(self, scale=1.0 / 255):
+        self.scale = scale
+
+    def __call__(self, batch):
+        """
+        Args:
+            batch (Tensor or numpy.ndarray): Image batch to be converted to tensor.
+        Returns:
+            Tensor: Converted image batch.
+        """
+        return F.batch_to_tensor(batch, self.scale)
+
+    def __repr__(self):
+        return self.__class__.__name__ + "(scale={0})".format(self.scale)
+
+
+class BatchNormalize(Module):
+    """Normalize a tensor image batch with mean and standard deviation.
+    Given mean: ``(mean[1],...,mean[n])`` and std: ``(std[1],..,std[n])`` for ``n``
+    channels, this transform will normalize each channel of the input
+    batch of size (B x C x H x W) i.e.,
+    ``output[:, channel] = (input[:, channel] - mean[channel]) / std[channel]``
+    Non float batches are converted to float first, in the same pass.
+    .. note::
+        When it directly follows a :class:`BatchToTensor` in a :class:`BatchCompose`,
+        the two are fused into a single per-channel affine transform.
+    Args:
+        mean (sequence): Sequence of means for each channel.
+        std (sequence): Sequence of standard deviations for each channel.
+    """
+
+    def __init__(self, mean, std):
+        super().__init__()
+        self.mean = mean
+        self.std = std
+
+    def forward(self, batch: Tensor) -> Tensor:
+        """
+        Args:
+            batch (Tensor): Tensor image batch to be normalized.
+        Returns:
+            Tensor: Normalized Tensor image batch.
+        """
+        return F.batch_normalize(batch, self.mean, self.std)
+
+    def __repr__(self):
+        return self.__class__.__name__ + "(mean={0}, std={1})".format(
+            self.mean, self.std
+        )
+
+
+class BatchCompose(Compose):
+    """Composes several batch transforms together, to be applied to a collated
+    image batch of size (B x C x H x W), e.g. the ``uint8`` images returned by
+    a :class:`~flow.utils.data.DataLoader`.
+    A :class:`BatchToTensor` directly followed by a :class:`BatchNormalize` is
+    fused into one pass, which converts the batch to float, scales and
+    normalizes it at once. Other transforms working on tensors of size
+    (..., H, W), e.g. :class:`Resize`, can be composed as well.
+    Args:
+        transforms (list of ``Transform`` objects): list of transforms to compose.
+    Example:
+        >>> transforms.BatchCompose([
+        >>>     transforms.BatchToTensor(),
+        >>>     transforms.BatchNormalize((0.485, 0.456, 0.406), (0.229, 0.224, 0.225)),
+        >>> ])
+    """
+
+    def __init__(self, transforms):
+        super().__init__(transforms)
+        self._fused_transforms = []
+        i = 0
+        while i < len(transforms):
+            t = transforms[i]
+            if (
+                isinstance(t, BatchToTensor)
+                and i + 1 < len(transforms)
+                and isinstance(transforms[i + 1], BatchNormalize)
+            ):
+                self._fused_transforms.append(
+                    functools.partial(
+                        F.batch_normalize,
+                        mean=transforms[i + 1].mean,
+                        std=transforms[i + 1].std,
+                        scale=t.scale,
+                    )
+                )
+                i += 2
+            else:
+                self._fused_transforms.append(t)
+                i += 1
+
+    def __call__(self, batch):
+        for t in self._fused_transforms:
+            batch = t(batch)
+        return batch